@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from backend.api.metrics import route_template
+from backend.api.routing import WRITE_METHODS
+from backend.services import metrics
+from backend.services.rate_limit import TokenBucket
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))  # per-client buckets kept, least recently used evicted
+# Comma-separated API keys that get a rate bucket of their own; any other X-API-Key is ignored
+ADMISSION_API_KEYS = frozenset(
+    hashlib.sha256(key.strip().encode()).hexdigest() for key in os.getenv("ADMISSION_API_KEYS", "").split(",") if key.strip()
+)
+
+@dataclass(frozen=True)
+class Tier:
+    name: str
+    concurrency: int  # requests handled at once
+    queue_timeout: float  # seconds a request may wait for a slot
+    rate_per_minute: float  # per client; 0 disables
+
+    @classmethod
+    def from_env(cls, name: str, concurrency: int, queue_timeout: float, rate_per_minute: float) -> "Tier":
+        prefix = f"ADMISSION_{name.upper()}_"
+        return cls(
+            name,
+            int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),
+            float(os.getenv(prefix + "QUEUE_TIMEOUT", str(queue_timeout))),
+            float(os.getenv(prefix + "RATE", str(rate_per_minute))),
+        )
+
+TIERS = {
+    tier.name: tier for tier in (
+        Tier.from_env("read", 64, 1.0, 1200),
+        Tier.from_env("analytics", 8, 2.0, 120),
+        Tier.from_env("write", 16, 2.0, 300),
+        Tier.from_env("scraper", 4, 5.0, 30),
+    )
+}
+
+# Reads that aggregate history or compare every model
+ANALYTICS_ROUTES = {
+    "/api/benchmarks/history",
+    "/api/pricing/history",
+    "/api/pricing/diff",
+    "/api/models/{model_id}/similar",
+}
+
+# Long-lived connections would pin a slot for their whole life; admin must work while saturated
+EXEMPT_PREFIXES = ("/api/stream/", "/api/changes/", "/api/admin/")
+
+def classify(method: str, route: str) -> Optional[str]:
+    """Tier of a request by method and route template; None for requests that bypass admission"""
+    if not route.startswith("/api/") or route.startswith(EXEMPT_PREFIXES):
+        return None
+    if route.startswith("/api/scraper/scrape-url"):
+        return "scraper"
+    if method in WRITE_METHODS:
+        return "write"
+    if route in ANALYTICS_ROUTES:
+        return "analytics"
+    return "read"
+
+class TierLimiter:
+    """At most `concurrency` requests at once; others wait in FIFO order up to queue_timeout.
+
+    The queue holds at most four times the concurrency; beyond that, or when
+    the wait runs out, requests are rejected instead of adding latency.
+    """
+
+    def __init__(self, tier: Tier):
+        self.tier = tier
+        self.max_queue = tier.concurrency * 4
+        self.active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns the rejection reason instead when none frees up in time"""
+        if self.active < self.tier.concurrency and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.max_queue or self.tier.queue_timeout <= 0:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.tier.queue_timeout)
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        metrics.admission_queue_wait.observe(time.perf_counter() - started, tier=self.tier.name)
+        return None
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest waiter"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+class ClientBuckets:
+    """Token bucket per (client, tier), the least recently seen clients evicted beyond max_clients"""
+
+    def __init__(self, max_clients: int = ADMISSION_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str, tier: Tier) -> float:
+        """0 when the client may go ahead, else seconds until its next request is allowed"""
+        if tier.rate_per_minute <= 0:
+            return 0.0
+        key = (client, tier.name)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(tier.rate_per_minute)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.take()
+
+def client_key(scope) -> str:
+    """The client's API key when it is one of ADMISSION_API_KEYS, else its address.
+
+    Unknown keys are ignored: a fresh key per request would otherwise get a
+    full bucket each time and evict real clients' buckets.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"x-api-key" and value:
+            digest = hashlib.sha256(value).hexdigest()
+            if digest in ADMISSION_API_KEYS:
+                return "key:" + digest
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+limiters: Dict[str, TierLimiter] = {name: TierLimiter(tier) for name, tier in TIERS.items()}
+client_buckets = ClientBuckets()
+
+metrics.registry.gauge(
+    "admission_queue_depth", "Requests waiting for a slot, by tier", ("tier",),
+    lambda: {(name,): limiter.queued for name, limiter in limiters.items()}
+)
+metrics.registry.gauge(
+    "admission_in_flight", "Requests holding a slot, by tier", ("tier",),
+    lambda: {(name,): limiter.active for name, limiter in limiters.items()}
+)
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits requests per tier (read, analytics, write, scraper).
+
+    A client over its tier's rate gets 429; a tier whose slots and queue are
+    full gets 503. Both carry Retry-After, so a burst of scrapes or writes is
+    turned away early instead of queueing in front of catalog reads.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_CONTROL:
+            await self.app(scope, receive, send)
+            return
+
+        # MetricsMiddleware has already matched the route
+        stats = metrics.current_request.get()
+        route = stats.route if stats is not None else route_template(scope) or "unmatched"
+        tier_name = classify(scope["method"], route)
+        if tier_name is None:
+            await self.app(scope, receive, send)
+            return
+        tier = TIERS[tier_name]
+
+        wait = client_buckets.take(client_key(scope), tier)
+        if wait > 0:
+            metrics.admission_rejected.inc(tier=tier_name, reason="rate_limited")
+            await _reject(send, 429, f"Rate limit exceeded for {tier_name} requests", wait)
+            return
+
+        limiter = limiters[tier_name]
+        reason = await limiter.acquire()
+        if reason is not None:
+            metrics.admission_rejected.inc(tier=tier_name, reason=reason)
+            await _reject(send, 503, f"Too many {tier_name} requests in progress", max(1.0, tier.queue_timeout))
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(retry_after)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from backend.api.compression import strip_etag_suffix
+from backend.database import events
+from backend.database.signals import change_signal
+from backend.services.single_flight import SingleFlight
+
+# Tables whose contents each cached route prefix depends on
+ROUTE_TABLES: List[Tuple[str, FrozenSet[str]]] = [
+    ("/api/providers", frozenset({"providers", "models"})),
+    ("/api/models", frozenset({"models", "providers", "benchmarks", "pricing"})),
+    ("/api/benchmarks", frozenset({"benchmarks"})),
+    ("/api/pricing", frozenset({"pricing"})),
+    ("/api/comparisons", frozenset({"comparison_tables", "comparison_items"})),
+    ("/api/search", frozenset({"providers", "models", "benchmarks"})),
+]
+
+# Tables read by relations embedded with include=, beyond the prefix's own
+INCLUDE_TABLES: Dict[str, Dict[str, FrozenSet[str]]] = {
+    "/api/benchmarks": {"model": frozenset({"models"})},
+    "/api/pricing": {"model": frozenset({"models"})},
+}
+
+# Expensive rebuilds: concurrent misses for the same ETag share one render
+COALESCED_PREFIXES = ("/api/comparisons", "/api/pricing")
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+# Larger bodies still get an ETag but are not kept in memory
+RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(1024 * 1024)))
+
+# Response headers worth replaying from the cache
+_STORED_HEADERS = {b"content-type"}
+
+# With CACHE_SIGNAL_DIR, table versions are the marker files all workers share,
+# so any worker validates an ETag issued by another, across restarts too.
+# Without it they are counters that start at zero in every process, and the
+# same counters can describe different data after a restart or on another
+# worker; a per-process epoch keeps such ETags from validating elsewhere.
+ETAG_EPOCH = b"" if change_signal.enabled else os.urandom(8)
+
+class TableVersions:
+    """Per-table versions: the shared change markers, or counters bumped after every committed write"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._listeners = []
+
+    def get(self, tables: Iterable[str]) -> Tuple:
+        tables = sorted(tables)
+        # Writes committed by other workers also bump the counters through the signal listener
+        markers = change_signal.poll(tables)
+        if markers:
+            return markers
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+        for listener in self._listeners:
+            listener(tables)
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: bump every table touched by a transaction"""
+        self.bump(events.changed_tables(changes))
+
+class ResponseCache:
+    """LRU cache of serialized GET responses keyed by request and table versions"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[FrozenSet[str], List, bytes]]" = OrderedDict()
+
+    def get(self, etag: str) -> Optional[Tuple[List, bytes]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                return None
+            self._entries.move_to_end(etag)
+            return entry[1], entry[2]
+
+    def put(self, etag: str, tables: FrozenSet[str], headers: List, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[etag] = (tables, headers, body)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Evict entries that depend on any of the given tables"""
+        tables = set(tables)
+        with self._lock:
+            for etag in [etag for etag, entry in self._entries.items() if entry[0] & tables]:
+                del self._entries[etag]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+table_versions = TableVersions()
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+response_flights = SingleFlight("response")
+table_versions.add_listener(response_cache.invalidate)
+events.register_listener(table_versions.handle_changes)
+change_signal.add_listener(table_versions.bump)
+
+def route_tables(path: str, query_string: bytes = b"") -> Optional[FrozenSet[str]]:
+    """Tables a GET request depends on, or None if the path is not cacheable"""
+    for prefix, tables in ROUTE_TABLES:
+        if path == prefix or path.startswith(prefix + "/"):
+            relations = INCLUDE_TABLES.get(prefix)
+            if relations and query_string:
+                for value in parse_qs(query_string.decode("latin-1")).get("include", ()):
+                    for name in value.split(","):
+                        tables = tables | relations.get(name.strip(), frozenset())
+            return tables
+    return None
+
+def compute_etag(path: str, query_string: bytes, versions: Tuple) -> str:
+    """Strong ETag from the request and the versions of the tables it reads"""
+    query = b"&".join(sorted(query_string.split(b"&"))) if query_string else b""
+    digest = hashlib.sha1(ETAG_EPOCH)
+    digest.update(path.encode())
+    digest.update(b"?" + query)
+    digest.update(repr(versions).encode())
+    # Current pricing depends on the date as well as on the data
+    digest.update(date.today().isoformat().encode())
+    return '"' + digest.hexdigest() + '"'
+
+def _store(etag: str, tables: FrozenSet[str], versions: Tuple, start_message: dict, body: bytes) -> None:
+    # Skip storing if a write raced with this request
+    if table_versions.get(tables) == versions:
+        headers = [(name, value) for name, value in start_message.get("headers", []) if name.lower() in _STORED_HEADERS]
+        response_cache.put(etag, tables, headers, body)
+
+def _from_replica(scope) -> bool:
+    # Set by get_db: a lagging replica may predate the versions the ETag was built from
+    return bool(scope.get("state", {}).get("db_replica"))
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Compressed representations carry a suffixed ETag of the same content
+    candidates = [strip_etag_suffix(candidate.strip()) for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class ResponseCacheMiddleware:
+    """ASGI middleware that answers cacheable GETs from ETags and the LRU cache.
+
+    Conditional requests with a matching If-None-Match get a 304 and cached
+    responses are replayed without touching the database. Writes invalidate
+    entries through the table version counters. Concurrent misses on the
+    coalesced prefixes wait for one render instead of each querying.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        tables = route_tables(scope["path"], scope.get("query_string", b""))
+        if tables is None:
+            await self.app(scope, receive, send)
+            return
+
+        versions = table_versions.get(tables)
+        etag = compute_etag(scope["path"], scope.get("query_string", b""), versions)
+        validator_headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        request_headers = dict(scope["headers"])
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match and _etag_matches(if_none_match.decode("latin-1"), etag):
+            await send({"type": "http.response.start", "status": 304, "headers": validator_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cached = response_cache.get(etag)
+        if cached is not None:
+            headers, body = cached
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": headers + validator_headers + [(b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+            return
+
+        if scope["method"] == "GET" and scope["path"].startswith(COALESCED_PREFIXES):
+            start_message, body, validated = await response_flights.run(
+                etag, lambda: self._render(scope, receive, tables, versions, etag)
+            )
+            headers = list(start_message.get("headers", []))
+            if validated:
+                headers += validator_headers
+            await send({"type": "http.response.start", "status": start_message.get("status", 500), "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start_message = {}
+        chunks = []
+        size = 0
+        validated = False
+
+        async def send_wrapper(message):
+            nonlocal size, validated
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+                validated = message["status"] == 200 and not _from_replica(scope)
+                if validated:
+                    message = dict(message, headers=list(message.get("headers", [])) + validator_headers)
+            elif message["type"] == "http.response.body" and validated:
+                size += len(message.get("body", b""))
+                if size <= RESPONSE_CACHE_MAX_BODY:
+                    chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    if scope["method"] == "GET" and size <= RESPONSE_CACHE_MAX_BODY:
+                        _store(etag, tables, versions, start_message, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _render(
+        self, scope, receive, tables: FrozenSet[str], versions: Tuple, etag: str
+    ) -> Tuple[dict, bytes, bool]:
+        """Run the app to the end and keep the whole response, storing it when cacheable; also whether it may carry the ETag"""
+        start_message = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        validated = start_message.get("status") == 200 and not _from_replica(scope)
+        if validated and len(body) <= RESPONSE_CACHE_MAX_BODY:
+            _store(etag, tables, versions, start_message, body)
+        return start_message, body, validated
@@ -0,0 +1,128 @@
+import gzip
+import os
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies below this size are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Suffix added inside strong ETags of compressed representations
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+def _accepted_encodings(header: str) -> List[Tuple[str, float]]:
+    accepted = []
+    for part in header.split(","):
+        pieces = part.strip().split(";")
+        encoding = pieces[0].strip().lower()
+        quality = 1.0
+        for parameter in pieces[1:]:
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if encoding:
+            accepted.append((encoding, quality))
+    return accepted
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring br on ties"""
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    accepted = dict(_accepted_encodings(header))
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def accepts_encoding(header: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows the given encoding"""
+    accepted = dict(_accepted_encodings(header))
+    return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def strip_etag_suffix(etag: str) -> str:
+    """Map the ETag of a compressed representation back to the identity one"""
+    for suffix in ETAG_SUFFIXES.values():
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+class CompressionMiddleware:
+    """ASGI middleware that negotiates brotli or gzip for large buffered responses.
+
+    Streaming responses (more_body) and bodies that already carry a
+    Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                if b"content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small: send as-is
+                await send(start_message)
+                start_message = None
+                passthrough = True
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = []
+            for name, value in start_message.get("headers", []):
+                lowered = name.lower()
+                if lowered == b"content-length":
+                    continue
+                if lowered == b"etag" and value.endswith(b'"') and not value.startswith(b"W/"):
+                    value = value[:-1] + ETAG_SUFFIXES[encoding].encode() + b'"'
+                headers.append((name, value))
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send(dict(start_message, headers=headers))
+            start_message = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.api.serialization import (
+    FAST_SERIALIZATION, ORJSONResponse, schema_fields, fetch_dicts, fetch_by_ids, fetch_children
+)
+
+@dataclass(frozen=True)
+class Relation:
+    """A related resource that list endpoints can embed with include=.
+
+    A to-one relation (many=False) looks up the row whose id is the parent's
+    local_key; a to-many relation loads the rows whose remote_key is the
+    parent's id. criteria builds extra filters at request time.
+    """
+    schema: Type[BaseModel]
+    entity: Any
+    local_key: str
+    remote_key: str = "id"
+    many: bool = True
+    criteria: Optional[Callable[[], Sequence[Any]]] = None
+
+def valid_today(entity) -> Callable[[], Sequence[Any]]:
+    """Criteria for rows with a validity period that includes today"""
+    def criteria():
+        today = date.today()
+        return (
+            entity.valid_from <= today,
+            (entity.valid_to.is_(None)) | (entity.valid_to >= today)
+        )
+    return criteria
+
+def parse_names(value: Optional[str], allowed: Iterable[str], parameter: str) -> Optional[List[str]]:
+    """Split a comma-separated query parameter, rejecting unknown names"""
+    if value is None:
+        return None
+    allowed = list(allowed)
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {parameter}: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    return names
+
+class Fieldset:
+    """Sparse fieldset and includes requested for a list endpoint.
+
+    Only the requested columns (plus the keys needed to attach includes) are
+    selected, and only the requested relations are batch-loaded. Without
+    fields= and include= the full schema and default_include are returned.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        entity,
+        fields: Optional[str] = None,
+        include: Optional[str] = None,
+        relations: Dict[str, Relation] = None,
+        default_include: Sequence[str] = ()
+    ):
+        self.entity = entity
+        self.relations = relations or {}
+        self.requested = fields is not None or include is not None
+        columns = schema_fields(schema, entity)
+        self.fields = parse_names(fields, columns, "fields") or columns
+        included = parse_names(include, self.relations, "include")
+        self.include = list(default_include) if included is None else included
+        keys = {self.relations[name].local_key for name in self.include}
+        self.columns = [name for name in columns if name in self.fields or name in keys]
+
+    @property
+    def active(self) -> bool:
+        """Whether to answer from the projection path instead of the ORM"""
+        return FAST_SERIALIZATION or self.requested
+
+    def select(self):
+        """SELECT of the requested columns and the keys the includes need"""
+        # Ordered by id so pages do not depend on which index serves a narrow SELECT
+        return select(*[getattr(self.entity, name) for name in self.columns]).order_by(self.entity.id)
+
+    def fetch(self, db: Session, query) -> List[Dict[str, Any]]:
+        """Run the projection, attach the included relations and drop helper keys"""
+        rows = fetch_dicts(db, query, self.columns)
+        for name in self.include:
+            relation = self.relations[name]
+            keys = [row[relation.local_key] for row in rows]
+            criteria = relation.criteria() if relation.criteria else ()
+            if relation.many:
+                related = fetch_children(db, relation.schema, relation.entity, relation.remote_key, keys, criteria)
+                for row in rows:
+                    row[name] = related.get(row[relation.local_key], [])
+            else:
+                related = fetch_by_ids(db, relation.schema, relation.entity, keys)
+                for row in rows:
+                    row[name] = related.get(row[relation.local_key])
+        extra = [name for name in self.columns if name not in self.fields]
+        for row in rows:
+            for name in extra:
+                del row[name]
+        return rows
+
+    def respond(self, db: Session, query) -> ORJSONResponse:
+        return ORJSONResponse(self.fetch(db, query))
@@ -0,0 +1,53 @@
+import time
+from typing import Optional
+
+from starlette.routing import Match
+
+from backend.services import metrics
+
+def route_template(scope) -> Optional[str]:
+    """Path template of the route matching a request, e.g. /api/models/{model_id}"""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+class MetricsMiddleware:
+    """ASGI middleware that counts and times requests per route template.
+
+    Also binds a RequestStats to the request's context, so the engine
+    hooks in backend.database.base attribute SQL statements to the route.
+    Unmatched paths share one label to keep the series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope) or "unmatched"
+        stats = metrics.RequestStats(route)
+        token = metrics.current_request.set(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_progress.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.http_requests_in_progress.dec(method=method)
+            metrics.http_request_duration.observe(time.perf_counter() - started, method=method, route=route)
+            metrics.http_requests.inc(method=method, route=route, status=str(status[0]))
+            metrics.http_request_statements.observe(stats.statements, method=method, route=route)
+            metrics.current_request.reset(token)
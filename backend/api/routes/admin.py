@@ -0,0 +1,27 @@
+import os
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Optional
+from backend.database.slow_queries import slow_query_log
+from backend.schemas import SlowQueryLog
+
+# Admin endpoints require it in the X-Admin-Token header; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not (x_admin_token and secrets.compare_digest(x_admin_token, ADMIN_TOKEN)):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/slow-queries", response_model=SlowQueryLog)
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """Get the most recent statements over the slow-query threshold, with their plans"""
+    return {"threshold_ms": slow_query_log.threshold_ms, "entries": slow_query_log.entries(limit)}
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """Empty the slow-query buffer"""
+    return {"cleared": slow_query_log.clear()}
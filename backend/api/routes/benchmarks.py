@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
 from backend.database.base import get_db
+from backend.api.routing import QueuedWriteRoute
+from backend.api.fieldsets import Fieldset, Relation
 from backend.models import Benchmark as BenchmarkModel, Model as ModelModel
-from backend.schemas import Benchmark, BenchmarkCreate, BenchmarkUpdate
+from backend.schemas import Benchmark, BenchmarkCreate, BenchmarkUpdate, BenchmarkSeries, Model
+from backend.services.reference_cache import reference_cache
+from backend.services.timeseries_service import benchmark_history
+from backend.services.search_service import matching_benchmark_ids
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
+
+BENCHMARK_RELATIONS = {
+    "model": Relation(Model, ModelModel, local_key="model_id", many=False),
+}
 
 @router.get("/", response_model=List[Benchmark])
 def get_benchmarks(
@@ -13,19 +23,42 @@ def get_benchmarks(
     limit: int = 100,
     model_id: Optional[int] = Query(None, description="Filter by model ID"),
     benchmark_name: Optional[str] = Query(None, description="Filter by benchmark name"),
+    fields: Optional[str] = Query(None, description="Comma-separated benchmark fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: model"),
     db: Session = Depends(get_db)
 ):
     """Get all benchmarks with optional filtering"""
-    query = db.query(BenchmarkModel)
+    fieldset = Fieldset(Benchmark, BenchmarkModel, fields, include, BENCHMARK_RELATIONS)
+    query = fieldset.select() if fieldset.active else db.query(BenchmarkModel)
     
     if model_id:
         query = query.filter(BenchmarkModel.model_id == model_id)
     if benchmark_name:
-        query = query.filter(BenchmarkModel.benchmark_name.contains(benchmark_name))
+        # Served from the trigram index when possible instead of a leading-wildcard LIKE
+        matching_ids = matching_benchmark_ids(db, benchmark_name)
+        if matching_ids is not None:
+            query = query.filter(BenchmarkModel.id.in_(matching_ids))
+        else:
+            query = query.filter(BenchmarkModel.benchmark_name.contains(benchmark_name))
     
+    if fieldset.active:
+        return fieldset.respond(db, query.offset(skip).limit(limit))
+
     benchmarks = query.offset(skip).limit(limit).all()
     return benchmarks
 
+@router.get("/history", response_model=List[BenchmarkSeries])
+def get_benchmark_history(
+    model_ids: List[int] = Query(..., description="Model IDs to include"),
+    benchmark_name: Optional[str] = Query(None, description="Exact benchmark name"),
+    start: Optional[date] = Query(None, description="First test date of the range"),
+    end: Optional[date] = Query(None, description="Last test date of the range"),
+    points: Optional[int] = Query(None, ge=2, le=10000, description="Maximum points per series"),
+    db: Session = Depends(get_db)
+):
+    """Get benchmark scores by test date per model, optionally downsampled to a point budget"""
+    return benchmark_history(db, model_ids, benchmark_name, start, end, points)
+
 @router.get("/{benchmark_id}", response_model=Benchmark)
 def get_benchmark(benchmark_id: int, db: Session = Depends(get_db)):
     """Get a specific benchmark"""
@@ -41,8 +74,7 @@ def create_benchmark(benchmark: BenchmarkCreate, db: Session = Depends(get_db)):
     benchmark_data = benchmark.dict()
     
     # Check if model exists
-    model = db.query(ModelModel).filter(ModelModel.id == benchmark_data['model_id']).first()
-    if not model:
+    if not reference_cache.model_exists(db, benchmark_data['model_id']):
         raise HTTPException(status_code=400, detail="Model not found")
     
     db_benchmark = BenchmarkModel(**benchmark_data)
@@ -62,8 +94,7 @@ def update_benchmark(benchmark_id: int, benchmark: BenchmarkUpdate, db: Session
     
     # Check if model exists if model_id is being updated
     if "model_id" in update_data:
-        model = db.query(ModelModel).filter(ModelModel.id == update_data["model_id"]).first()
-        if not model:
+        if not reference_cache.model_exists(db, update_data["model_id"]):
             raise HTTPException(status_code=400, detail="Model not found")
     
     for field, value in update_data.items():
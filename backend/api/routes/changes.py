@@ -0,0 +1,41 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from backend.schemas import ChangeFeed
+from backend.services.change_feed import (
+    FEED_TABLES, CHANGE_POLL_INTERVAL, change_notifier, changes_since, latest_cursor, in_session
+)
+
+router = APIRouter()
+
+# Upper bound for long-polling, below common proxy idle timeouts
+MAX_WAIT_SECONDS = 30
+
+@router.get("/", response_model=ChangeFeed)
+async def get_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor from a previous response; omit to get the current cursor"),
+    tables: Optional[str] = Query(None, description="Comma-separated tables: " + ", ".join(FEED_TABLES)),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait for a change if there is none yet"),
+):
+    """Get inserts, updates and deletes committed after a cursor"""
+    table_names = [name.strip() for name in tables.split(",") if name.strip()] if tables else None
+    if table_names:
+        unknown = [name for name in table_names if name not in FEED_TABLES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    if since is None:
+        return {"cursor": await run_in_threadpool(in_session, latest_cursor), "changes": [], "has_more": False}
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        # Each read gets its own session, so a waiting long-poll holds no connection
+        seen_version = change_notifier.version
+        feed = await run_in_threadpool(in_session, changes_since, since, limit, table_names)
+        remaining = deadline - loop.time()
+        if feed["changes"] or remaining <= 0:
+            return feed
+        await change_notifier.wait(seen_version, min(remaining, CHANGE_POLL_INTERVAL))
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend.database.base import get_db
+from backend.api.routing import QueuedWriteRoute
+from backend.api.fieldsets import Fieldset, Relation
 from backend.models import (
     ComparisonTable as ComparisonTableModel,
-    ComparisonItem as ComparisonItemModel,
-    Model as ModelModel
+    ComparisonItem as ComparisonItemModel
 )
 from backend.schemas import (
     ComparisonTable,
@@ -15,22 +16,33 @@ from backend.schemas import (
     ComparisonItem,
     ComparisonItemCreate
 )
+from backend.services.reference_cache import reference_cache
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
+
+COMPARISON_RELATIONS = {
+    "items": Relation(ComparisonItem, ComparisonItemModel, local_key="id", remote_key="comparison_table_id"),
+}
 
 @router.get("/", response_model=List[ComparisonTable])
 def get_comparison_tables(
     skip: int = 0,
     limit: int = 100,
     is_public: bool = None,
+    fields: Optional[str] = Query(None, description="Comma-separated comparison table fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: items"),
     db: Session = Depends(get_db)
 ):
     """Get all comparison tables"""
-    query = db.query(ComparisonTableModel)
+    fieldset = Fieldset(ComparisonTable, ComparisonTableModel, fields, include, COMPARISON_RELATIONS)
+    query = fieldset.select() if fieldset.active else db.query(ComparisonTableModel)
     
     if is_public is not None:
         query = query.filter(ComparisonTableModel.is_public == is_public)
     
+    if fieldset.active:
+        return fieldset.respond(db, query.offset(skip).limit(limit))
+
     tables = query.offset(skip).limit(limit).all()
     return tables
 
@@ -56,10 +68,10 @@ def create_comparison_table(table: ComparisonTableCreate, db: Session = Depends(
     db.refresh(db_table)
     
     # Add comparison items
+    missing = reference_cache.missing_models(db, model_ids)
     for order, model_id in enumerate(model_ids):
         # Check if model exists
-        model = db.query(ModelModel).filter(ModelModel.id == model_id).first()
-        if not model:
+        if model_id in missing:
             # Clean up the created table if a model doesn't exist
             db.delete(db_table)
             db.commit()
@@ -114,8 +126,7 @@ def add_comparison_item(table_id: int, item: ComparisonItemCreate, db: Session =
     item_data = item.dict()
     
     # Check if model exists
-    model = db.query(ModelModel).filter(ModelModel.id == item_data['model_id']).first()
-    if not model:
+    if not reference_cache.model_exists(db, item_data['model_id']):
         raise HTTPException(status_code=400, detail="Model not found")
     
     # Check if item already exists
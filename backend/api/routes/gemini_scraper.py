@@ -1,19 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, HttpUrl
-from typing import Dict, Any, Optional
-import google.generativeai as genai
-import os
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from functools import lru_cache
+import asyncio
+import json
+import time
 from dotenv import load_dotenv
-from backend.database.base import get_db
+from backend.database.base import get_db, SessionLocal
+from backend.database.write_queue import WRITE_QUEUE, write_queue
+from backend.api.routing import QueuedWriteRoute
 from backend.models import WebSource as WebSourceModel
+from backend.services import metrics, page_fetcher
+from backend.services.gemini_service import GeminiScrapingService
+from backend.services.llm_client import LLM_BACKEND, get_llm_client, llm_configured
+from backend.services.single_flight import SingleFlight
 
 load_dotenv()
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+@lru_cache(maxsize=1)
+def scraping_service() -> GeminiScrapingService:
+    """Service around the LLM_BACKEND client, built on first use so workers that never scrape skip the SDK import"""
+    return GeminiScrapingService(client=get_llm_client())
+
+@contextmanager
+def _stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.scrape_stage_duration.observe(time.perf_counter() - started, stage=name)
 
 class UrlScrapeRequest(BaseModel):
     url: HttpUrl
@@ -21,123 +42,224 @@ class UrlScrapeRequest(BaseModel):
     model_name: Optional[str] = None
     provider_name: Optional[str] = None
 
+# Record arrays returned for each data_type, empty when nothing was found
+DATA_ARRAYS = {
+    'pricing': ('pricing_data',),
+    'benchmark': ('benchmark_data',),
+    'both': ('pricing_data', 'benchmark_data'),
+}
+
 class ScrapeResult(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     extracted_info: Optional[Dict[str, Any]] = None
 
+def _build_prompt(request: UrlScrapeRequest, page_text: Optional[str]) -> str:
+    # Construct prompt based on data type
+    if request.data_type == 'pricing':
+        prompt = f"""
+        Analyze the content from this URL: {request.url}
+        
+        Extract pricing information for AI models. Look for:
+        - Model names
+        - Input token prices
+        - Output token prices  
+        - Request-based pricing
+        - Price units (per 1K tokens, per million tokens, etc.)
+        - Currency
+        - Effective dates
+        
+        Focus on {request.model_name} from {request.provider_name} if specified.
+        
+        Return the information in JSON format with the following structure:
+        {{
+            "pricing_data": [
+                {{
+                    "model_name": "string",
+                    "provider": "string",
+                    "price_type": "input_tokens|output_tokens|requests",
+                    "price": "decimal",
+                    "currency": "USD",
+                    "unit": "per_1k_tokens|per_million_tokens|per_request",
+                    "effective_date": "YYYY-MM-DD"
+                }}
+            ]
+        }}
+        """
+    elif request.data_type == 'benchmark':
+        prompt = f"""
+        Analyze the content from this URL: {request.url}
+        
+        Extract benchmark performance data for AI models. Look for:
+        - Model names
+        - Benchmark test names (MMLU, HellaSwag, TruthfulQA, etc.)
+        - Scores/performance metrics
+        - Units (accuracy, percentage, score)
+        - Test dates
+        
+        Focus on {request.model_name} from {request.provider_name} if specified.
+        
+        Return the information in JSON format with the following structure:
+        {{
+            "benchmark_data": [
+                {{
+                    "model_name": "string",
+                    "provider": "string", 
+                    "benchmark_name": "string",
+                    "score": "decimal",
+                    "unit": "accuracy|percentage|score",
+                    "test_date": "YYYY-MM-DD"
+                }}
+            ]
+        }}
+        """
+    else:  # both
+        prompt = f"""
+        Analyze the content from this URL: {request.url}
+        
+        Extract both pricing and benchmark data for AI models.
+        
+        For pricing, look for:
+        - Model names, input/output token prices, price units, currency, effective dates
+        
+        For benchmarks, look for:
+        - Model names, benchmark test names, scores, units, test dates
+        
+        Focus on {request.model_name} from {request.provider_name} if specified.
+        
+        Return in JSON format with both pricing_data and benchmark_data arrays.
+        """
+    
+    if page_text:
+        prompt += f"""
+        Page content:
+        {page_text}
+        """
+    return prompt
+
+async def _fetch(request: UrlScrapeRequest) -> Optional[str]:
+    """Page text for the prompt; when fetching is off or fails, the model only gets the URL, as before"""
+    if not page_fetcher.SCRAPER_FETCH_PAGES:
+        return None
+    with _stage("fetch"):
+        try:
+            return await page_fetcher.fetch_page_text(str(request.url))
+        except Exception:
+            return None
+
+def _stream_records(service: GeminiScrapingService, prompt: str, transcript: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Records as the model streams them, timing the first record and the whole generation"""
+    started = time.perf_counter()
+    first = True
+    with _stage("generate"):
+        for array, record in service.stream_records(prompt, "scrape_url", transcript):
+            if first:
+                metrics.scrape_stage_duration.observe(time.perf_counter() - started, stage="first_record")
+                first = False
+            yield array, record
+
+async def _persist(request: UrlScrapeRequest) -> None:
+    """Store the URL as a web source, on a session of its own since the requesting client may be gone"""
+    with _stage("persist"):
+        if WRITE_QUEUE:
+            await run_in_threadpool(write_queue.run, lambda session: _remember_source(session, request))
+        else:
+            await run_in_threadpool(_persist_source, request)
+
+def _persist_source(request: UrlScrapeRequest) -> None:
+    with SessionLocal() as session:
+        _remember_source(session, request)
+
+def _extracted_info(request: UrlScrapeRequest, page_text: Optional[str]) -> Dict[str, Any]:
+    return {
+        "url": str(request.url),
+        "data_type": request.data_type,
+        "model_name": request.model_name,
+        "provider_name": request.provider_name,
+        "page_fetched": page_text is not None,
+        "llm_backend": LLM_BACKEND
+    }
+
+class ScrapeJob:
+    """One fetch, extraction and persist, followed by every request for the same URL and parameters.
+
+    Records are kept as they stream in, so a request that joins late replays
+    the ones already extracted and then follows the rest.
+    """
+
+    def __init__(self, request: UrlScrapeRequest):
+        self.request = request
+        self.page_text: Optional[str] = None
+        self.transcript: List[str] = []
+        self.records: List[Tuple[str, Dict[str, Any]]] = []
+        self.fetched = asyncio.Event()
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run())
+
+    def add_done_callback(self, callback) -> None:
+        self.task.add_done_callback(callback)
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _run(self) -> None:
+        try:
+            # The first call imports the SDK; keep that off the event loop
+            service = await run_in_threadpool(scraping_service)
+            self.page_text = await _fetch(self.request)
+            self.fetched.set()
+            # Records are decoded as the response streams in; malformed ones are skipped
+            prompt = _build_prompt(self.request, self.page_text)
+            async for item in iterate_in_threadpool(_stream_records(service, prompt, self.transcript)):
+                self.records.append(item)
+                self._notify()
+            await _persist(self.request)
+        finally:
+            self.fetched.set()
+            self._notify()
+
+    async def follow(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Every record from the first, as they arrive; raises the job's error at the point it failed"""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.records):
+                yield self.records[sent]
+                sent += 1
+            if self.task.done():
+                if sent == len(self.records):
+                    # Re-raises the job's exception, if any
+                    await asyncio.shield(self.task)
+                    return
+                continue
+            await changed.wait()
+
+# Concurrent scrapes of the same page share one fetch and one LLM call
+scrape_jobs = SingleFlight("scrape")
+
+def _join(request: UrlScrapeRequest) -> ScrapeJob:
+    key = (str(request.url), request.data_type, request.model_name or None, request.provider_name or None)
+    return scrape_jobs.join(key, lambda: ScrapeJob(request))
+
 @router.post("/scrape-url", response_model=ScrapeResult)
-async def scrape_url(request: UrlScrapeRequest, db: Session = Depends(get_db)):
+async def scrape_url(request: UrlScrapeRequest):
     """Scrape pricing and benchmark data from a URL using Gemini API"""
     
-    if not os.getenv("GEMINI_API_KEY"):
+    if not llm_configured():
         raise HTTPException(status_code=500, detail="Gemini API key not configured")
     
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Construct prompt based on data type
-        if request.data_type == 'pricing':
-            prompt = f"""
-            Analyze the content from this URL: {request.url}
-            
-            Extract pricing information for AI models. Look for:
-            - Model names
-            - Input token prices
-            - Output token prices  
-            - Request-based pricing
-            - Price units (per 1K tokens, per million tokens, etc.)
-            - Currency
-            - Effective dates
-            
-            Focus on {request.model_name} from {request.provider_name} if specified.
-            
-            Return the information in JSON format with the following structure:
-            {{
-                "pricing_data": [
-                    {{
-                        "model_name": "string",
-                        "provider": "string",
-                        "price_type": "input_tokens|output_tokens|requests",
-                        "price": "decimal",
-                        "currency": "USD",
-                        "unit": "per_1k_tokens|per_million_tokens|per_request",
-                        "effective_date": "YYYY-MM-DD"
-                    }}
-                ]
-            }}
-            """
-        elif request.data_type == 'benchmark':
-            prompt = f"""
-            Analyze the content from this URL: {request.url}
-            
-            Extract benchmark performance data for AI models. Look for:
-            - Model names
-            - Benchmark test names (MMLU, HellaSwag, TruthfulQA, etc.)
-            - Scores/performance metrics
-            - Units (accuracy, percentage, score)
-            - Test dates
-            
-            Focus on {request.model_name} from {request.provider_name} if specified.
-            
-            Return the information in JSON format with the following structure:
-            {{
-                "benchmark_data": [
-                    {{
-                        "model_name": "string",
-                        "provider": "string", 
-                        "benchmark_name": "string",
-                        "score": "decimal",
-                        "unit": "accuracy|percentage|score",
-                        "test_date": "YYYY-MM-DD"
-                    }}
-                ]
-            }}
-            """
-        else:  # both
-            prompt = f"""
-            Analyze the content from this URL: {request.url}
-            
-            Extract both pricing and benchmark data for AI models.
-            
-            For pricing, look for:
-            - Model names, input/output token prices, price units, currency, effective dates
-            
-            For benchmarks, look for:
-            - Model names, benchmark test names, scores, units, test dates
-            
-            Focus on {request.model_name} from {request.provider_name} if specified.
-            
-            Return in JSON format with both pricing_data and benchmark_data arrays.
-            """
-        
-        # Generate content using Gemini
-        response = model.generate_content([
-            {"text": prompt}
-        ])
-        
-        # Store the URL as a web source
-        existing_source = db.query(WebSourceModel).filter(WebSourceModel.url == str(request.url)).first()
-        if not existing_source:
-            web_source = WebSourceModel(
-                url=str(request.url),
-                source_type=request.data_type,
-                is_active=True
-            )
-            db.add(web_source)
-            db.commit()
+        job = _join(request)
+        records = {key: [] for key in DATA_ARRAYS.get(request.data_type, DATA_ARRAYS['both'])}
+        async for array, record in job.follow():
+            records.setdefault(array, []).append(record)
         
         return ScrapeResult(
             success=True,
-            data={"raw_response": response.text},
-            extracted_info={
-                "url": str(request.url),
-                "data_type": request.data_type,
-                "model_name": request.model_name,
-                "provider_name": request.provider_name
-            }
+            data={"raw_response": "".join(job.transcript), **records},
+            extracted_info=_extracted_info(request, job.page_text)
         )
         
     except Exception as e:
@@ -146,6 +268,42 @@ async def scrape_url(request: UrlScrapeRequest, db: Session = Depends(get_db)):
             error=str(e)
         )
 
+@router.post("/scrape-url/stream")
+async def scrape_url_stream(request: UrlScrapeRequest):
+    """Scrape a URL and stream each extracted record as a line of JSON as soon as the model produces it"""
+    
+    if not llm_configured():
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    
+    async def lines():
+        records = 0
+        try:
+            job = _join(request)
+            await job.fetched.wait()
+            yield _ndjson({"type": "started", "extracted_info": _extracted_info(request, job.page_text)})
+            async for array, record in job.follow():
+                records += 1
+                yield _ndjson({"type": "record", "array": array, "record": record})
+            yield _ndjson({"type": "done", "records": records})
+        except Exception as e:
+            yield _ndjson({"type": "error", "records": records, "error": str(e)})
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _ndjson(item: Dict[str, Any]) -> str:
+    return json.dumps(item, default=str) + "\n"
+
+def _remember_source(db: Session, request: UrlScrapeRequest) -> None:
+    existing_source = db.query(WebSourceModel).filter(WebSourceModel.url == str(request.url)).first()
+    if not existing_source:
+        web_source = WebSourceModel(
+            url=str(request.url),
+            source_type=request.data_type,
+            is_active=True
+        )
+        db.add(web_source)
+        db.commit()
+
 @router.get("/web-sources")
 def get_web_sources(db: Session = Depends(get_db)):
     """Get all registered web sources"""
@@ -2,10 +2,27 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from backend.database.base import get_db
-from backend.models import Model as ModelModel, Provider as ProviderModel
-from backend.schemas import Model, ModelCreate, ModelUpdate, ModelWithDetails
+from backend.api.routing import QueuedWriteRoute
+from backend.api.fieldsets import Fieldset, Relation, valid_today
+from backend.models import Model as ModelModel, Provider as ProviderModel, Benchmark as BenchmarkModel, Pricing as PricingModel
+from backend.schemas import Model, ModelCreate, ModelUpdate, ModelWithDetails, SimilarModel, Provider, Benchmark, Pricing
+from backend.schemas.benchmark import BenchmarkBase
+from backend.schemas.pricing import PricingBase
+from backend.services.similarity_service import similarity_index
+from backend.services.reference_cache import reference_cache
+from backend.services.latest_service import latest_benchmarks, current_pricing
+from backend.services import deletion
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
+
+MODEL_RELATIONS = {
+    "provider": Relation(Provider, ProviderModel, local_key="provider_id", many=False),
+    "benchmarks": Relation(BenchmarkBase, BenchmarkModel, local_key="id", remote_key="model_id"),
+    "pricing": Relation(PricingBase, PricingModel, local_key="id", remote_key="model_id"),
+    "current_pricing": Relation(
+        PricingBase, PricingModel, local_key="id", remote_key="model_id", criteria=valid_today(PricingModel)
+    ),
+}
 
 @router.get("/", response_model=List[ModelWithDetails])
 def get_models(
@@ -13,41 +30,105 @@ def get_models(
     limit: int = 100, 
     provider_id: Optional[int] = Query(None, description="Filter by provider ID"),
     model_type: Optional[str] = Query(None, description="Filter by model type"),
+    fields: Optional[str] = Query(None, description="Comma-separated model fields to return"),
+    include: Optional[str] = Query(
+        None, description="Comma-separated relations to embed: provider, benchmarks, pricing, current_pricing"
+    ),
     db: Session = Depends(get_db)
 ):
     """Get all models with optional filtering"""
-    query = db.query(ModelModel)
+    fieldset = Fieldset(
+        ModelWithDetails, ModelModel, fields, include, MODEL_RELATIONS,
+        default_include=("provider", "benchmarks", "pricing")
+    )
+    query = fieldset.select() if fieldset.active else db.query(ModelModel)
     
     if provider_id:
         query = query.filter(ModelModel.provider_id == provider_id)
     if model_type:
         query = query.filter(ModelModel.model_type == model_type)
     
+    if fieldset.active:
+        return fieldset.respond(db, query.offset(skip).limit(limit))
+
     models = query.offset(skip).limit(limit).all()
     return models
 
 @router.get("/{model_id}", response_model=ModelWithDetails)
 def get_model(model_id: int, db: Session = Depends(get_db)):
-    """Get a specific model with details"""
+    """Get a specific model with its latest benchmark per name and current pricing"""
     model = db.query(ModelModel).filter(ModelModel.id == model_id).first()
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
-    return model
+    return {
+        **Model.model_validate(model, from_attributes=True).model_dump(),
+        "provider": model.provider,
+        "benchmarks": latest_benchmarks(db, model_id),
+        "pricing": current_pricing(db, model_id),
+    }
+
+@router.get("/{model_id}/benchmarks", response_model=List[Benchmark])
+def get_model_benchmarks(
+    model_id: int,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    benchmark_name: Optional[str] = Query(None, description="Exact benchmark name"),
+    db: Session = Depends(get_db)
+):
+    """Get the full benchmark history of a model, newest first"""
+    if not reference_cache.model_exists(db, model_id):
+        raise HTTPException(status_code=404, detail="Model not found")
+    query = db.query(BenchmarkModel).filter(BenchmarkModel.model_id == model_id)
+    if benchmark_name:
+        query = query.filter(BenchmarkModel.benchmark_name == benchmark_name)
+    query = query.order_by(BenchmarkModel.test_date.desc().nulls_last(), BenchmarkModel.id.desc())
+    return query.offset(skip).limit(limit).all()
+
+@router.get("/{model_id}/pricing", response_model=List[Pricing])
+def get_model_pricing(
+    model_id: int,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    price_type: Optional[str] = Query(None, description="Filter by price type"),
+    db: Session = Depends(get_db)
+):
+    """Get the full pricing history of a model, newest first"""
+    if not reference_cache.model_exists(db, model_id):
+        raise HTTPException(status_code=404, detail="Model not found")
+    query = db.query(PricingModel).filter(PricingModel.model_id == model_id)
+    if price_type:
+        query = query.filter(PricingModel.price_type == price_type)
+    query = query.order_by(PricingModel.valid_from.desc(), PricingModel.id.desc())
+    return query.offset(skip).limit(limit).all()
+
+@router.get("/{model_id}/similar", response_model=List[SimilarModel])
+def get_similar_models(
+    model_id: int,
+    k: int = Query(10, ge=1, le=similarity_index.max_neighbours, description="Number of neighbours"),
+    db: Session = Depends(get_db)
+):
+    """Get the models closest to a model by benchmarks, price, context window and type"""
+    neighbours = similarity_index.neighbours(db, model_id, k)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    models = db.query(ModelModel).filter(ModelModel.id.in_([other_id for other_id, _ in neighbours])).all()
+    models_by_id = {model.id: model for model in models}
+    return [
+        SimilarModel(**Model.model_validate(models_by_id[other_id], from_attributes=True).model_dump(), distance=distance)
+        for other_id, distance in neighbours
+        if other_id in models_by_id
+    ]
 
 @router.post("/", response_model=Model, status_code=status.HTTP_201_CREATED)
 def create_model(model: ModelCreate, db: Session = Depends(get_db)):
     """Create a new model"""
     # Check if provider exists
-    provider = db.query(ProviderModel).filter(ProviderModel.id == model.provider_id).first()
-    if not provider:
+    if not reference_cache.provider_exists(db, model.provider_id):
         raise HTTPException(status_code=400, detail="Provider not found")
     
     # Check if model with same name and provider already exists
-    existing_model = db.query(ModelModel).filter(
-        ModelModel.name == model.name,
-        ModelModel.provider_id == model.provider_id
-    ).first()
-    if existing_model:
+    if reference_cache.model_id_by_name(db, model.name, model.provider_id) is not None:
         raise HTTPException(status_code=400, detail="Model with this name already exists for this provider")
     
     # Convert to dict and map fields
@@ -70,8 +151,7 @@ def update_model(model_id: int, model: ModelUpdate, db: Session = Depends(get_db
     
     # Check if provider exists if provider_id is being updated
     if "provider_id" in update_data:
-        provider = db.query(ProviderModel).filter(ProviderModel.id == update_data["provider_id"]).first()
-        if not provider:
+        if not reference_cache.provider_exists(db, update_data["provider_id"]):
             raise HTTPException(status_code=400, detail="Provider not found")
     
     for field, value in update_data.items():
@@ -82,12 +162,16 @@ def update_model(model_id: int, model: ModelUpdate, db: Session = Depends(get_db
     return db_model
 
 @router.delete("/{model_id}")
-def delete_model(model_id: int, db: Session = Depends(get_db)):
-    """Delete a model"""
-    db_model = db.query(ModelModel).filter(ModelModel.id == model_id).first()
-    if not db_model:
+def delete_model(
+    model_id: int,
+    dry_run: bool = Query(False, description="Report the rows that would be deleted without deleting them"),
+    db: Session = Depends(get_db)
+):
+    """Delete a model with its benchmarks, pricing and comparison items"""
+    counts = deletion.delete_model(db, model_id, dry_run=dry_run)
+    if counts is None:
         raise HTTPException(status_code=404, detail="Model not found")
     
-    db.delete(db_model)
-    db.commit()
-    return {"message": "Model deleted successfully"}
\ No newline at end of file
+    if dry_run:
+        return {"dry_run": True, "would_delete": counts}
+    return {"message": "Model deleted successfully", "deleted": counts}
\ No newline at end of file
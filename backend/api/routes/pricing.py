@@ -3,10 +3,18 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from backend.database.base import get_db
+from backend.api.routing import QueuedWriteRoute
+from backend.api.fieldsets import Fieldset, Relation
 from backend.models import Pricing as PricingModel, Model as ModelModel
-from backend.schemas import Pricing, PricingCreate, PricingUpdate
+from backend.schemas import Pricing, PricingCreate, PricingUpdate, PricingSeries, PricingChange, Model
+from backend.services.reference_cache import reference_cache
+from backend.services.timeseries_service import pricing_history, effective_price_changes
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
+
+PRICING_RELATIONS = {
+    "model": Relation(Model, ModelModel, local_key="model_id", many=False),
+}
 
 @router.get("/", response_model=List[Pricing])
 def get_pricing(
@@ -15,10 +23,13 @@ def get_pricing(
     model_id: Optional[int] = Query(None, description="Filter by model ID"),
     price_type: Optional[str] = Query(None, description="Filter by price type"),
     valid_date: Optional[date] = Query(None, description="Filter by validity date"),
+    fields: Optional[str] = Query(None, description="Comma-separated pricing fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: model"),
     db: Session = Depends(get_db)
 ):
     """Get all pricing with optional filtering"""
-    query = db.query(PricingModel)
+    fieldset = Fieldset(Pricing, PricingModel, fields, include, PRICING_RELATIONS)
+    query = fieldset.select() if fieldset.active else db.query(PricingModel)
     
     if model_id:
         query = query.filter(PricingModel.model_id == model_id)
@@ -30,17 +41,23 @@ def get_pricing(
             (PricingModel.valid_to.is_(None)) | (PricingModel.valid_to >= valid_date)
         )
     
+    if fieldset.active:
+        return fieldset.respond(db, query.offset(skip).limit(limit))
+
     pricing = query.offset(skip).limit(limit).all()
     return pricing
 
 @router.get("/current", response_model=List[Pricing])
 def get_current_pricing(
     model_id: Optional[int] = Query(None, description="Filter by model ID"),
+    fields: Optional[str] = Query(None, description="Comma-separated pricing fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: model"),
     db: Session = Depends(get_db)
 ):
     """Get current pricing (valid today)"""
     today = date.today()
-    query = db.query(PricingModel).filter(
+    fieldset = Fieldset(Pricing, PricingModel, fields, include, PRICING_RELATIONS)
+    query = (fieldset.select() if fieldset.active else db.query(PricingModel)).filter(
         PricingModel.valid_from <= today,
         (PricingModel.valid_to.is_(None)) | (PricingModel.valid_to >= today)
     )
@@ -48,8 +65,36 @@ def get_current_pricing(
     if model_id:
         query = query.filter(PricingModel.model_id == model_id)
     
+    if fieldset.active:
+        return fieldset.respond(db, query)
+
     return query.all()
 
+@router.get("/history", response_model=List[PricingSeries])
+def get_pricing_history(
+    model_ids: List[int] = Query(..., description="Model IDs to include"),
+    price_type: Optional[str] = Query(None, description="Filter by price type"),
+    start: Optional[date] = Query(None, description="First date of the range"),
+    end: Optional[date] = Query(None, description="Last date of the range"),
+    points: Optional[int] = Query(None, ge=2, le=10000, description="Maximum points per series"),
+    db: Session = Depends(get_db)
+):
+    """Get price change points per model, optionally downsampled to a point budget"""
+    return pricing_history(db, model_ids, price_type, start, end, points)
+
+@router.get("/diff", response_model=List[PricingChange])
+def get_pricing_diff(
+    from_date: date = Query(..., alias="from", description="Earlier date (YYYY-MM-DD)"),
+    to_date: date = Query(..., alias="to", description="Later date (YYYY-MM-DD)"),
+    model_id: Optional[int] = Query(None, description="Filter by model ID"),
+    price_type: Optional[str] = Query(None, description="Filter by price type"),
+    db: Session = Depends(get_db)
+):
+    """Get every effective price that changed between two dates"""
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    return effective_price_changes(db, from_date, to_date, model_id, price_type)
+
 @router.get("/{pricing_id}", response_model=Pricing)
 def get_pricing_item(pricing_id: int, db: Session = Depends(get_db)):
     """Get a specific pricing item"""
@@ -65,8 +110,7 @@ def create_pricing(pricing: PricingCreate, db: Session = Depends(get_db)):
     pricing_data = pricing.dict()
     
     # Check if model exists
-    model = db.query(ModelModel).filter(ModelModel.id == pricing_data['model_id']).first()
-    if not model:
+    if not reference_cache.model_exists(db, pricing_data['model_id']):
         raise HTTPException(status_code=400, detail="Model not found")
     
     db_pricing = PricingModel(**pricing_data)
@@ -86,8 +130,7 @@ def update_pricing(pricing_id: int, pricing: PricingUpdate, db: Session = Depend
     
     # Check if model exists if model_id is being updated
     if "model_id" in update_data:
-        model = db.query(ModelModel).filter(ModelModel.id == update_data["model_id"]).first()
-        if not model:
+        if not reference_cache.model_exists(db, update_data["model_id"]):
             raise HTTPException(status_code=400, detail="Model not found")
     
     for field, value in update_data.items():
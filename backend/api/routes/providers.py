@@ -1,32 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend.database.base import get_db
-from backend.models import Provider as ProviderModel
-from backend.schemas import Provider, ProviderCreate, ProviderUpdate, ProviderWithModels
+from backend.api.routing import QueuedWriteRoute
+from backend.api.fieldsets import Fieldset, Relation
+from backend.models import Provider as ProviderModel, Model as ModelModel
+from backend.schemas import Provider, ProviderCreate, ProviderUpdate, ProviderWithModels, Model
+from backend.schemas.model import ModelBase
+from backend.services.reference_cache import reference_cache
+from backend.services import deletion
 
-router = APIRouter()
+router = APIRouter(route_class=QueuedWriteRoute)
+
+PROVIDER_RELATIONS = {
+    "models": Relation(ModelBase, ModelModel, local_key="id", remote_key="provider_id"),
+}
 
 @router.get("/", response_model=List[Provider])
-def get_providers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_providers(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated provider fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: models"),
+    db: Session = Depends(get_db)
+):
     """Get all providers"""
+    fieldset = Fieldset(Provider, ProviderModel, fields, include, PROVIDER_RELATIONS)
+    if fieldset.active:
+        return fieldset.respond(db, fieldset.select().offset(skip).limit(limit))
+
     providers = db.query(ProviderModel).offset(skip).limit(limit).all()
     return providers
 
 @router.get("/{provider_id}", response_model=ProviderWithModels)
-def get_provider(provider_id: int, db: Session = Depends(get_db)):
-    """Get a specific provider with their models"""
+def get_provider(
+    provider_id: int,
+    models_limit: int = Query(100, ge=0, le=1000, description="Maximum number of models to embed"),
+    db: Session = Depends(get_db)
+):
+    """Get a specific provider with their first models (all of them via /models)"""
     provider = db.query(ProviderModel).filter(ProviderModel.id == provider_id).first()
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
-    return provider
+    models = db.query(ModelModel).filter(ModelModel.provider_id == provider_id).order_by(ModelModel.id).limit(models_limit).all()
+    return {**Provider.model_validate(provider, from_attributes=True).model_dump(), "models": models}
+
+@router.get("/{provider_id}/models", response_model=List[Model])
+def get_provider_models(
+    provider_id: int,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get the models of a provider"""
+    if not reference_cache.provider_exists(db, provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
+    query = db.query(ModelModel).filter(ModelModel.provider_id == provider_id).order_by(ModelModel.id)
+    return query.offset(skip).limit(limit).all()
 
 @router.post("/", response_model=Provider, status_code=status.HTTP_201_CREATED)
 def create_provider(provider: ProviderCreate, db: Session = Depends(get_db)):
     """Create a new provider"""
     # Check if provider with same name already exists
-    existing_provider = db.query(ProviderModel).filter(ProviderModel.name == provider.name).first()
-    if existing_provider:
+    if reference_cache.provider_id_by_name(db, provider.name) is not None:
         raise HTTPException(status_code=400, detail="Provider with this name already exists")
     
     db_provider = ProviderModel(**provider.dict())
@@ -51,12 +87,16 @@ def update_provider(provider_id: int, provider: ProviderUpdate, db: Session = De
     return db_provider
 
 @router.delete("/{provider_id}")
-def delete_provider(provider_id: int, db: Session = Depends(get_db)):
-    """Delete a provider"""
-    db_provider = db.query(ProviderModel).filter(ProviderModel.id == provider_id).first()
-    if not db_provider:
+def delete_provider(
+    provider_id: int,
+    dry_run: bool = Query(False, description="Report the rows that would be deleted without deleting them"),
+    db: Session = Depends(get_db)
+):
+    """Delete a provider with its models and their benchmarks, pricing and comparison items"""
+    counts = deletion.delete_provider(db, provider_id, dry_run=dry_run)
+    if counts is None:
         raise HTTPException(status_code=404, detail="Provider not found")
     
-    db.delete(db_provider)
-    db.commit()
-    return {"message": "Provider deleted successfully"}
\ No newline at end of file
+    if dry_run:
+        return {"dry_run": True, "would_delete": counts}
+    return {"message": "Provider deleted successfully", "deleted": counts}
\ No newline at end of file
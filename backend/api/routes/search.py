@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from backend.database.base import get_db
+from backend.schemas import SearchResults
+from backend.services.search_service import prefix_index, full_text_search
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=1, description="Search text"),
+    types: Optional[str] = Query(None, description="Comma-separated kinds: provider, model, benchmark"),
+    limit: int = Query(10, ge=1, le=100),
+    suggest_only: bool = Query(False, description="Only return typeahead suggestions"),
+    db: Session = Depends(get_db)
+):
+    """Search models, providers and benchmarks by name and notes"""
+    kinds = {kind.strip() for kind in types.split(",") if kind.strip()} if types else None
+    suggestion_kinds = None
+    if kinds:
+        suggestion_kinds = {"benchmark_name" if kind == "benchmark" else kind for kind in kinds}
+
+    suggestions = prefix_index.complete(db, q, limit, suggestion_kinds)
+    results = [] if suggest_only else full_text_search(db, q, limit, kinds)
+    return SearchResults(query=q, suggestions=suggestions, results=results)
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import date
+import gzip
+import os
+import re
+from backend.api.compression import ETAG_SUFFIXES, accepts_encoding, strip_etag_suffix
+from backend.database.base import SessionLocal
+from backend.services.single_flight import SingleFlight
+from backend.services.snapshot_service import Snapshot, comparison_snapshots
+
+router = APIRouter()
+
+SNAPSHOT_FILE = re.compile(r"comparison-\d+-([0-9a-f]{16})\.json\.gz")
+
+class SnapshotFileResponse(FileResponse):
+    """FileResponse that hands the path to the server when it supports the ASGI pathsend
+    extension, so the body is sent by the server without passing through Python"""
+
+    async def __call__(self, scope, receive, send):
+        if "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+        await super().__call__(scope, receive, send)
+
+def _serve(request: Request, filename: str, headers: dict) -> Response:
+    """The gzipped file as is, or decompressed for the rare client that refuses gzip"""
+    path = comparison_snapshots.path(filename)
+    stat_result = os.stat(path)
+    etag = '"' + SNAPSHOT_FILE.fullmatch(filename).group(1) + '"'
+    gzipped = accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+    headers = {**headers, "etag": etag[:-1] + ETAG_SUFFIXES["gzip"] + '"' if gzipped else etag, "vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [strip_etag_suffix(candidate.strip()) for candidate in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        return SnapshotFileResponse(path, media_type="application/json", headers={**headers, "content-encoding": "gzip"}, stat_result=stat_result)
+    with open(path, "rb") as file:
+        return Response(gzip.decompress(file.read()), media_type="application/json", headers=headers)
+
+# Views of a table that is not published yet share one publish
+publishes = SingleFlight("snapshot")
+
+def _publish(table_id: int) -> Optional[Snapshot]:
+    with SessionLocal() as db:
+        return comparison_snapshots.publish_table(db, table_id)
+
+@router.get("/comparisons/{table_id}")
+async def get_comparison_snapshot(table_id: int, request: Request):
+    """Public comparison table with its models, current pricing and latest benchmarks, served from its published snapshot"""
+    if not comparison_snapshots.enabled:
+        raise HTTPException(status_code=404, detail="Snapshots are disabled")
+
+    snapshot = comparison_snapshots.current(table_id)
+    # Not published yet, or published before today's pricing took effect
+    republish = snapshot is None or snapshot.as_of != date.today().isoformat()
+    for _ in range(2):
+        if republish:
+            snapshot = await publishes.run(table_id, lambda: run_in_threadpool(_publish, table_id))
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Comparison table not found or not public")
+        try:
+            return _serve(request, snapshot.filename, {
+                "cache-control": "no-cache",
+                "content-location": f"/api/snapshots/files/{snapshot.filename}",
+            })
+        except FileNotFoundError:
+            # Superseded since the manifest was read, or removed from under it; publishing rewrites it
+            republish = True
+    raise HTTPException(status_code=503, detail="Snapshot is being republished", headers={"Retry-After": "1"})
+
+@router.get("/files/{filename}")
+async def get_snapshot_file(filename: str, request: Request):
+    """A snapshot by its content-hashed name; never changes, so it may be cached indefinitely"""
+    if not comparison_snapshots.enabled or not SNAPSHOT_FILE.fullmatch(filename):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    try:
+        return _serve(request, filename, {"cache-control": "public, max-age=31536000, immutable"})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
@@ -0,0 +1,74 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from backend.services.change_feed import FEED_TABLES, changes_since, latest_cursor, in_session
+from backend.services.update_broker import update_broker, format_event
+
+router = APIRouter()
+
+# Tables pushed when the client does not choose
+DEFAULT_STREAM_TABLES = ("models", "benchmarks", "pricing")
+
+# Comment line sent to idle connections so proxies keep them open
+HEARTBEAT_SECONDS = 15
+
+# Change log rows per replay read after a reconnect
+REPLAY_BATCH_SIZE = 500
+
+async def _events(tables, since: Optional[int]):
+    subscription = update_broker.subscribe(tables)
+    try:
+        # Subscribed before reading the cursor, so no change falls in between
+        last_id = since if since is not None else await run_in_threadpool(in_session, latest_cursor)
+        yield format_event("ready", {"cursor": last_id})
+
+        # Replay what a reconnecting client missed
+        while since is not None:
+            feed = await run_in_threadpool(
+                in_session, changes_since, last_id, REPLAY_BATCH_SIZE, sorted(subscription.tables)
+            )
+            for entry in feed["changes"]:
+                yield format_event(entry["table"], entry, entry["id"])
+            last_id = feed["cursor"]
+            if not feed["has_more"]:
+                break
+
+        while True:
+            if subscription.overflowed:
+                # Closing makes EventSource reconnect with Last-Event-ID and replay
+                yield format_event("resync", {"cursor": last_id})
+                return
+            try:
+                change_id, message = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if change_id > last_id:
+                last_id = change_id
+                yield message
+    finally:
+        update_broker.unsubscribe(subscription)
+
+@router.get("/updates")
+async def stream_updates(
+    request: Request,
+    tables: Optional[str] = Query(None, description="Comma-separated tables (default: models, benchmarks, pricing)"),
+    since: Optional[int] = Query(None, ge=0, description="Change cursor to replay from (defaults to Last-Event-ID)"),
+):
+    """Push committed changes as Server-Sent Events"""
+    table_names = [name.strip() for name in tables.split(",") if name.strip()] if tables else list(DEFAULT_STREAM_TABLES)
+    unknown = [name for name in table_names if name not in FEED_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    last_event_id = request.headers.get("last-event-id", "")
+    if since is None and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    return StreamingResponse(
+        _events(table_names, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,37 @@
+import asyncio
+from functools import wraps
+from typing import Callable
+
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
+from backend.database.write_queue import WRITE_QUEUE, write_queue
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def queued(endpoint: Callable) -> Callable:
+    """Run a sync endpoint as a write queue job, on a session of the writer's connection"""
+    @wraps(endpoint)
+    def run(**kwargs):
+        # The request's own session is left unused (it never opens a connection)
+        session_names = [name for name, value in kwargs.items() if isinstance(value, Session)]
+        if not session_names:
+            return endpoint(**kwargs)
+
+        def job(db: Session):
+            return endpoint(**{**kwargs, **{name: db for name in session_names}})
+
+        return write_queue.run(job)
+    return run
+
+class QueuedWriteRoute(APIRoute):
+    """Route class that sends sync write endpoints through the write queue when WRITE_QUEUE is set.
+
+    Endpoints keep their own commit() calls, which then commit savepoints of
+    the writer's batch transaction. Reads are unaffected.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if WRITE_QUEUE and self.methods & WRITE_METHODS and not asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = queued(self.dependant.call)
+        return super().get_route_handler()
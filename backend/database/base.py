@@ -1,30 +1,242 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from fastapi import Request
 import os
+import time
+from backend.database import events
+from backend.database.slow_queries import slow_query_log
+from backend.services import metrics
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Database URL - defaults to SQLite for local development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./llm_comp.db")
+# Optional read-only replica; GET requests read from it
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=True  # Set to False in production
-)
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+# Engine profile. SQL echo is on by default only in development;
+# DB_ECHO=debug also logs result rows.
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+DB_ECHO = os.getenv("DB_ECHO", "true" if ENVIRONMENT == "development" else "false").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", True)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables
+# Reads go to the primary for this long after a local write, so a lagging
+# replica does not serve (and the response cache keep) pre-write data
+DB_REPLICA_MIN_LAG_SECONDS = float(os.getenv("DB_REPLICA_MIN_LAG_SECONDS", "2"))
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def _statement_timeout_args(url, timeout_ms: int) -> dict:
+    if timeout_ms and url.get_backend_name() == "postgresql":
+        return {"options": f"-c statement_timeout={timeout_ms}"}
+    return {}
+
+def _install_sqlite_statement_timeout(engine, timeout_ms: int) -> None:
+    # SQLite has no statement timeout; a progress handler interrupts statements past their deadline
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        connection_record.info["deadline"] = None
+
+        def check_deadline():
+            deadline = connection_record.info.get("deadline")
+            return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+        dbapi_connection.set_progress_handler(check_deadline, 10000)
+
+    # Connection.info is the connection record's info dict seen by the handler
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["deadline"] = time.monotonic() + timeout_ms / 1000
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        conn.info["deadline"] = None
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.db_pool_timeouts.inc(engine=self.metrics_name)
+            raise
+        finally:
+            metrics.db_pool_wait.observe(time.perf_counter() - started, engine=self.metrics_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+def _instrument(engine, name: str) -> None:
+    """Record statement counts, time and errors of an engine in the metrics registry,
+    and statements over the slow-query threshold in the slow-query log"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["statement_started"].pop()
+        metrics.observe_statement(name, seconds)
+        slow_query_log.observe(name, conn, cursor, statement, parameters, executemany, seconds)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("statement_started") if context.connection is not None else None
+        if started:
+            started.pop()
+        metrics.db_errors.inc(engine=name, error=type(context.original_exception).__name__)
+
+def pool_status(engine) -> dict:
+    """Checked-out connections against the pool's capacity"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": None, "checked_out": None, "overflow": None, "saturation": None}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(pool.checkedout() / capacity, 3) if capacity else None,
+    }
+
+def check_database(engine) -> dict:
+    """Reachability and round-trip time of a database, plus its pool status"""
+    status = pool_status(engine)
+    if status["saturation"] is not None and status["saturation"] >= 1:
+        # A probe would wait for pool_timeout behind the requests already queued
+        return {"reachable": None, "pool": status}
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
+    except Exception as exc:
+        return {"reachable": False, "error": type(exc).__name__, "pool": status}
+    return {"reachable": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2), "pool": status}
+
+def make_engine(database_url: str, name: str = "primary", **overrides):
+    """Engine configured from the DB_* environment profile; name labels its metrics"""
+    url = make_url(database_url)
+    sqlite = url.get_backend_name() == "sqlite"
+    options = {
+        "echo": "debug" if DB_ECHO == "debug" else DB_ECHO in ("1", "true", "yes"),
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"check_same_thread": False} if sqlite else _statement_timeout_args(url, DB_STATEMENT_TIMEOUT_MS),
+    }
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            poolclass=TimedQueuePool,
+        )
+    options.update(overrides)
+    new_engine = create_engine(url, **options)
+    if isinstance(new_engine.pool, TimedQueuePool):
+        new_engine.pool.metrics_name = name
+    _instrument(new_engine, name)
+    if sqlite:
+        event.listen(new_engine, "connect", set_sqlite_pragmas)
+        if DB_STATEMENT_TIMEOUT_MS:
+            _install_sqlite_statement_timeout(new_engine, DB_STATEMENT_TIMEOUT_MS)
+    return new_engine
+
+# WAL lets readers proceed while a writer commits; busy_timeout waits for the
+# write lock instead of failing with "database is locked". SQLite only
+# enforces REFERENCES and ON DELETE CASCADE when foreign_keys is on.
+SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "temp_store": "MEMORY",
+    "cache_size": "-16000",  # KiB
+}
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+# Create engines
+engine = make_engine(DATABASE_URL)
+replica_engine = make_engine(DATABASE_REPLICA_URL, name="replica") if DATABASE_REPLICA_URL else None
+
+def _pool_gauge(key: str):
+    def collect():
+        values = {}
+        for name, bound in (("primary", engine), ("replica", replica_engine)):
+            value = pool_status(bound)[key] if bound is not None else None
+            if value is not None:
+                values[(name,)] = value
+        return values
+    return collect
+
+metrics.registry.gauge("db_pool_size", "Connections the pool keeps open", ("engine",), _pool_gauge("size"))
+metrics.registry.gauge("db_pool_checked_out", "Connections currently checked out", ("engine",), _pool_gauge("checked_out"))
+metrics.registry.gauge("db_pool_overflow", "Connections open beyond the pool size", ("engine",), _pool_gauge("overflow"))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+
+# Notify registered listeners (caches, indexes) about committed changes
+events.install(SessionLocal)
+
+_last_write = float("-inf")
+
+def _note_write(changes) -> None:
+    global _last_write
+    _last_write = time.monotonic()
+
+events.register_listener(_note_write)
+
+def _reject_replica_flush(session, flush_context, instances):
+    raise RuntimeError("Replica sessions are read-only; write through a primary session")
+
+if ReplicaSessionLocal is not None:
+    event.listen(ReplicaSessionLocal, "before_flush", _reject_replica_flush)
 
 # Create Base class
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+def _session_factory(request: Request = None):
+    if ReplicaSessionLocal is None or request is None or request.method not in ("GET", "HEAD"):
+        return SessionLocal
+    if time.monotonic() - _last_write < DB_REPLICA_MIN_LAG_SECONDS:
+        return SessionLocal
+    return ReplicaSessionLocal
+
+# Dependency to get DB session (GET requests use the replica when configured)
+def get_db(request: Request = None):
+    factory = _session_factory(request)
+    if factory is ReplicaSessionLocal:
+        # The replica may lag more than the window: keep the response out of the response cache
+        request.state.db_replica = True
+    db = factory()
     try:
         yield db
     finally:
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Set
+import logging
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Change:
+    """A committed insert, update or delete of a single row"""
+    table: str
+    op: str  # 'insert', 'update', 'delete'
+    id: Any
+    data: Dict[str, Any] = field(default_factory=dict, compare=False)
+    previous: Dict[str, Any] = field(default_factory=dict, compare=False)  # old values of updated columns
+    # Rows of other tables deleted along with this one, counted per table
+    # instead of recorded one by one; listeners expand it as they need
+    cascade: Dict[str, int] = field(default_factory=dict, compare=False)
+
+def changed_tables(changes: Iterable[Change]) -> Set[str]:
+    """Tables written by the changes, including those cleared by cascades"""
+    tables = set()
+    for change in changes:
+        tables.add(change.table)
+        tables.update(table for table, count in change.cascade.items() if count)
+    return tables
+
+_listeners: List[Callable[[List[Change]], None]] = []
+_journals: List[Callable[[Session, List[Change]], None]] = []
+
+def register_listener(listener: Callable[[List[Change]], None]) -> None:
+    """Register a callback that receives the changes of every committed transaction"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def register_journal(journal: Callable[[Session, List[Change]], None]) -> None:
+    """Register a callback that persists changes inside the transaction that makes them"""
+    if journal not in _journals:
+        _journals.append(journal)
+
+def _snapshot(instance) -> Dict[str, Any]:
+    state = inspect(instance)
+    return {
+        column.key: state.dict[column.key]
+        for column in state.mapper.column_attrs
+        if column.key in state.dict
+    }
+
+def _previous(instance) -> Dict[str, Any]:
+    state = inspect(instance)
+    return {
+        column.key: state.committed_state[column.key]
+        for column in state.mapper.column_attrs
+        if column.key in state.committed_state
+    }
+
+def _record(session: Session, changes: List[Change]) -> None:
+    if not changes:
+        return
+    session.info.setdefault("pending_changes", []).extend(changes)
+    # Journals write in the same transaction, so their failure fails the write
+    for journal in _journals:
+        journal(session, changes)
+
+def record_change(
+    session: Session, table: str, op: str, id: Any, data: Dict[str, Any] = None, previous: Dict[str, Any] = None, cascade: Dict[str, int] = None
+) -> None:
+    """Record a change the ORM cannot see (e.g. bulk statements) for the current transaction"""
+    _record(session, [Change(table, op, id, data or {}, previous or {}, cascade or {})])
+
+def _after_flush(session: Session, flush_context) -> None:
+    changes = []
+    for op, instances in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for instance in instances:
+            if op == "update" and not session.is_modified(instance, include_collections=False):
+                continue
+            table = getattr(instance, "__tablename__", None)
+            if table is None:
+                continue
+            primary_key = inspect(instance).mapper.primary_key_from_instance(instance)
+            previous = _previous(instance) if op == "update" else {}
+            changes.append(Change(table, op, primary_key[0], _snapshot(instance), previous))
+    _record(session, changes)
+
+def dispatch(changes: List[Change]) -> None:
+    """Hand committed changes to the registered listeners"""
+    for listener in list(_listeners):
+        try:
+            listener(changes)
+        except Exception:
+            logger.exception("Change listener %r failed", listener)
+
+def _after_commit(session: Session) -> None:
+    changes = session.info.pop("pending_changes", None)
+    if not changes:
+        return
+    deferred = session.info.get("deferred_changes")
+    if deferred is not None:
+        # The session committed a savepoint of a larger transaction, whose owner
+        # dispatches once that transaction is durable
+        deferred.extend(changes)
+        return
+    dispatch(changes)
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("pending_changes", None)
+
+def install(session_factory) -> None:
+    """Attach change tracking to a sessionmaker"""
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
@@ -0,0 +1,203 @@
+"""Synthetic catalog generator for load and performance testing.
+
+Fills an empty, migrated database with providers, models, benchmarks,
+pricing timelines and comparison tables at a chosen scale. The output is
+reproducible: the same scale and seed give the same rows. Rows are written
+with Core bulk inserts in chunks, bypassing the ORM change tracking, so
+nothing is added to the change log.
+
+    python -m backend.database.generate_data --scale large
+    python -m backend.database.generate_data --models 1000 --benchmarks 50000
+"""
+import argparse
+import datetime
+import random
+import time
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from backend.database.base import engine
+from backend.models import Benchmark, ComparisonItem, ComparisonTable, Model, Pricing, Provider, WebSource
+
+@dataclass(frozen=True)
+class Scale:
+    providers: int
+    models: int
+    pricing: int
+    benchmarks: int
+    comparison_tables: int
+    web_sources: int
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(providers=10, models=500, pricing=10_000, benchmarks=20_000, comparison_tables=200, web_sources=50),
+    "medium": Scale(providers=25, models=5_000, pricing=200_000, benchmarks=500_000, comparison_tables=2_000, web_sources=200),
+    "large": Scale(providers=50, models=20_000, pricing=2_000_000, benchmarks=5_000_000, comparison_tables=10_000, web_sources=1_000),
+}
+
+CHUNK_SIZE = 5_000
+
+MODEL_TYPES = ("text", "multimodal", "image", "embedding", "audio")
+MODEL_FAMILIES = ("Atlas", "Nova", "Orion", "Lyra", "Vega", "Helix", "Quill", "Sable", "Tern", "Zephyr")
+PRICE_TYPES = ("input_tokens", "output_tokens", "cached_input_tokens", "requests")
+BENCHMARK_NAMES = (
+    "MMLU", "MMLU-Pro", "GSM8K", "MATH", "HumanEval", "MBPP", "HellaSwag", "ARC-Challenge", "TruthfulQA",
+    "WinoGrande", "DROP", "GPQA", "BBH", "IFEval", "MGSM", "MMMU", "MathVista", "ChartQA", "DocVQA", "SWE-bench",
+)
+START_DATE = datetime.date(2022, 1, 1)
+
+def _chunks(rows: Iterable[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _insert(connection: Connection, table, rows: Iterable[dict]) -> int:
+    count = 0
+    for chunk in _chunks(rows):
+        connection.execute(table.insert(), chunk)
+        count += len(chunk)
+    return count
+
+def _spread(total: int, buckets: int) -> Iterator[int]:
+    """Split total into buckets counts that differ by at most one"""
+    base, extra = divmod(total, buckets)
+    for index in range(buckets):
+        yield base + (1 if index < extra else 0)
+
+def _provider_rows(scale: Scale) -> Iterator[dict]:
+    for index in range(scale.providers):
+        yield {
+            "id": index + 1,
+            "name": f"Provider {index + 1:03d}",
+            "description": f"Synthetic provider {index + 1}",
+            "website_url": f"https://provider-{index + 1}.example.com",
+        }
+
+def _model_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    for index in range(scale.models):
+        family = MODEL_FAMILIES[index % len(MODEL_FAMILIES)]
+        yield {
+            "id": index + 1,
+            "name": f"{family} {index + 1}",
+            "provider_id": index % scale.providers + 1,
+            "model_type": rng.choice(MODEL_TYPES),
+            "description": f"Synthetic {family} model number {index + 1}",
+            "release_date": START_DATE + datetime.timedelta(days=rng.randrange(1000)),
+            "context_window": rng.choice((8_192, 32_768, 128_000, 200_000, 1_000_000)),
+        }
+
+def _pricing_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    # Each (model, price type) gets a timeline of consecutive validity periods
+    model_id = 0
+    for per_model in _spread(scale.pricing, scale.models):
+        model_id += 1
+        price_types = PRICE_TYPES[:max(1, min(len(PRICE_TYPES), per_model))]
+        for price_type, periods in zip(price_types, _spread(per_model, len(price_types))):
+            price = Decimal(rng.randrange(50, 60_000)) / 1000
+            valid_from = START_DATE + datetime.timedelta(days=rng.randrange(90))
+            for period in range(periods):
+                length = rng.randrange(20, 90)
+                last = period == periods - 1
+                yield {
+                    "model_id": model_id,
+                    "price_type": price_type,
+                    "price": price,
+                    "currency": "USD",
+                    "unit": "per_request" if price_type == "requests" else "per_million_tokens",
+                    "valid_from": valid_from,
+                    "valid_to": None if last else valid_from + datetime.timedelta(days=length - 1),
+                }
+                valid_from += datetime.timedelta(days=length)
+                price = max(Decimal("0.01"), (price * Decimal(rng.uniform(0.6, 1.1))).quantize(Decimal("0.000001")))
+
+def _benchmark_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    model_id = 0
+    for per_model in _spread(scale.benchmarks, scale.models):
+        model_id += 1
+        names = rng.sample(BENCHMARK_NAMES, min(len(BENCHMARK_NAMES), max(1, per_model)))
+        for name, runs in zip(names, _spread(per_model, len(names))):
+            score = rng.uniform(20, 80)
+            test_date = START_DATE + datetime.timedelta(days=rng.randrange(60))
+            for _ in range(runs):
+                yield {
+                    "model_id": model_id,
+                    "benchmark_name": name,
+                    "score": Decimal(f"{score:.4f}"),
+                    "unit": "accuracy",
+                    "test_date": test_date,
+                    "notes": f"{rng.choice((0, 3, 5, 8))}-shot",
+                }
+                test_date += datetime.timedelta(days=rng.randrange(7, 45))
+                score = min(99.9, score + rng.uniform(-1, 3))
+
+def _comparison_table_rows(scale: Scale) -> Iterator[dict]:
+    for index in range(scale.comparison_tables):
+        yield {
+            "id": index + 1,
+            "name": f"Comparison {index + 1}",
+            "description": "Synthetic comparison",
+            "created_by": f"user{index % 97}",
+            "is_public": index % 3 == 0,
+        }
+
+def _comparison_item_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    for table_id in range(1, scale.comparison_tables + 1):
+        model_ids = rng.sample(range(1, scale.models + 1), min(scale.models, rng.randrange(2, 13)))
+        for order, model_id in enumerate(model_ids):
+            yield {"comparison_table_id": table_id, "model_id": model_id, "display_order": order}
+
+def _web_source_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    for index in range(scale.web_sources):
+        yield {
+            "url": f"https://provider-{index % scale.providers + 1}.example.com/pages/{index + 1}",
+            "source_type": rng.choice(("pricing", "benchmark", "both")),
+            "is_active": index % 5 != 0,
+            "scraping_interval_hours": 24,
+        }
+
+def generate(scale: Scale, seed: int = 0, bind=engine, echo=print) -> Dict[str, int]:
+    """Fill an empty database with a synthetic catalog; returns rows written per table"""
+    rng = random.Random(seed)
+    counts = {}
+    with bind.begin() as connection:
+        if connection.execute(select(func.count()).select_from(Provider)).scalar():
+            raise RuntimeError("The database already has providers; generate into an empty database")
+        steps = [
+            (Provider, _provider_rows(scale)),
+            (Model, _model_rows(scale, rng)),
+            (Pricing, _pricing_rows(scale, rng)),
+            (Benchmark, _benchmark_rows(scale, rng)),
+            (ComparisonTable, _comparison_table_rows(scale)),
+            (ComparisonItem, _comparison_item_rows(scale, rng)),
+            (WebSource, _web_source_rows(scale, rng)),
+        ]
+        for entity, rows in steps:
+            started = time.perf_counter()
+            counts[entity.__tablename__] = _insert(connection, entity.__table__, rows)
+            echo(f"{entity.__tablename__:<18} {counts[entity.__tablename__]:>10,} rows  {time.perf_counter() - started:6.1f} s")
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the database (DATABASE_URL) with a synthetic catalog")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    for field in Scale.__dataclass_fields__:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, help=f"override the scale's {field} count")
+    args = parser.parse_args(argv)
+
+    overrides = {field: getattr(args, field) for field in Scale.__dataclass_fields__ if getattr(args, field) is not None}
+    scale = replace(SCALES[args.scale], **overrides)
+
+    from backend.database.init_db import create_tables
+    create_tables()
+    generate(scale, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,63 @@
 from backend.database.base import Base, engine
 from backend.models import Provider, Model, Benchmark, Pricing, ComparisonTable, ComparisonItem, WebSource
+import argparse
 import datetime
+from collections import Counter
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from backend.database.base import SessionLocal
+from backend.database.search_index import create_search_index
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision matching the schema create_all made before migrations existed
+BASELINE_REVISION = "0001"
+
+def alembic_config(connection=None) -> Config:
+    """Alembic configuration, optionally running on an open connection"""
+    config = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def upgrade_schema(bind=engine, revision: str = "head"):
+    """Apply pending migrations; databases made by create_all are stamped at the baseline first"""
+    with bind.connect() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            # Batch migrations rebuild tables by copy and drop, which must not
+            # cascade or check rows halfway; the pragma only applies outside a transaction
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+        try:
+            with connection.begin():
+                config = alembic_config(connection)
+                tables = set(inspect(connection).get_table_names())
+                if "alembic_version" not in tables and "providers" in tables:
+                    command.stamp(config, BASELINE_REVISION)
+                command.upgrade(config, revision)
+            if sqlite:
+                report_foreign_key_violations(connection)
+        finally:
+            if sqlite:
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+                connection.commit()
+
+def report_foreign_key_violations(connection):
+    """Print rows whose references point nowhere; with foreign keys enforced, writes touching them fail"""
+    violations = Counter((table, parent) for table, _, parent, _ in connection.exec_driver_sql("PRAGMA foreign_key_check"))
+    for (table, parent), count in sorted(violations.items()):
+        print(f"Warning: {count} {table} rows reference missing {parent} rows")
+    connection.rollback()
 
 def create_tables():
-    """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade all database tables"""
+    upgrade_schema()
+    # Rebuilt tables lose their triggers; this recreates any that are missing
+    create_search_index(engine)
     print("Database tables created successfully!")
 
 def seed_data():
@@ -58,6 +109,16 @@ def seed_data():
     finally:
         db.close()
 
+def main(argv=None):
+    """Command line: python -m backend.database.init_db [create|seed|all]"""
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema and seed sample data")
+    parser.add_argument("command", nargs="?", choices=("create", "seed", "all"), default="all",
+                        help="create: apply migrations; seed: add sample data if empty; all: both (default)")
+    args = parser.parse_args(argv)
+    if args.command in ("create", "all"):
+        create_tables()
+    if args.command in ("seed", "all"):
+        seed_data()
+
 if __name__ == "__main__":
-    create_tables()
-    seed_data()
\ No newline at end of file
+    main()
\ No newline at end of file
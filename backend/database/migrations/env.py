@@ -0,0 +1,48 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from backend.database.base import Base, engine
+from backend.database.search_index import SEARCH_TABLE
+import backend.models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+
+# create_tables() passes its own connection and keeps the application's logging
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+def include_name(name, type_, parent_names) -> bool:
+    # The full-text index and its shadow tables are managed by search_index.py
+    return not (type_ == "table" and name.startswith(SEARCH_TABLE))
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=Base.metadata,
+        # SQLite can't alter constraints in place; batch mode recreates the table
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=Base.metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations(connection)
+else:
+    with engine.connect() as connection:
+        run_migrations(connection)
@@ -0,0 +1,110 @@
+"""Initial schema, exactly as create_all made it before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        "providers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("website_url", sa.String(500)),
+        *_timestamps(),
+    )
+    op.create_index("ix_providers_id", "providers", ["id"])
+    op.create_index("ix_providers_name", "providers", ["name"], unique=True)
+
+    op.create_table(
+        "comparison_tables",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("created_by", sa.String(255)),
+        sa.Column("is_public", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_comparison_tables_id", "comparison_tables", ["id"])
+
+    op.create_table(
+        "web_sources",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("url", sa.String(500), nullable=False, unique=True),
+        sa.Column("source_type", sa.String(50), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("last_scraped", sa.DateTime(timezone=True)),
+        sa.Column("scraping_interval_hours", sa.Integer()),
+        *_timestamps(),
+    )
+    op.create_index("ix_web_sources_id", "web_sources", ["id"])
+
+    op.create_table(
+        "models",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("provider_id", sa.Integer(), sa.ForeignKey("providers.id"), nullable=False),
+        sa.Column("model_type", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("release_date", sa.Date()),
+        sa.Column("context_window", sa.Integer()),
+        *_timestamps(),
+    )
+    op.create_index("ix_models_id", "models", ["id"])
+
+    op.create_table(
+        "benchmarks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("models.id"), nullable=False),
+        sa.Column("benchmark_name", sa.String(255), nullable=False),
+        sa.Column("score", sa.DECIMAL(10, 4)),
+        sa.Column("unit", sa.String(50)),
+        sa.Column("test_date", sa.Date()),
+        sa.Column("source_url", sa.String(500)),
+        sa.Column("notes", sa.Text()),
+        *_timestamps(),
+    )
+    op.create_index("ix_benchmarks_id", "benchmarks", ["id"])
+
+    op.create_table(
+        "pricing",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("models.id"), nullable=False),
+        sa.Column("price_type", sa.String(50), nullable=False),
+        sa.Column("price", sa.DECIMAL(12, 6), nullable=False),
+        sa.Column("currency", sa.String(3)),
+        sa.Column("unit", sa.String(50), nullable=False),
+        sa.Column("valid_from", sa.Date(), nullable=False),
+        sa.Column("valid_to", sa.Date()),
+        sa.Column("source_url", sa.String(500)),
+        *_timestamps(),
+    )
+    op.create_index("ix_pricing_id", "pricing", ["id"])
+
+    op.create_table(
+        "comparison_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("comparison_table_id", sa.Integer(), sa.ForeignKey("comparison_tables.id"), nullable=False),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("models.id"), nullable=False),
+        sa.Column("display_order", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_comparison_items_id", "comparison_items", ["id"])
+
+def downgrade() -> None:
+    for table in ("comparison_items", "pricing", "benchmarks", "models", "web_sources", "comparison_tables", "providers"):
+        op.drop_table(table)
@@ -0,0 +1,75 @@
+"""Indexes for the hot filters, unique model names per provider, cascading comparison items
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, unique)
+INDEXES = [
+    # Added to create_tables after the baseline schema, so only some stamped databases have them
+    ("idx_models_provider", "models", ["provider_id", "id"], False),
+    ("idx_benchmarks_model_name_date", "benchmarks", ["model_id", "benchmark_name", "test_date"], False),
+    ("idx_pricing_model_type_valid_from", "pricing", ["model_id", "price_type", "valid_from"], False),
+    # New in this revision
+    ("idx_models_type", "models", ["model_type", "id"], False),
+    ("uq_models_name_provider", "models", ["name", "provider_id"], True),
+    ("idx_benchmarks_name_model", "benchmarks", ["benchmark_name", "model_id"], False),
+    ("idx_pricing_type_valid_from", "pricing", ["price_type", "valid_from"], False),
+    ("idx_pricing_dates", "pricing", ["valid_from", "valid_to"], False),
+    ("idx_comparison_tables_public", "comparison_tables", ["is_public", "id"], False),
+    ("idx_comparison_items_table_model", "comparison_items", ["comparison_table_id", "model_id"], False),
+    ("idx_web_sources_active", "web_sources", ["is_active"], False),
+]
+
+ITEMS_FK = "comparison_items_comparison_table_id_fkey"
+
+def _comparison_items(ondelete=None) -> sa.Table:
+    return sa.Table(
+        "comparison_items",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("comparison_table_id", sa.Integer(), sa.ForeignKey("comparison_tables.id", ondelete=ondelete), nullable=False),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("models.id"), nullable=False),
+        sa.Column("display_order", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Index("ix_comparison_items_id", "id"),
+    )
+
+def _set_items_ondelete(ondelete) -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite can't alter a foreign key; rebuild the table with the new definition
+        with op.batch_alter_table("comparison_items", recreate="always", copy_from=_comparison_items(ondelete)):
+            pass
+    else:
+        op.drop_constraint(ITEMS_FK, "comparison_items", type_="foreignkey")
+        op.create_foreign_key(ITEMS_FK, "comparison_items", "comparison_tables", ["comparison_table_id"], ["id"], ondelete=ondelete)
+
+def _check_unique_model_names() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT name, provider_id, count(*) FROM models GROUP BY name, provider_id HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"{name!r} (provider {provider_id}, {count} rows)" for name, provider_id, count in duplicates)
+        raise RuntimeError(f"Duplicate model names within a provider; merge or rename them first: {listed}")
+
+def upgrade() -> None:
+    _check_unique_model_names()
+    _set_items_ondelete("CASCADE")
+
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, unique in INDEXES:
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=unique)
+
+def downgrade() -> None:
+    for name, table, columns, unique in reversed(INDEXES[3:]):
+        op.drop_index(name, table_name=table)
+    _set_items_ondelete(None)
@@ -0,0 +1,21 @@
+"""Index comparison items by model, for deleting a model's items
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Databases made by create_all from the current models are stamped at the baseline but already have it
+    if "idx_comparison_items_model" not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("comparison_items")}:
+        op.create_index("idx_comparison_items_model", "comparison_items", ["model_id"])
+
+def downgrade() -> None:
+    op.drop_index("idx_comparison_items_model", table_name="comparison_items")
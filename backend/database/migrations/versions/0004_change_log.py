@@ -0,0 +1,30 @@
+"""Change log journaling committed writes for the change feed
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Earlier versions of 0001 created it; databases stamped at the baseline lack it
+    if "change_log" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("op", sa.String(10), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("data", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+def downgrade() -> None:
+    op.drop_table("change_log")
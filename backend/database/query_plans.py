@@ -0,0 +1,285 @@
+"""Query-plan regression check for every API route.
+
+Builds a scratch SQLite database through the migrations, seeds it, calls
+each route of the app with its sample request in CHECKED_REQUESTS, and runs
+EXPLAIN QUERY PLAN on every SELECT, UPDATE and DELETE the route issued (and
+on those of the background threads it woke). A plan that scans a whole
+catalog table is reported, and the check fails, unless the route is listed
+in EXPECTED_SCANS. A route without a sample request fails the check too, as
+do foreign keys left dangling by the writes.
+
+    python -m backend.database.query_plans
+"""
+import datetime
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# (method, route path, url, json body) in call order; urls are formatted with
+# the ids from _sample_ids, and deletes come last so they don't starve the reads
+CHECKED_REQUESTS = [
+    ("GET", "/api/providers/", "/api/providers/", None),
+    ("GET", "/api/providers/{provider_id}", "/api/providers/{provider_id}", None),
+    ("GET", "/api/providers/{provider_id}/models", "/api/providers/{provider_id}/models?limit=5", None),
+    ("GET", "/api/models/", "/api/models/?provider_id={provider_id}", None),
+    ("GET", "/api/models/", "/api/models/?model_type=text", None),
+    ("GET", "/api/models/", "/api/models/?provider_id={provider_id}&fields=id,name&include=provider,benchmarks,current_pricing", None),
+    ("GET", "/api/models/{model_id}", "/api/models/{model_id}", None),
+    ("GET", "/api/models/{model_id}/benchmarks", "/api/models/{model_id}/benchmarks?benchmark_name=MMLU", None),
+    ("GET", "/api/models/{model_id}/pricing", "/api/models/{model_id}/pricing?price_type=input_tokens", None),
+    ("GET", "/api/models/{model_id}/similar", "/api/models/{model_id}/similar?k=5", None),
+    ("GET", "/api/benchmarks/", "/api/benchmarks/?model_id={model_id}", None),
+    ("GET", "/api/benchmarks/", "/api/benchmarks/?benchmark_name=MMLU", None),
+    ("GET", "/api/benchmarks/{benchmark_id}", "/api/benchmarks/{benchmark_id}", None),
+    ("GET", "/api/benchmarks/history", "/api/benchmarks/history?model_ids={model_id}&model_ids={other_model_id}&benchmark_name=MMLU", None),
+    ("GET", "/api/pricing/", "/api/pricing/?model_id={model_id}", None),
+    ("GET", "/api/pricing/", "/api/pricing/?price_type=output_tokens", None),
+    ("GET", "/api/pricing/", "/api/pricing/?valid_date=2024-03-01", None),
+    ("GET", "/api/pricing/current", "/api/pricing/current?model_id={model_id}", None),
+    ("GET", "/api/pricing/history", "/api/pricing/history?model_ids={model_id}&model_ids={other_model_id}&price_type=input_tokens", None),
+    ("GET", "/api/pricing/diff", "/api/pricing/diff?from=2024-01-15&to=2024-06-15&model_id={model_id}", None),
+    ("GET", "/api/pricing/{pricing_id}", "/api/pricing/{pricing_id}", None),
+    ("GET", "/api/comparisons/", "/api/comparisons/?is_public=true", None),
+    ("GET", "/api/comparisons/{table_id}", "/api/comparisons/{table_id}", None),
+    ("GET", "/api/search/", "/api/search/?q=gemini", None),
+    ("GET", "/api/search/", "/api/search/?q=plan mod&suggest_only=true", None),
+    ("GET", "/api/changes/", "/api/changes/?since=0&limit=50", None),
+    ("GET", "/api/changes/", "/api/changes/?since=0&tables=pricing&limit=50", None),
+    ("GET", "/api/snapshots/comparisons/{table_id}", "/api/snapshots/comparisons/{public_table_id}", None),
+    ("GET", "/api/snapshots/files/{filename}", "/api/snapshots/files/{snapshot_file}", None),
+    ("GET", "/api/scraper/web-sources", "/api/scraper/web-sources", None),
+    ("GET", "/api/admin/slow-queries", "/api/admin/slow-queries", None),
+    ("POST", "/api/providers/", "/api/providers/", {"name": "Plan Provider New"}),
+    ("POST", "/api/models/", "/api/models/", {"name": "Plan Model New", "provider_id": "{provider_id}"}),
+    ("POST", "/api/benchmarks/", "/api/benchmarks/", {"model_id": "{model_id}", "benchmark_name": "MMLU", "score": 71.0, "test_date": "2024-09-01"}),
+    ("POST", "/api/pricing/", "/api/pricing/", {"model_id": "{model_id}", "price_type": "batch_tokens", "price": 1.5, "unit": "per_million_tokens", "valid_from": "2024-09-01"}),
+    ("POST", "/api/comparisons/", "/api/comparisons/", {"name": "Plan Comparison New", "model_ids": ["{model_id}", "{other_model_id}"]}),
+    ("POST", "/api/comparisons/{table_id}/items", "/api/comparisons/{table_id}/items", {"comparison_table_id": "{table_id}", "model_id": "{spare_model_id}", "display_order": 9}),
+    ("POST", "/api/scraper/web-sources", "/api/scraper/web-sources?url=https://plans.example.com/new&source_type=pricing", None),
+    ("PUT", "/api/providers/{provider_id}", "/api/providers/{provider_id}", {"description": "Updated"}),
+    ("PUT", "/api/models/{model_id}", "/api/models/{model_id}", {"description": "Updated"}),
+    ("PUT", "/api/benchmarks/{benchmark_id}", "/api/benchmarks/{benchmark_id}", {"notes": "Rerun"}),
+    ("PUT", "/api/pricing/{pricing_id}", "/api/pricing/{pricing_id}", {"source_url": "https://example.com/updated"}),
+    ("PUT", "/api/comparisons/{table_id}", "/api/comparisons/{table_id}", {"description": "Updated"}),
+    ("DELETE", "/api/comparisons/{table_id}/items/{item_id}", "/api/comparisons/{table_id}/items/{item_id}", None),
+    ("DELETE", "/api/comparisons/{table_id}", "/api/comparisons/{doomed_table_id}", None),
+    ("DELETE", "/api/benchmarks/{benchmark_id}", "/api/benchmarks/{doomed_benchmark_id}", None),
+    ("DELETE", "/api/pricing/{pricing_id}", "/api/pricing/{doomed_pricing_id}", None),
+    ("DELETE", "/api/models/{model_id}", "/api/models/{doomed_model_id}", None),
+    ("DELETE", "/api/providers/{provider_id}", "/api/providers/{doomed_provider_id}", None),
+    ("DELETE", "/api/scraper/web-sources/{source_id}", "/api/scraper/web-sources/{doomed_source_id}", None),
+    ("DELETE", "/api/admin/slow-queries", "/api/admin/slow-queries", None),
+]
+
+# Routes that cannot be driven in-process, with the reason
+SKIPPED = {
+    ("POST", "/api/scraper/scrape-url"): "calls an LLM",
+    ("POST", "/api/scraper/scrape-url/stream"): "calls an LLM",
+    ("GET", "/api/stream/updates"): "open-ended event stream",
+}
+
+# Unfiltered pages read tables in primary key order; a scan with LIMIT is the plan.
+# Web sources are listed whole. Similarity reads every model's features by
+# design: the index build, and the scan that answers until it is ready.
+EXPECTED_SCANS: Dict[str, Set[str]] = {
+    "GET /api/providers/": {"providers"},
+    "GET /api/scraper/web-sources": {"web_sources"},
+    "GET /api/models/{model_id}/similar": {"models"},
+    "thread similarity-index": {"models"},
+}
+
+# Threads whose statements are checked under their own name rather than the request's
+BACKGROUND_THREADS = ("similarity-index", "snapshot-publisher")
+
+SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+SEED_PROVIDERS = 12
+SEED_MODELS_PER_PROVIDER = 8
+SEED_BENCHMARK_NAMES = ("MMLU", "GSM8K", "HumanEval", "MATH")
+SEED_PRICE_TYPES = ("input_tokens", "output_tokens")
+SEED_PRICE_PERIODS = (datetime.date(2024, 1, 1), datetime.date(2024, 4, 1), datetime.date(2024, 7, 1))
+
+def seed_catalog(db) -> None:
+    """Add enough rows that every catalog table has more than one page of data"""
+    from backend.models import Benchmark, ComparisonItem, ComparisonTable, Model, Pricing, Provider, WebSource
+
+    model_ids = []
+    for p in range(SEED_PROVIDERS):
+        provider = Provider(name=f"Plan Provider {p}", description="Seeded for query plans")
+        db.add(provider)
+        db.flush()
+        for m in range(SEED_MODELS_PER_PROVIDER):
+            model = Model(name=f"Plan Model {p}-{m}", provider_id=provider.id, model_type=("text", "multimodal")[m % 2])
+            db.add(model)
+            db.flush()
+            model_ids.append(model.id)
+
+    for model_id in model_ids:
+        for name in SEED_BENCHMARK_NAMES:
+            for month in (3, 6):
+                db.add(Benchmark(model_id=model_id, benchmark_name=name, score=50 + model_id % 40, test_date=datetime.date(2024, month, 1)))
+        for price_type in SEED_PRICE_TYPES:
+            for start, end in zip(SEED_PRICE_PERIODS, SEED_PRICE_PERIODS[1:] + (None,)):
+                valid_to = end - datetime.timedelta(days=1) if end else None
+                db.add(Pricing(model_id=model_id, price_type=price_type, price=1 + model_id % 7, unit="per_million_tokens", valid_from=start, valid_to=valid_to))
+
+    for t in range(20):
+        table = ComparisonTable(name=f"Plan Comparison {t}", is_public=t % 2 == 0)
+        db.add(table)
+        db.flush()
+        for order, model_id in enumerate(model_ids[t:t + 5]):
+            db.add(ComparisonItem(comparison_table_id=table.id, model_id=model_id, display_order=order))
+    for w in range(3):
+        db.add(WebSource(url=f"https://plans.example.com/{w}", source_type="pricing"))
+    db.commit()
+
+def _sample_ids(db) -> Dict[str, object]:
+    """Ids for the CHECKED_REQUESTS urls; deleted rows are picked apart from those the other requests use"""
+    from sqlalchemy import func, select
+    from backend.models import Benchmark, ComparisonItem, ComparisonTable, Model, Pricing, Provider, WebSource
+    from backend.services.snapshot_service import comparison_snapshots
+
+    providers = db.scalars(select(Provider.id).where(Provider.name.like("Plan Provider %")).order_by(Provider.id)).all()
+    models = db.scalars(select(Model.id).where(Model.provider_id == providers[0]).order_by(Model.id)).all()
+    # Deleted with its models, which are on comparison tables
+    doomed_provider = providers[1]
+    doomed_model = db.scalar(select(ComparisonItem.model_id).where(ComparisonItem.model_id.in_(
+        select(Model.id).where(Model.provider_id == providers[2])
+    )))
+    tables = db.scalars(select(ComparisonTable.id).where(ComparisonTable.name.like("Plan Comparison %")).order_by(ComparisonTable.id)).all()
+    public_table = db.scalar(select(ComparisonTable.id).where(ComparisonTable.is_public.is_(True)).order_by(ComparisonTable.id))
+    snapshot = comparison_snapshots.publish(db, [public_table])[public_table]
+    other = lambda entity: db.scalar(select(entity.id).where(entity.model_id == models[1]).order_by(entity.id))
+    return {
+        "provider_id": providers[0],
+        "model_id": models[0],
+        "other_model_id": models[1],
+        "spare_model_id": db.scalar(select(func.max(Model.id))),
+        "benchmark_id": db.scalar(select(Benchmark.id).where(Benchmark.model_id == models[0]).order_by(Benchmark.id)),
+        "pricing_id": db.scalar(select(Pricing.id).where(Pricing.model_id == models[0]).order_by(Pricing.id)),
+        "table_id": tables[0],
+        "item_id": db.scalar(select(ComparisonItem.id).where(ComparisonItem.comparison_table_id == tables[0]).order_by(ComparisonItem.id)),
+        "public_table_id": public_table,
+        "snapshot_file": snapshot.filename,
+        "doomed_table_id": tables[-1],
+        "doomed_benchmark_id": other(Benchmark),
+        "doomed_pricing_id": other(Pricing),
+        "doomed_model_id": doomed_model,
+        "doomed_provider_id": doomed_provider,
+        "doomed_source_id": db.scalar(select(WebSource.id).order_by(WebSource.id.desc())),
+    }
+
+def _fill(value, ids: Dict[str, object]):
+    """Format a url or json body template; a string that is just "{name}" becomes the id itself"""
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    if isinstance(value, str):
+        match = re.fullmatch(r"\{(\w+)\}", value)
+        return ids[match.group(1)] if match else value.format(**ids)
+    return value
+
+def uncovered_routes(app) -> List[str]:
+    """API routes without a sample request or a reason to skip them"""
+    covered = {(method, route) for method, route, _, _ in CHECKED_REQUESTS} | set(SKIPPED)
+    return [
+        f"{method} {route.path}"
+        for route in app.routes if route.path.startswith("/api/")
+        for method in sorted(getattr(route, "methods", ()))
+        if (method, route.path) not in covered
+    ]
+
+def full_scans(connection, statement: str, parameters, tables: Set[str]) -> List[str]:
+    """Tables the statement's plan reads in full"""
+    plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    scanned = []
+    for row in plan:
+        match = SCAN.match(row[-1])
+        if match and match.group(1) in tables:
+            scanned.append(match.group(1))
+    return scanned
+
+def check_query_plans() -> Tuple[List[Tuple[str, str, str]], List[str], List[tuple]]:
+    """Run the checked requests; returns (request, table, statement) for each
+    unexpected full scan, the routes without a sample request, and dangling foreign keys"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main
+    from backend.database.base import Base, SessionLocal, engine
+    from backend.database.init_db import create_tables, seed_data
+    from backend.services.reference_cache import reference_cache
+    from backend.services.similarity_service import similarity_index
+    from backend.services.snapshot_service import comparison_snapshots
+
+    create_tables()
+    seed_data()
+    db = SessionLocal()
+    try:
+        seed_catalog(db)
+        ids = _sample_ids(db)
+        # Cache fills read whole tables once by design; load it before capturing
+        reference_cache.model_exists(db, 0)
+    finally:
+        db.close()
+
+    tables = set(Base.metadata.tables)
+    statements: Dict[str, List[tuple]] = defaultdict(list)
+    current: List[Optional[str]] = [None]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        thread = threading.current_thread().name
+        key = f"thread {thread}" if thread in BACKGROUND_THREADS else current[0]
+        if key and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            statements[key].append((statement, parameters))
+
+    with TestClient(main.app, headers={"X-Admin-Token": os.environ["ADMIN_TOKEN"]}) as client:
+        for method, route, url, body in CHECKED_REQUESTS:
+            url, body = _fill(url, ids), _fill(body, ids)
+            current[0] = f"{method} {route}"
+            response = client.request(method, url, json=body)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text}")
+            # Work the request handed to background threads is checked before the next request
+            similarity_index.wait()
+            comparison_snapshots.wait()
+        current[0] = None
+
+    failures = []
+    with engine.connect() as connection:
+        for request, executed in statements.items():
+            for statement, parameters in executed:
+                for table in full_scans(connection, statement, parameters, tables):
+                    if table not in EXPECTED_SCANS.get(request, set()):
+                        failures.append((request, table, statement))
+        dangling = connection.exec_driver_sql("PRAGMA foreign_key_check").all()
+    return failures, uncovered_routes(main.app), dangling
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        # Configure a scratch database before the application modules are imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'plans.db')}"
+        os.environ["DATABASE_REPLICA_URL"] = ""
+        os.environ["DB_ECHO"] = "false"
+        os.environ["WRITE_QUEUE"] = "false"
+        os.environ["SNAPSHOT_DIR"] = os.path.join(directory, "snapshots")
+        os.environ.setdefault("ADMIN_TOKEN", "query-plans")
+        failures, uncovered, dangling = check_query_plans()
+
+    for request, table, statement in failures:
+        print(f"FULL SCAN of {table} in {request}\n    {' '.join(statement.split())}\n")
+    for route in uncovered:
+        print(f"NO SAMPLE REQUEST for {route}")
+    for table, row_id, parent, _ in dangling:
+        print(f"DANGLING FOREIGN KEY in {table} row {row_id} to {parent}")
+    print(f"{len(CHECKED_REQUESTS)} requests checked, {len(failures)} unexpected full table scans")
+    return 1 if failures or uncovered or dangling else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# Full-text index over catalog names and notes (SQLite FTS5, trigram tokenizer).
+# The rowid encodes the source row as id * 4 + kind code, so triggers can
+# maintain the index with rowid lookups instead of scanning it.
+SEARCH_TABLE = "search_index"
+
+KIND_CODES = {"provider": 1, "model": 2, "benchmark": 3}
+
+# (kind, source table, title column, body column)
+INDEXED_SOURCES = [
+    ("provider", "providers", "name", "description"),
+    ("model", "models", "name", "description"),
+    ("benchmark", "benchmarks", "benchmark_name", "notes"),
+]
+
+def _row_values(kind: str, row: str, title: str, body: str) -> str:
+    return (
+        f"{row}.id * 4 + {KIND_CODES[kind]}, '{kind}', {row}.id, "
+        f"{row}.{title}, coalesce({row}.{body}, '')"
+    )
+
+def search_index_ddl() -> list:
+    """DDL statements for the FTS table and the triggers that keep it in sync"""
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        "USING fts5(kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='trigram')"
+    ]
+    for kind, table, title, body in INDEXED_SOURCES:
+        insert = f"INSERT INTO {SEARCH_TABLE}(rowid, kind, ref_id, title, body) VALUES ({_row_values(kind, 'new', title, body)});"
+        delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 4 + {KIND_CODES[kind]};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {title}, {body} ON {table} BEGIN {delete} {insert} END",
+        ]
+    return statements
+
+def create_search_index(engine: Engine) -> bool:
+    """Create and populate the search index; returns False on non-SQLite databases"""
+    if engine.dialect.name != "sqlite":
+        return False
+
+    exists = inspect(engine).has_table(SEARCH_TABLE)
+    with engine.begin() as connection:
+        for statement in search_index_ddl():
+            connection.execute(text(statement))
+        if not exists:
+            # Index rows that were written before the triggers existed
+            for kind, table, title, body in INDEXED_SOURCES:
+                connection.execute(text(
+                    f"INSERT INTO {SEARCH_TABLE}(rowid, kind, ref_id, title, body) "
+                    f"SELECT {_row_values(kind, table, title, body)} FROM {table}"
+                ))
+    return True
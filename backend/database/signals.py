@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.database import events
+
+# Directory shared by all workers of a deployment; unset keeps caches per-process only
+CACHE_SIGNAL_DIR = os.getenv("CACHE_SIGNAL_DIR")
+
+# Marker files are truncated once they grow past this size
+MAX_MARKER_SIZE = 64 * 1024
+
+class ChangeSignal:
+    """Cross-worker change notification through one marker file per table.
+
+    A worker that commits to a table appends to the table's marker file; other
+    workers compare the file's size and modification time with the last ones
+    they saw (the size catches writes within one timestamp tick).
+    Checking costs one stat() call per table, with no database round trip.
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{table}.version")
+
+    def _marker(self, table: str) -> Tuple[int, int]:
+        try:
+            stat = os.stat(self._path(table))
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def publish(self, tables: Iterable[str]) -> None:
+        """Tell other workers that the given tables changed"""
+        if not self.enabled:
+            return
+        # Our own next poll sees the change too; re-invalidating once is cheaper
+        # than risking a missed write from another worker
+        for table in tables:
+            path = self._path(table)
+            mode = "w" if self._marker(table)[1] > MAX_MARKER_SIZE else "a"
+            with open(path, mode) as marker:
+                marker.write(f"{os.getpid()} {time.time_ns()}\n")
+
+    def add_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """Register a callback for tables changed by other workers"""
+        self._listeners.append(listener)
+
+    def poll(self, tables: Iterable[str]) -> Tuple[Tuple[int, int], ...]:
+        """Check the given tables and notify listeners of changes made by other workers.
+
+        Returns the current marker of each table, which every worker sharing
+        the directory reads alike (empty when disabled).
+        """
+        if not self.enabled:
+            return ()
+        changed = set()
+        markers = []
+        with self._lock:
+            for table in tables:
+                marker = self._marker(table)
+                markers.append(marker)
+                previous = self._seen.setdefault(table, marker)
+                if marker != previous:
+                    self._seen[table] = marker
+                    changed.add(table)
+        if changed:
+            for listener in self._listeners:
+                listener(changed)
+        return tuple(markers)
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: publish the tables of every committed transaction"""
+        self.publish(events.changed_tables(changes))
+
+change_signal = ChangeSignal(CACHE_SIGNAL_DIR)
+events.register_listener(change_signal.handle_changes)
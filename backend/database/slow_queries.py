@@ -0,0 +1,106 @@
+import datetime
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, List, Optional
+
+from backend.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are recorded; 0 disables the recorder
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_SLOW_QUERY_BUFFER = int(os.getenv("DB_SLOW_QUERY_BUFFER", "200"))
+
+# Plan statement per dialect; others are recorded without a plan
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+def parameter_shape(parameters) -> Any:
+    """Types of the bound parameters, without their values"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def explain(dialect: str, cursor, statement: str, parameters) -> Optional[List[str]]:
+    """The database's plan for a statement, read on a separate cursor of the same connection"""
+    prefix = EXPLAIN_PREFIXES.get(dialect)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    # A fresh DBAPI cursor bypasses the engine events, so the EXPLAIN is
+    # neither timed nor recorded itself, and leaves the original cursor's rows unread
+    plan_cursor = cursor.connection.cursor()
+    # On PostgreSQL a failed statement aborts the transaction; a savepoint contains it
+    savepoint = dialect == "postgresql"
+    try:
+        if savepoint:
+            plan_cursor.execute("SAVEPOINT slow_query_explain")
+        plan_cursor.execute(prefix + statement, parameters)
+        rows = plan_cursor.fetchall()
+        if savepoint:
+            plan_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception as exc:
+        if savepoint:
+            plan_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        return [f"EXPLAIN failed: {type(exc).__name__}: {exc}"]
+    finally:
+        plan_cursor.close()
+    # SQLite's plan detail is the last column; other databases give one line per row
+    if dialect == "sqlite":
+        return [row[-1] for row in rows]
+    return [" | ".join(str(column) for column in row) for row in rows]
+
+class SlowQueryLog:
+    """Ring buffer of statements that ran longer than the threshold"""
+
+    def __init__(self, threshold_ms: float = DB_SLOW_QUERY_MS, size: int = DB_SLOW_QUERY_BUFFER):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def observe(self, engine_name: str, conn, cursor, statement: str, parameters, executemany: bool, seconds: float) -> None:
+        """Record the statement if it was slow; called from the engine's after_cursor_execute hook"""
+        duration_ms = seconds * 1000
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return
+        request = metrics.current_request.get()
+        entry = {
+            "recorded_at": datetime.datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "engine": engine_name,
+            "route": request.route if request is not None else None,
+            "duration_ms": round(duration_ms, 2),
+            "statement": " ".join(statement.split()),
+            "executemany": executemany,
+            "rows": len(parameters) if executemany else None,
+            "parameters": parameter_shape(parameters[0] if executemany and parameters else parameters),
+            "plan": None if executemany else explain(conn.dialect.name, cursor, statement, parameters),
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning("slow_query %s", json.dumps(entry))
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Recorded statements, newest first"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,134 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.database import events
+from backend.database.base import DATABASE_URL, SessionLocal, engine, make_engine
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: funnel API writes through one writer thread that group-commits them
+WRITE_QUEUE = os.getenv("WRITE_QUEUE", "false").lower() in ("1", "true", "yes")
+# Most writes committed together, and how long the writer waits to fill a batch
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "32"))
+WRITE_BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_WINDOW_MS", "2"))
+
+Job = Tuple[Callable[[Session], Any], Future]
+
+def _writer_engine():
+    if engine.dialect.name != "sqlite":
+        return engine
+    # pysqlite's implicit transactions turn RELEASE of the first savepoint into
+    # a commit; drive BEGIN ourselves so savepoints nest inside one batch
+    writer = make_engine(DATABASE_URL, name="writer", pool_size=1, max_overflow=0)
+
+    @event.listens_for(writer, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(writer, "begin")
+    def _begin(connection):
+        # Take the write lock up front rather than failing to upgrade later
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return writer
+
+class WriteQueue:
+    """Single writer that runs write jobs in batches, one transaction per batch.
+
+    Each job gets its own session bound to the writer's connection and runs
+    inside a savepoint, so a failing job is rolled back alone and its
+    exception is returned to its caller. The batch commits once; change
+    listeners are notified only after that commit.
+    """
+
+    def __init__(self, batch_size: int = WRITE_BATCH_SIZE, window_ms: float = WRITE_BATCH_WINDOW_MS):
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        self._jobs: "queue.Queue[Job]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._engine = None
+
+    def submit(self, job: Callable[[Session], Any]) -> Future:
+        """Queue a job taking a session; the future holds its return value or exception"""
+        future: Future = Future()
+        self._ensure_started()
+        self._jobs.put((job, future))
+        return future
+
+    def run(self, job: Callable[[Session], Any]) -> Any:
+        """Queue a job and wait for its committed result"""
+        return self.submit(job).result()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._engine is None:
+                    self._engine = _writer_engine()
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[Job]:
+        batch = [self._jobs.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._jobs.get(timeout=remaining) if remaining > 0 else self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._run_batch(batch)
+            except Exception as exc:
+                logger.exception("Write batch of %d jobs failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _run_batch(self, batch: List[Job]) -> None:
+        results = []
+        committed_changes: List[events.Change] = []
+        with self._engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                for job, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    # Results outlive the session, so keep their loaded attributes
+                    db = SessionLocal(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+                    db.info["deferred_changes"] = job_changes = []
+                    try:
+                        result = job(db)
+                        db.commit()
+                    except BaseException as exc:
+                        db.rollback()
+                        future.set_exception(exc)
+                        continue
+                    finally:
+                        db.close()
+                        # Savepoints the job committed before failing stay in the batch
+                        committed_changes.extend(job_changes)
+                    results.append((future, result))
+                transaction.commit()
+            except BaseException:
+                transaction.rollback()
+                raise
+        for future, result in results:
+            future.set_result(result)
+        if committed_changes:
+            events.dispatch(committed_changes)
+
+write_queue = WriteQueue()
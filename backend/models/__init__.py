@@ -4,6 +4,7 @@ from .benchmark import Benchmark
 from .pricing import Pricing
 from .comparison import ComparisonTable, ComparisonItem
 from .web_source import WebSource
+from .change_log import ChangeLog
 
 __all__ = [
     "Provider",
@@ -12,5 +13,6 @@ __all__ = [
     "Pricing",
     "ComparisonTable",
     "ComparisonItem",
-    "WebSource"
+    "WebSource",
+    "ChangeLog"
 ]
\ No newline at end of file
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, DECIMAL, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database.base import Base
 
 class Benchmark(Base):
     __tablename__ = "benchmarks"
+    __table_args__ = (
+        # Latest result per benchmark name of a model
+        Index("idx_benchmarks_model_name_date", "model_id", "benchmark_name", "test_date"),
+        # One benchmark across models
+        Index("idx_benchmarks_name_model", "benchmark_name", "model_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     model_id = Column(Integer, ForeignKey("models.id"), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from backend.database.base import Base
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    
+    # The id doubles as the sync cursor of the change feed
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    op = Column(String(10), nullable=False)  # 'insert', 'update', 'delete'
+    row_id = Column(Integer, nullable=False)
+    data = Column(Text)  # JSON of the row after the change; empty for deletes
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
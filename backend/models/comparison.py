@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database.base import Base
 
 class ComparisonTable(Base):
     __tablename__ = "comparison_tables"
+    __table_args__ = (
+        Index("idx_comparison_tables_public", "is_public", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -19,9 +22,15 @@ class ComparisonTable(Base):
 
 class ComparisonItem(Base):
     __tablename__ = "comparison_items"
+    __table_args__ = (
+        # Items of a table, and the duplicate check when adding a model
+        Index("idx_comparison_items_table_model", "comparison_table_id", "model_id"),
+        # Items of a model, when the model is deleted
+        Index("idx_comparison_items_model", "model_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    comparison_table_id = Column(Integer, ForeignKey("comparison_tables.id"), nullable=False)
+    comparison_table_id = Column(Integer, ForeignKey("comparison_tables.id", ondelete="CASCADE"), nullable=False)
     model_id = Column(Integer, ForeignKey("models.id"), nullable=False)
     display_order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database.base import Base
 
 class Model(Base):
     __tablename__ = "models"
+    __table_args__ = (
+        # Models of a provider in id order
+        Index("idx_models_provider", "provider_id", "id"),
+        Index("idx_models_type", "model_type", "id"),
+        # A model name is unique within its provider
+        Index("uq_models_name_provider", "name", "provider_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, DECIMAL, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database.base import Base
 
 class Pricing(Base):
     __tablename__ = "pricing"
+    __table_args__ = (
+        # Current price per price type of a model
+        Index("idx_pricing_model_type_valid_from", "model_id", "price_type", "valid_from"),
+        # One price type across models, and prices valid in a date range
+        Index("idx_pricing_type_valid_from", "price_type", "valid_from"),
+        Index("idx_pricing_dates", "valid_from", "valid_to"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     model_id = Column(Integer, ForeignKey("models.id"), nullable=False)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from backend.database.base import Base
 
 class WebSource(Base):
     __tablename__ = "web_sources"
+    __table_args__ = (
+        Index("idx_web_sources_active", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String(500), nullable=False, unique=True)
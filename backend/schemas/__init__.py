@@ -1,16 +1,20 @@
 # Import order is critical for forward reference resolution
 from .provider import Provider, ProviderCreate, ProviderUpdate, ProviderWithModels
-from .benchmark import Benchmark, BenchmarkCreate, BenchmarkUpdate, BenchmarkBase
-from .pricing import Pricing, PricingCreate, PricingUpdate, PricingBase
-from .model import Model, ModelCreate, ModelUpdate, ModelWithDetails, ModelBase
+from .benchmark import Benchmark, BenchmarkCreate, BenchmarkUpdate, BenchmarkBase, ScorePoint, BenchmarkSeries
+from .pricing import Pricing, PricingCreate, PricingUpdate, PricingBase, PricePoint, PricingSeries, PricingChange
+from .model import Model, ModelCreate, ModelUpdate, ModelWithDetails, ModelBase, SimilarModel
 from .comparison import (
     ComparisonTable, 
     ComparisonTableCreate, 
     ComparisonTableUpdate, 
     ComparisonTableWithItems,
     ComparisonItem,
-    ComparisonItemCreate
+    ComparisonItemCreate,
+    ComparisonSnapshot
 )
+from .search import SearchSuggestion, SearchHit, SearchResults
+from .change import ChangeEntry, ChangeFeed
+from .admin import SlowQuery, SlowQueryLog
 
 # Rebuild schemas to resolve forward references
 Model.model_rebuild()
@@ -21,15 +25,20 @@ ModelWithDetails.model_rebuild(_types_namespace={
     "PricingBase": PricingBase,
 })
 
+ComparisonSnapshot.model_rebuild()
+
 ProviderWithModels.model_rebuild(_types_namespace={
     "ModelBase": ModelBase,
 })
 
 __all__ = [
     "Provider", "ProviderCreate", "ProviderUpdate", "ProviderWithModels",
-    "Model", "ModelCreate", "ModelUpdate", "ModelWithDetails",
-    "Benchmark", "BenchmarkCreate", "BenchmarkUpdate",
-    "Pricing", "PricingCreate", "PricingUpdate",
+    "Model", "ModelCreate", "ModelUpdate", "ModelWithDetails", "SimilarModel",
+    "Benchmark", "BenchmarkCreate", "BenchmarkUpdate", "ScorePoint", "BenchmarkSeries",
+    "Pricing", "PricingCreate", "PricingUpdate", "PricePoint", "PricingSeries", "PricingChange",
     "ComparisonTable", "ComparisonTableCreate", "ComparisonTableUpdate", "ComparisonTableWithItems",
-    "ComparisonItem", "ComparisonItemCreate"
+    "ComparisonItem", "ComparisonItemCreate", "ComparisonSnapshot",
+    "SearchSuggestion", "SearchHit", "SearchResults",
+    "ChangeEntry", "ChangeFeed",
+    "SlowQuery", "SlowQueryLog"
 ]
\ No newline at end of file
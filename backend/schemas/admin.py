@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Any, List, Optional
+
+class SlowQuery(BaseModel):
+    recorded_at: str
+    engine: str
+    route: Optional[str] = None  # route template, or None outside a request
+    duration_ms: float
+    statement: str
+    executemany: bool = False
+    rows: Optional[int] = None  # parameter sets of an executemany
+    parameters: Any = None  # types of the bound parameters, never their values
+    plan: Optional[List[str]] = None
+
+class SlowQueryLog(BaseModel):
+    threshold_ms: float  # 0 when the recorder is disabled
+    entries: List[SlowQuery] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
 
@@ -31,4 +31,16 @@ class BenchmarkUpdate(BaseModel):
 class Benchmark(BenchmarkBase):
     id: int
     created_at: datetime
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+class ScorePoint(BaseModel):
+    test_date: date
+    score: Decimal
+
+class BenchmarkSeries(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: int
+    benchmark_name: str
+    unit: Optional[str] = None
+    points: List[ScorePoint] = []
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class ChangeEntry(BaseModel):
+    id: int  # cursor position of this change
+    table: str
+    op: str  # 'insert', 'update', 'delete'
+    row_id: int
+    data: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+class ChangeFeed(BaseModel):
+    cursor: int  # pass as `since` to get the following changes
+    changes: List[ChangeEntry] = []
+    has_more: bool = False
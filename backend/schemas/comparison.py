@@ -1,6 +1,8 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
+
+from .model import ModelWithDetails
 
 class ComparisonTableBase(BaseModel):
     name: str
@@ -36,4 +38,9 @@ class ComparisonItem(ComparisonItemBase):
     created_at: datetime
 
 class ComparisonTableWithItems(ComparisonTable):
-    items: List[ComparisonItem] = []
\ No newline at end of file
+    items: List[ComparisonItem] = []
+
+class ComparisonSnapshot(ComparisonTable):
+    """Published copy of a public table: its models in display order, with provider, latest benchmarks and current pricing"""
+    as_of: date
+    models: List[ModelWithDetails] = []
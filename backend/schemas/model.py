@@ -34,6 +34,9 @@ class Model(ModelBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+class SimilarModel(Model):
+    distance: float
+
 class ModelWithDetails(Model):
     provider: Optional['Provider'] = None
     benchmarks: List['BenchmarkBase'] = []
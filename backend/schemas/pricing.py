@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
 
@@ -33,4 +33,28 @@ class PricingUpdate(BaseModel):
 class Pricing(PricingBase):
     id: int
     created_at: datetime
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+class PricePoint(BaseModel):
+    valid_from: date
+    price: Optional[Decimal] = None  # None marks a period without a valid price
+
+class PricingSeries(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: int
+    price_type: str
+    currency: Optional[str] = None
+    unit: str
+    points: List[PricePoint] = []
+
+class PricingChange(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: int
+    price_type: str
+    currency: Optional[str] = None
+    unit: str
+    old_price: Optional[Decimal] = None  # None if no price was valid on the first date
+    new_price: Optional[Decimal] = None  # None if no price is valid on the second date
+    change_percent: Optional[float] = None
\ No newline at end of file
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class SearchSuggestion(BaseModel):
+    kind: str  # 'provider', 'model', 'benchmark_name'
+    id: int
+    name: str
+
+class SearchHit(BaseModel):
+    kind: str  # 'provider', 'model', 'benchmark'
+    id: int
+    name: str
+    snippet: Optional[str] = None
+
+class SearchResults(BaseModel):
+    query: str
+    suggestions: List[SearchSuggestion] = []
+    results: List[SearchHit] = []
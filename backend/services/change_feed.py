@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.orm import Session
+
+from backend.database import events
+from backend.database.base import SessionLocal
+from backend.models import ChangeLog
+
+# Tables whose writes are journaled for the change feed
+FEED_TABLES = ("providers", "models", "benchmarks", "pricing", "comparison_tables", "comparison_items")
+
+# Deleting a provider or model is journaled as one delete of it, with the rows
+# of other tables deleted along with it counted in data["cascade"]; readers of
+# a table also get the deletes of the parents that can take its rows with them
+CASCADE_PARENTS = {
+    "models": ("providers",),
+    "benchmarks": ("providers", "models"),
+    "pricing": ("providers", "models"),
+    "comparison_items": ("providers", "models"),
+}
+
+# Advisory lock taken by journaling transactions on PostgreSQL (arbitrary key)
+CHANGE_LOG_LOCK = 0x63686C67
+
+# How often a waiting long-poll re-reads the log, to notice writes of other workers
+CHANGE_POLL_INTERVAL = float(os.getenv("CHANGE_POLL_INTERVAL", "1.0"))
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def cascade_parents(tables: Iterable[str]) -> Set[str]:
+    """Tables whose deletes can take rows of the given tables with them"""
+    tables = set(tables)
+    return {parent for table in tables for parent in CASCADE_PARENTS.get(table, ())} - tables
+
+def _entry_data(change: events.Change) -> Optional[str]:
+    if change.op != "delete":
+        return json.dumps(change.data, default=json_default)
+    return json.dumps({"cascade": change.cascade}) if change.cascade else None
+
+def journal_changes(session: Session, changes: List[events.Change]) -> None:
+    """Journal: append the changes to the change log in the writing transaction"""
+    rows = [
+        {
+            "table_name": change.table,
+            "op": change.op,
+            "row_id": change.id,
+            "data": _entry_data(change),
+        }
+        for change in changes
+        if change.table in FEED_TABLES
+    ]
+    if not rows:
+        return
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        # Ids come from a sequence at insert, but transactions commit in any
+        # order: a reader could pass an id whose transaction commits later and
+        # never see it. Holding this lock from the insert to the commit hands
+        # out ids in commit order. SQLite already admits one writer at a time.
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK})
+    connection.execute(ChangeLog.__table__.insert(), rows)
+
+def in_session(function, *args):
+    """Run a read in its own short-lived session (for use from run_in_threadpool)"""
+    db = SessionLocal()
+    try:
+        return function(db, *args)
+    finally:
+        db.close()
+
+def latest_cursor(db: Session) -> int:
+    """Cursor of the most recent change, for clients starting from the current state"""
+    return db.execute(select(func.max(ChangeLog.id))).scalar() or 0
+
+def changes_since(db: Session, since: int, limit: int, tables: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Changes after a cursor in commit order, at most limit of them"""
+    query = select(ChangeLog).where(ChangeLog.id > since)
+    if tables:
+        tables = list(tables)
+        parents = cascade_parents(tables)
+        condition = ChangeLog.table_name.in_(tables)
+        if parents:
+            condition = or_(condition, and_(ChangeLog.op == "delete", ChangeLog.table_name.in_(sorted(parents))))
+        query = query.where(condition)
+    entries = db.scalars(query.order_by(ChangeLog.id).limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    return {
+        "cursor": entries[-1].id if entries else since,
+        "changes": [
+            {
+                "id": entry.id,
+                "table": entry.table_name,
+                "op": entry.op,
+                "row_id": entry.row_id,
+                "data": json.loads(entry.data) if entry.data else None,
+                "created_at": entry.created_at,
+            }
+            for entry in entries
+        ],
+        "has_more": has_more,
+    }
+
+class ChangeNotifier:
+    """Wakes long-polling requests when this process commits a feed change.
+
+    Commits happen in threadpool workers while waiters live on the event
+    loop, so waiters are woken with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+        self.version = 0
+
+    async def wait(self, seen_version: int, timeout: float) -> bool:
+        """Wait until notified after seen_version, or until the timeout; True if notified"""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self.version != seen_version:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def notify(self) -> None:
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: wake waiters for committed feed changes"""
+        if any(change.table in FEED_TABLES for change in changes):
+            self.notify()
+
+change_notifier = ChangeNotifier()
+events.register_journal(journal_changes)
+events.register_listener(change_notifier.handle_changes)
@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from backend.database.events import record_change
+from backend.models import Benchmark, ComparisonItem, Model, Pricing, Provider
+
+# Deletes of providers and models with everything that depends on them. Each
+# table is cleared with one DELETE ... WHERE on the parent ids, children
+# first, inside the caller's transaction, instead of the ORM loading every
+# dependent row and deleting it one statement at a time. The whole cascade is
+# recorded as one change of the deleted provider or model with the rows
+# removed per table, so its cost does not grow with the number of dependents;
+# caches, listeners and change feed consumers expand it.
+
+# Tables whose rows go with a model
+MODEL_DEPENDENTS = (ComparisonItem, Benchmark, Pricing)
+
+def _plan(provider_id: Optional[int] = None, model_id: Optional[int] = None):
+    """(entity, condition) per table, in delete order; the deleted provider or model comes last"""
+    if provider_id is not None:
+        model_ids = select(Model.id).where(Model.provider_id == provider_id).scalar_subquery()
+        in_scope = lambda column: column.in_(model_ids)
+        roots = [(Model, Model.provider_id == provider_id), (Provider, Provider.id == provider_id)]
+    else:
+        in_scope = lambda column: column == model_id
+        roots = [(Model, Model.id == model_id)]
+    return [(entity, in_scope(entity.model_id)) for entity in MODEL_DEPENDENTS] + roots
+
+def _count(db: Session, plan) -> Dict[str, int]:
+    return {
+        entity.__tablename__: db.scalar(select(func.count()).select_from(entity).where(condition))
+        for entity, condition in plan
+    }
+
+def _delete(db: Session, plan, root_id: int) -> Dict[str, int]:
+    counts = {}
+    for entity, condition in plan:
+        result = db.execute(delete(entity).where(condition), execution_options={"synchronize_session": False})
+        counts[entity.__tablename__] = result.rowcount
+    root = plan[-1][0].__tablename__
+    if counts[root]:
+        cascade = {table: count for table, count in counts.items() if table != root and count}
+        record_change(db, root, "delete", root_id, cascade=cascade)
+    return counts
+
+def _run(db: Session, plan, root_id: int, dry_run: bool) -> Optional[Dict[str, int]]:
+    """Rows deleted (or that would be) per table; None when the root row does not exist"""
+    root = plan[-1][0].__tablename__
+    counts = _count(db, plan) if dry_run else _delete(db, plan, root_id)
+    if not counts[root]:
+        db.rollback()
+        return None
+    if not dry_run:
+        db.commit()
+        # Deleted rows may still sit in the identity map; stop them from being served
+        db.expire_all()
+    return counts
+
+def delete_provider(db: Session, provider_id: int, dry_run: bool = False) -> Optional[Dict[str, int]]:
+    """Delete a provider with its models and their benchmarks, pricing and comparison items"""
+    return _run(db, _plan(provider_id=provider_id), provider_id, dry_run)
+
+def delete_model(db: Session, model_id: int, dry_run: bool = False) -> Optional[Dict[str, int]]:
+    """Delete a model with its benchmarks, pricing and comparison items"""
+    return _run(db, _plan(model_id=model_id), model_id, dry_run)
@@ -1,24 +1,24 @@
 import json
 import re
-from typing import Dict, List, Any, Optional
-import google.generativeai as genai
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime, date
 from decimal import Decimal
+from backend.services import metrics
+from backend.services.json_stream import JsonRecordStream, parse_records
+from backend.services.llm_client import GeminiClient, GuardedLLMClient, LLMClient
 
 class GeminiScrapingService:
     """Service for extracting data from web content using Gemini API"""
     
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, api_key: Optional[str] = None, client: Optional[LLMClient] = None):
+        self.client = client or GuardedLLMClient(GeminiClient(api_key))
     
     def extract_pricing_data(self, url: str, model_name: Optional[str] = None, provider_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """Extract pricing data from a URL"""
         prompt = self._build_pricing_prompt(url, model_name, provider_name)
         
         try:
-            response = self.model.generate_content([{"text": prompt}])
-            return self._parse_pricing_response(response.text)
+            return [record for _, record in self.stream_records(prompt, "extract_pricing")]
         except Exception as e:
             raise Exception(f"Failed to extract pricing data: {str(e)}")
     
@@ -27,8 +27,7 @@ class GeminiScrapingService:
         prompt = self._build_benchmark_prompt(url, model_name, provider_name)
         
         try:
-            response = self.model.generate_content([{"text": prompt}])
-            return self._parse_benchmark_response(response.text)
+            return [record for _, record in self.stream_records(prompt, "extract_benchmarks")]
         except Exception as e:
             raise Exception(f"Failed to extract benchmark data: {str(e)}")
     
@@ -37,8 +36,10 @@ class GeminiScrapingService:
         prompt = self._build_combined_prompt(url, model_name, provider_name)
         
         try:
-            response = self.model.generate_content([{"text": prompt}])
-            return self._parse_combined_response(response.text)
+            data = {'pricing_data': [], 'benchmark_data': []}
+            for array, record in self.stream_records(prompt, "extract_both"):
+                data[array].append(record)
+            return data
         except Exception as e:
             raise Exception(f"Failed to extract combined data: {str(e)}")
     
@@ -156,59 +157,59 @@ class GeminiScrapingService:
         If no data is found for either category, return empty arrays.
         """
     
+    def build_prompt(self, data_type: str, url: str, model_name: Optional[str] = None, provider_name: Optional[str] = None) -> str:
+        """Prompt asking for 'pricing', 'benchmark' or 'both' kinds of data"""
+        if data_type == 'pricing':
+            return self._build_pricing_prompt(url, model_name, provider_name)
+        if data_type == 'benchmark':
+            return self._build_benchmark_prompt(url, model_name, provider_name)
+        return self._build_combined_prompt(url, model_name, provider_name)
+    
+    def stream_records(self, prompt: str, operation: str = "stream", transcript: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream a completion and yield (array, record) for each record as soon as it is complete;
+        the raw chunks are appended to transcript when one is given"""
+        parser = JsonRecordStream()
+        with metrics.observe_gemini(operation):
+            for chunk in self.client.stream(prompt):
+                if transcript is not None:
+                    transcript.append(chunk)
+                for array, record in parser.feed(chunk):
+                    metrics.llm_records.inc(outcome="parsed")
+                    yield array, record
+        metrics.llm_records.inc(parser.malformed, outcome="malformed")
+    
+    def parse_response(self, response_text: str, data_type: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse a response to a 'pricing', 'benchmark' or 'both' prompt"""
+        if data_type == 'pricing':
+            return {'pricing_data': self._parse_pricing_response(response_text)}
+        if data_type == 'benchmark':
+            return {'benchmark_data': self._parse_benchmark_response(response_text)}
+        return self._parse_combined_response(response_text)
+    
     def _parse_pricing_response(self, response_text: str) -> List[Dict[str, Any]]:
         """Parse pricing data from Gemini response"""
-        try:
-            # Clean the response text
-            json_text = self._extract_json_from_response(response_text)
-            data = json.loads(json_text)
-            return data.get('pricing_data', [])
-        except json.JSONDecodeError:
-            # Fallback: try to extract data using regex
-            return self._extract_pricing_with_regex(response_text)
+        records = self._parse_records(response_text).get('pricing_data', [])
+        # Fallback: try to extract data using regex
+        return records or self._extract_pricing_with_regex(response_text)
     
     def _parse_benchmark_response(self, response_text: str) -> List[Dict[str, Any]]:
         """Parse benchmark data from Gemini response"""
-        try:
-            json_text = self._extract_json_from_response(response_text)
-            data = json.loads(json_text)
-            return data.get('benchmark_data', [])
-        except json.JSONDecodeError:
-            return self._extract_benchmark_with_regex(response_text)
+        records = self._parse_records(response_text).get('benchmark_data', [])
+        return records or self._extract_benchmark_with_regex(response_text)
     
     def _parse_combined_response(self, response_text: str) -> Dict[str, List[Dict[str, Any]]]:
         """Parse combined data from Gemini response"""
-        try:
-            json_text = self._extract_json_from_response(response_text)
-            data = json.loads(json_text)
-            return {
-                'pricing_data': data.get('pricing_data', []),
-                'benchmark_data': data.get('benchmark_data', [])
-            }
-        except json.JSONDecodeError:
-            return {
-                'pricing_data': self._extract_pricing_with_regex(response_text),
-                'benchmark_data': self._extract_benchmark_with_regex(response_text)
-            }
-    
-    def _extract_json_from_response(self, response_text: str) -> str:
-        """Extract JSON from response text"""
-        # Remove markdown formatting
-        text = response_text.strip()
-        if text.startswith('```json'):
-            text = text[7:]
-        if text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        
-        # Find JSON object
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        if start != -1 and end != 0:
-            return text[start:end]
-        
-        return text
+        return {
+            'pricing_data': self._parse_pricing_response(response_text),
+            'benchmark_data': self._parse_benchmark_response(response_text)
+        }
+    
+    def _parse_records(self, response_text: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Records of the response's data arrays; malformed records are skipped one by one"""
+        grouped, malformed = parse_records(response_text)
+        metrics.llm_records.inc(sum(len(records) for records in grouped.values()), outcome="parsed")
+        metrics.llm_records.inc(malformed, outcome="malformed")
+        return grouped
     
     def _extract_pricing_with_regex(self, text: str) -> List[Dict[str, Any]]:
         """Fallback method to extract pricing using regex"""
@@ -0,0 +1,100 @@
+"""Incremental extraction of records from a streamed JSON document.
+
+LLM extraction responses look like {"pricing_data": [{...}, {...}], ...},
+possibly wrapped in markdown fences or prose. JsonRecordStream is fed the
+response as it arrives and yields each object of the watched top-level
+arrays as soon as its closing brace is seen, so the first records are
+available long before the response ends. Records are decoded one at a time:
+a malformed record is counted and skipped without losing its neighbours.
+"""
+import json
+from typing import Iterable, Iterator, List, Tuple
+
+RECORD_ARRAYS = ("pricing_data", "benchmark_data")
+
+class JsonRecordStream:
+    """Feed text chunks; yields (array name, record dict) for each completed record"""
+
+    def __init__(self, arrays: Iterable[str] = RECORD_ARRAYS):
+        self.arrays = frozenset(arrays)
+        self.records = 0
+        self.malformed = 0
+        self._stack: List[str] = []  # open containers, '{' or '['
+        self._in_string = False
+        self._escape = False
+        self._key: List[str] = []  # characters of a string directly inside the top-level object
+        self._last_key = None
+        self._array = None  # watched array currently open at the top level
+        self._record: List[str] = []  # characters of the record being read
+        self._recording = False
+
+    def feed(self, chunk: str) -> Iterator[Tuple[str, dict]]:
+        for char in chunk:
+            if self._recording:
+                self._record.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = "".join(self._key)
+                    continue
+                if len(self._stack) == 1:
+                    self._key.append(char)
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._key = []
+            elif char == "{":
+                if self._stack == ["{", "["] and self._array is not None and not self._recording:
+                    self._recording = True
+                    self._record = ["{"]
+                self._stack.append("{")
+            elif char == "[":
+                if self._stack == ["{"]:
+                    self._array = self._last_key if self._last_key in self.arrays else None
+                if self._stack:
+                    self._stack.append("[")
+            elif char in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if self._recording and len(self._stack) == 2:
+                    self._recording = False
+                    record = self._decode("".join(self._record))
+                    self._record = []
+                    if record is not None:
+                        yield self._array, record
+                elif len(self._stack) == 1 and char == "]":
+                    self._array = None
+
+    def _decode(self, text: str):
+        try:
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            self.malformed += 1
+            return None
+        self.records += 1
+        return record
+
+def iter_records(chunks: Iterable[str], arrays: Iterable[str] = RECORD_ARRAYS) -> Iterator[Tuple[str, dict]]:
+    """Records of the watched arrays from a stream of text chunks"""
+    parser = JsonRecordStream(arrays)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+def parse_records(text: str, arrays: Iterable[str] = RECORD_ARRAYS) -> Tuple[dict, int]:
+    """Records of a complete response grouped by array, and the number of malformed records skipped"""
+    parser = JsonRecordStream(arrays)
+    grouped = {}
+    for array, record in parser.feed(text):
+        grouped.setdefault(array, []).append(record)
+    return grouped, parser.malformed
@@ -0,0 +1,42 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from backend.models import Benchmark, Pricing
+
+# Greatest-per-group lookups for detail endpoints. Each one ranks the rows of
+# a group with ROW_NUMBER() and keeps the first, so the database walks the
+# (model_id, group, date) composite index instead of returning the history.
+
+def latest_benchmarks(db: Session, model_id: int) -> List[Benchmark]:
+    """Most recent benchmark per benchmark name (undated results count as oldest)"""
+    ranked = select(
+        Benchmark,
+        func.row_number().over(
+            partition_by=Benchmark.benchmark_name,
+            order_by=(Benchmark.test_date.desc().nulls_last(), Benchmark.id.desc())
+        ).label("rank")
+    ).where(Benchmark.model_id == model_id).subquery()
+    latest = aliased(Benchmark, ranked)
+    query = select(latest).where(ranked.c.rank == 1).order_by(latest.benchmark_name)
+    return db.scalars(query).all()
+
+def current_pricing(db: Session, model_id: int, on: Optional[date] = None) -> List[Pricing]:
+    """Price valid on a date (today by default) per price type, the latest one if periods overlap"""
+    on = on or date.today()
+    ranked = select(
+        Pricing,
+        func.row_number().over(
+            partition_by=Pricing.price_type,
+            order_by=(Pricing.valid_from.desc(), Pricing.id.desc())
+        ).label("rank")
+    ).where(
+        Pricing.model_id == model_id,
+        Pricing.valid_from <= on,
+        or_(Pricing.valid_to.is_(None), Pricing.valid_to >= on)
+    ).subquery()
+    current = aliased(Pricing, ranked)
+    query = select(current).where(ranked.c.rank == 1).order_by(current.price_type)
+    return db.scalars(query).all()
@@ -0,0 +1,312 @@
+"""LLM backends used by the scraper.
+
+Everything that calls a model goes through an LLMClient, so the Gemini API
+can be swapped for FakeLLMClient in development and benchmarks:
+
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_MS=800 FAKE_LLM_ERROR_RATE=0.05 uvicorn main:app
+
+get_llm_client() wraps the backend in a GuardedLLMClient, which every caller
+in the process shares: it waits for request and token quota, retries 429 and
+5xx responses with jittered backoff, and fails fast while the circuit is open.
+"""
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+
+from backend.services import metrics
+from backend.services.rate_limit import CircuitBreaker, TokenBucket, backoff_delay
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # 'gemini' or 'fake'
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+
+# Quotas of the API key; 0 disables a limit
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+# Output tokens charged against the token quota before the response is known
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1000"))
+# Longest a call waits for quota before failing
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "30"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    """A model call failed; status_code is the upstream HTTP status when known"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def error_status(exc: Exception) -> Optional[int]:
+    """HTTP status of a failed call: LLMError.status_code, or the code of google.api_core errors"""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(exc: Exception) -> bool:
+    """Rate limiting, server errors and network failures are worth retrying"""
+    return error_status(exc) in RETRYABLE_STATUS or isinstance(exc, (TimeoutError, ConnectionError))
+
+class LLMClient(ABC):
+    """Generates a text completion for a prompt; implementations block the calling thread"""
+    name = "llm"
+
+    @abstractmethod
+    def generate(self, prompt: str) -> str:
+        """The whole completion"""
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """The completion in chunks as they are generated; backends without streaming send one chunk"""
+        yield self.generate(prompt)
+
+class GeminiClient(LLMClient):
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = GEMINI_MODEL):
+        # Imported here: the SDK takes longer to import than the rest of the API
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content([{"text": prompt}]).text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.model.generate_content([{"text": prompt}], stream=True):
+            try:
+                yield chunk.text
+            except ValueError:
+                continue  # a chunk without text parts, e.g. only safety ratings
+
+# Canned responses of the fake backend, by the kind of data the prompt asks for
+FAKE_RESPONSES: Dict[str, str] = {
+    "pricing": json.dumps({"pricing_data": [
+        {"model_name": "Atlas 1", "provider": "Provider 001", "price_type": "input_tokens", "price": "2.50",
+         "currency": "USD", "unit": "per_million_tokens", "effective_date": "2024-06-01"},
+        {"model_name": "Atlas 1", "provider": "Provider 001", "price_type": "output_tokens", "price": "10.00",
+         "currency": "USD", "unit": "per_million_tokens", "effective_date": "2024-06-01"},
+    ]}),
+    "benchmark": json.dumps({"benchmark_data": [
+        {"model_name": "Atlas 1", "provider": "Provider 001", "benchmark_name": "MMLU", "score": "86.4",
+         "unit": "accuracy", "test_date": "2024-06-01"},
+        {"model_name": "Atlas 1", "provider": "Provider 001", "benchmark_name": "GSM8K", "score": "92.0",
+         "unit": "accuracy", "test_date": "2024-06-01"},
+    ]}),
+}
+FAKE_RESPONSES["both"] = json.dumps({**json.loads(FAKE_RESPONSES["pricing"]), **json.loads(FAKE_RESPONSES["benchmark"])})
+
+def prompt_kind(prompt: str) -> str:
+    """Which data a scraper prompt asks for: 'pricing', 'benchmark' or 'both'"""
+    # The prompts name the JSON arrays they expect; page content rarely does
+    pricing, benchmark = "pricing_data" in prompt, "benchmark_data" in prompt
+    if pricing and benchmark:
+        return "both"
+    return "benchmark" if benchmark else "pricing"
+
+class FakeLLMClient(LLMClient):
+    """Local stand-in for the Gemini API with configurable latency, failures and responses"""
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.8,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        responses: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+        error_status: int = 503,
+        chunk_size: int = 64,
+        first_chunk: float = 0.2,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # Streams send chunk_size characters at a time; the first after first_chunk of the latency
+        self.chunk_size = chunk_size
+        self.first_chunk = first_chunk
+        self.responses = dict(FAKE_RESPONSES, **(responses or {}))
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _start_call(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency * (1 + self._random.uniform(-self.jitter, self.jitter)))
+            failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    def generate(self, prompt: str) -> str:
+        delay, failed = self._start_call()
+        time.sleep(delay)
+        if failed:
+            raise LLMError(f"Fake LLM error {self.error_status} (injected)", self.error_status)
+        return self.responses[prompt_kind(prompt)]
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        delay, failed = self._start_call()
+        time.sleep(delay * self.first_chunk)
+        if failed:
+            raise LLMError(f"Fake LLM error {self.error_status} (injected)", self.error_status)
+        text = self.responses[prompt_kind(prompt)]
+        chunks = [text[start:start + self.chunk_size] for start in range(0, len(text), self.chunk_size)]
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(delay * (1 - self.first_chunk) / (len(chunks) - 1))
+            yield chunk
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMClient":
+        """Configured by FAKE_LLM_LATENCY_MS, FAKE_LLM_JITTER, FAKE_LLM_ERROR_RATE, FAKE_LLM_ERROR_STATUS, FAKE_LLM_CHUNK_SIZE,
+        FAKE_LLM_RESPONSES (JSON file of responses by kind) and FAKE_LLM_SEED"""
+        responses = None
+        if os.getenv("FAKE_LLM_RESPONSES"):
+            with open(os.environ["FAKE_LLM_RESPONSES"]) as f:
+                responses = {kind: text if isinstance(text, str) else json.dumps(text) for kind, text in json.load(f).items()}
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            latency=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")) / 1000,
+            jitter=float(os.getenv("FAKE_LLM_JITTER", "0.2")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            responses=responses,
+            seed=int(seed) if seed else None,
+            error_status=int(os.getenv("FAKE_LLM_ERROR_STATUS", "503")),
+            chunk_size=int(os.getenv("FAKE_LLM_CHUNK_SIZE", "64")),
+        )
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token count of a prompt plus the expected response, about four characters a token"""
+    return len(prompt) // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+class GuardedLLMClient(LLMClient):
+    """Rate-limited, retrying client around another LLMClient, with a circuit breaker"""
+
+    def __init__(
+        self,
+        client: LLMClient,
+        requests: Optional[TokenBucket] = None,
+        tokens: Optional[TokenBucket] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_attempts: int = LLM_MAX_ATTEMPTS,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+    ):
+        self.client = client
+        self.name = client.name
+        self.requests = requests or request_bucket
+        self.tokens = tokens or token_bucket
+        self.breaker = breaker or circuit_breaker
+        self.max_attempts = max_attempts
+        self.queue_timeout = queue_timeout
+
+    def _acquire(self, cost: int) -> None:
+        wait = self.requests.reserve(1, self.queue_timeout)
+        try:
+            wait = max(wait, self.tokens.reserve(cost, self.queue_timeout))
+        except Exception:
+            self.requests.refund(1)
+            raise
+        metrics.llm_rate_limit_wait.observe(wait)
+        if wait:
+            time.sleep(wait)
+
+    def _admit(self, cost: int) -> None:
+        self.breaker.before_call()
+        try:
+            self._acquire(cost)
+        except Exception:
+            self.breaker.release()
+            raise
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        """Record a failed attempt with the breaker; waits out the backoff and returns True if it is worth retrying"""
+        if not is_retryable(exc):
+            # The upstream answered; a bad request says nothing about its health
+            self.breaker.record_success()
+            return False
+        self.breaker.record_failure()
+        if attempt + 1 == self.max_attempts:
+            return False
+        status = error_status(exc)
+        metrics.llm_retries.inc(reason=str(status) if status else type(exc).__name__)
+        time.sleep(backoff_delay(attempt, LLM_BACKOFF_BASE, LLM_BACKOFF_CAP))
+        return True
+
+    def generate(self, prompt: str) -> str:
+        cost = estimate_tokens(prompt)
+        for attempt in range(self.max_attempts):
+            self._admit(cost)
+            try:
+                response = self.client.generate(prompt)
+            except Exception as exc:
+                if self._should_retry(exc, attempt):
+                    continue
+                raise
+            self.breaker.record_success()
+            return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Chunks of the completion; a failure before the first chunk is retried, a later one is raised"""
+        cost = estimate_tokens(prompt)
+        for attempt in range(self.max_attempts):
+            self._admit(cost)
+            started = False
+            try:
+                for chunk in self.client.stream(prompt):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                self.breaker.release()
+                raise
+            except Exception as exc:
+                if started:
+                    # Chunks already went to the caller; restarting would repeat them
+                    if is_retryable(exc):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    raise
+                if self._should_retry(exc, attempt):
+                    continue
+                raise
+            self.breaker.record_success()
+            return
+
+# Shared by every client in the process, so all scrapes draw on one quota
+request_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(LLM_TOKENS_PER_MINUTE)
+circuit_breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+
+BREAKER_STATES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+def _available():
+    values = {}
+    for name, bucket in (("requests", request_bucket), ("tokens", token_bucket)):
+        if bucket.enabled:
+            values[(name,)] = round(bucket.available(), 3)
+    return values
+
+metrics.registry.gauge("llm_rate_limit_available", "Quota left in the LLM token buckets; negative while reservations are paid back", ("bucket",), _available)
+metrics.registry.gauge("llm_circuit_state", "LLM circuit breaker state: 0 closed, 1 half-open, 2 open", (), lambda: {(): BREAKER_STATES[circuit_breaker.state]})
+metrics.registry.gauge("llm_circuit_opened", "Times the LLM circuit breaker has opened", (), lambda: {(): circuit_breaker.opened_count})
+
+def llm_configured() -> bool:
+    """Whether the configured backend can make calls (Gemini needs an API key)"""
+    return LLM_BACKEND == "fake" or bool(os.getenv("GEMINI_API_KEY"))
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """The LLM_BACKEND client behind the shared quota and breaker, built on first use"""
+    if LLM_BACKEND == "fake":
+        return GuardedLLMClient(FakeLLMClient.from_env())
+    if LLM_BACKEND != "gemini":
+        raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r}; use 'gemini' or 'fake'")
+    return GuardedLLMClient(GeminiClient())
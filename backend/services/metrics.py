@@ -0,0 +1,262 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    """Base of the metric types: a name, help text and label names"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values]
+
+class Gauge(Metric):
+    """Gauge set by the application, or read from collect() at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), collect: Callable[[], Dict[LabelValues, float]] = None):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in sorted(values.items())]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: counts per bucket (last is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate of a quantile from the buckets, interpolated as PromQL's histogram_quantile does"""
+        entry = self._values.get(self._key(labels))
+        if not entry or not sum(entry[0]):
+            return None
+        counts = entry[0]
+        rank = q * sum(counts)
+        cumulative, lower = 0, 0.0
+        for bound, count in zip(self.buckets, counts):
+            if count and cumulative + count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return self.buckets[-1]  # in the +Inf bucket
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + ("+Inf" if bound == float("inf") else _number(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+class Registry:
+    """Ordered set of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = (), collect: Callable[[], Dict[LabelValues, float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labels, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.header() + metric.samples()
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# HTTP
+http_requests = registry.counter("http_requests_total", "Requests handled, by route template and status", ("method", "route", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "Request latency until the response completed", ("method", "route"))
+http_request_statements = registry.histogram(
+    "http_request_db_statements", "SQL statements issued per request", ("method", "route"),
+    (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+)
+http_requests_in_progress = registry.gauge("http_requests_in_progress", "Requests currently being handled", ("method",))
+
+# Database
+db_statements = registry.counter("db_statements_total", "SQL statements executed, by engine and route (empty outside requests)", ("engine", "route"))
+db_statement_seconds = registry.counter("db_statement_seconds_total", "Time spent executing SQL statements", ("engine", "route"))
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement latency", ("engine",),
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+db_errors = registry.counter("db_errors_total", "SQL statements that raised, by exception type", ("engine", "error"))
+db_pool_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("engine",),
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+db_pool_timeouts = registry.counter("db_pool_checkout_timeouts_total", "Checkouts that gave up waiting for a connection", ("engine",))
+
+# Gemini
+gemini_requests = registry.counter("gemini_requests_total", "Gemini API calls, by operation and outcome", ("operation", "outcome"))
+gemini_request_duration = registry.histogram("gemini_request_duration_seconds", "Gemini API call latency", ("operation",))
+llm_records = registry.counter("llm_records_total", "Records decoded from LLM extraction responses; malformed ones are skipped", ("outcome",))
+llm_retries = registry.counter("llm_retries_total", "LLM calls retried, by upstream status or error type", ("reason",))
+llm_rate_limit_wait = registry.histogram(
+    "llm_rate_limit_wait_seconds", "Time LLM calls waited for request and token quota", (),
+    (0, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+# Scraper
+scrape_stage_duration = registry.histogram(
+    "scrape_stage_duration_seconds", "Time per stage of a scrape: fetch, first_record, generate, persist", ("stage",),
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+)
+
+# Admission control
+admission_rejected = registry.counter(
+    "admission_rejected_total", "Requests turned away, by tier and reason: rate_limited, queue_full, queue_timeout", ("tier", "reason")
+)
+admission_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot in their tier", ("tier",),
+    (0, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+# Request coalescing
+single_flight_calls = registry.counter(
+    "single_flight_calls_total", "Coalesced computations: leaders run them, followers share a leader's result", ("name", "role")
+)
+
+class RequestStats:
+    """Statement count and time of the request being handled"""
+    __slots__ = ("route", "statements", "seconds")
+
+    def __init__(self, route: str = ""):
+        self.route = route
+        self.statements = 0
+        self.seconds = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def observe_statement(engine_name: str, seconds: float) -> None:
+    """Record one executed statement against the current request, if any"""
+    stats = current_request.get()
+    route = stats.route if stats is not None else ""
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+    db_statements.inc(engine=engine_name, route=route)
+    db_statement_seconds.inc(seconds, engine=engine_name, route=route)
+    db_statement_duration.observe(seconds, engine=engine_name)
+
+@contextmanager
+def observe_gemini(operation: str):
+    """Count and time one Gemini API call"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        gemini_requests.inc(operation=operation, outcome="error")
+        raise
+    else:
+        gemini_requests.inc(operation=operation, outcome="success")
+    finally:
+        gemini_request_duration.observe(time.perf_counter() - started, operation=operation)
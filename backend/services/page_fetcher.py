@@ -0,0 +1,100 @@
+import asyncio
+import ipaddress
+import os
+import socket
+from html.parser import HTMLParser
+from typing import List
+from urllib.parse import urljoin, urlsplit
+
+# Fetch scraped pages server-side and put their text in the prompt; off, the model only gets the URL
+SCRAPER_FETCH_PAGES = os.getenv("SCRAPER_FETCH_PAGES", "false").lower() in ("1", "true", "yes")
+# Allow loopback, private and link-local destinations (local testing only)
+SCRAPER_FETCH_PRIVATE = os.getenv("SCRAPER_FETCH_PRIVATE", "false").lower() in ("1", "true", "yes")
+SCRAPER_FETCH_TIMEOUT = float(os.getenv("SCRAPER_FETCH_TIMEOUT", "10"))
+SCRAPER_MAX_REDIRECTS = 5
+# Page text beyond this is cut off before it goes into a prompt
+SCRAPER_PAGE_MAX_CHARS = int(os.getenv("SCRAPER_PAGE_MAX_CHARS", "20000"))
+
+class _TextExtractor(HTMLParser):
+    """Visible text of an HTML document, without scripts and styles"""
+    SKIPPED = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping and data.strip():
+            self.parts.append(data.strip())
+
+def html_to_text(html: str, max_chars: int = SCRAPER_PAGE_MAX_CHARS) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return "\n".join(parser.parts)[:max_chars]
+
+class BlockedDestination(ValueError):
+    """The URL is not http(s), or its host resolves to an address that is not public"""
+
+async def check_destination(url: str) -> None:
+    """Refuse URLs the server must not fetch on a client's behalf (internal services, cloud metadata)"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise BlockedDestination(f"Not an http(s) URL: {url}")
+    if SCRAPER_FETCH_PRIVATE:
+        return
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as error:
+        raise BlockedDestination(f"Cannot resolve {parts.hostname}: {error}") from error
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            raise BlockedDestination(f"{parts.hostname} resolves to a non-public address ({address})")
+
+_client = None
+
+def _http_client():
+    # httpx is imported on first fetch; most workers never scrape
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=SCRAPER_FETCH_TIMEOUT,
+            # Redirects are followed by fetch_page_text, which checks every hop
+            follow_redirects=False,
+            headers={"User-Agent": "llm-comp-scraper/1.0"},
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+async def fetch_page_text(url: str) -> str:
+    """Download a page and return its visible text; raises on blocked destinations, network errors and non-2xx responses"""
+    for _ in range(SCRAPER_MAX_REDIRECTS + 1):
+        await check_destination(url)
+        response = await _http_client().get(url)
+        if not (response.is_redirect and "location" in response.headers):
+            break
+        url = urljoin(str(response.url), response.headers["location"])
+    else:
+        raise BlockedDestination(f"More than {SCRAPER_MAX_REDIRECTS} redirects")
+    response.raise_for_status()
+    if "html" in response.headers.get("content-type", "text/html"):
+        return html_to_text(response.text)
+    return response.text[:SCRAPER_PAGE_MAX_CHARS]
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
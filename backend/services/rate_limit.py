@@ -0,0 +1,130 @@
+import random
+import threading
+import time
+from typing import Optional
+
+class RateLimitTimeout(Exception):
+    """Waiting for capacity would take longer than allowed"""
+
+class CircuitOpenError(Exception):
+    """The upstream is failing; calls are rejected until the breaker's cool-down ends"""
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding at most one minute's worth.
+
+    Callers reserve tokens and sleep for the returned wait, so concurrent
+    callers queue in reservation order instead of polling. A rate of 0
+    disables limiting.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        """Tokens available now (negative while reserved tokens are still being paid back)"""
+        if not self.enabled:
+            return float("inf")
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def reserve(self, amount: float = 1, max_wait: Optional[float] = None) -> float:
+        """Take amount tokens; returns seconds to wait before using them"""
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (amount - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitTimeout(f"Rate limit: {wait:.1f} s until {amount:g} tokens are available")
+            self._tokens -= amount
+            return wait
+
+    def take(self, amount: float = 1) -> float:
+        """Take amount tokens if they are available now; otherwise take nothing and return the seconds until they are"""
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < amount:
+                return (amount - self._tokens) / self.rate
+            self._tokens -= amount
+            return 0.0
+
+    def refund(self, amount: float) -> None:
+        """Return reserved tokens that were not used"""
+        if self.enabled:
+            with self._lock:
+                self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures and rejects calls for reset_timeout
+    seconds; then lets one trial call through, closing on success and reopening on failure"""
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_count = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                remaining = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+                raise CircuitOpenError(f"Upstream unavailable; circuit open for another {remaining:.1f} s")
+            self._state = self.HALF_OPEN
+            self._trial_running = True
+
+    def release(self) -> None:
+        """A call let through by before_call never reached the upstream"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
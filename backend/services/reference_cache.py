@@ -0,0 +1,228 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.database import events
+from backend.database.signals import change_signal
+from backend.models import Model, Provider
+
+REFERENCE_TABLES = ("providers", "models")
+
+@dataclass(frozen=True)
+class ProviderRef:
+    id: int
+    name: str
+
+@dataclass(frozen=True)
+class ModelRef:
+    id: int
+    name: str
+    provider_id: int
+    model_type: Optional[str] = None
+    context_window: Optional[int] = None
+
+class ReferenceCache:
+    """Versioned in-process copy of provider and model ids, names and basic attributes.
+
+    Serves the existence checks of the write handlers without a database
+    round trip. The cache is kept coherent by this process's committed
+    changes and, with CACHE_SIGNAL_DIR, by one stat() per table to notice
+    other workers' writes (without it the deployment is a single worker).
+    Only the answers that reject a request are read through: an unknown id,
+    or a name already taken, is checked against the database, so a stale
+    cache never turns away a valid reference. What a stale cache lets through
+    is stopped by the foreign keys and unique indexes.
+
+    Database reads happen outside the lock; it is only held to swap results in.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: Dict[int, ProviderRef] = {}
+        self._provider_names: Dict[str, int] = {}
+        self._models: Dict[int, ModelRef] = {}
+        self._model_names: Dict[Tuple[str, int], int] = {}
+        self._loaded = False
+        self.version = 0
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: apply committed provider and model writes"""
+        with self._lock:
+            for change in changes:
+                if change.table == "providers":
+                    self._drop_provider(change.id)
+                    if change.cascade.get("models"):
+                        for model in [model for model in self._models.values() if model.provider_id == change.id]:
+                            self._drop_model(model.id)
+                    if change.op != "delete" and change.data.get("name") is not None:
+                        self._put_provider(ProviderRef(change.id, change.data["name"]))
+                elif change.table == "models":
+                    self._drop_model(change.id)
+                    if change.op != "delete" and change.data.get("name") is not None:
+                        self._put_model(ModelRef(
+                            change.id,
+                            change.data["name"],
+                            change.data.get("provider_id"),
+                            change.data.get("model_type"),
+                            change.data.get("context_window")
+                        ))
+                else:
+                    continue
+                self.version += 1
+
+    def invalidate(self, tables: Set[str] = None) -> None:
+        """Reload everything on next use (e.g. after writes by another worker)"""
+        if tables is not None and not set(tables) & set(REFERENCE_TABLES):
+            return
+        with self._lock:
+            self._loaded = False
+            self.version += 1
+
+    def get_provider(self, db: Session, provider_id: int) -> Optional[ProviderRef]:
+        self._ensure_loaded(db)
+        with self._lock:
+            provider = self._providers.get(provider_id)
+            version = self.version
+        if provider is not None:
+            return provider
+        # Unknown here: it may have been created by another worker since the last check
+        row = db.execute(select(Provider.id, Provider.name).where(Provider.id == provider_id)).first()
+        with self._lock:
+            if self.version == version:
+                self._refresh_provider(provider_id, row)
+        return ProviderRef(*row) if row is not None else None
+
+    def get_model(self, db: Session, model_id: int) -> Optional[ModelRef]:
+        self._ensure_loaded(db)
+        with self._lock:
+            model = self._models.get(model_id)
+            version = self.version
+        if model is not None:
+            return model
+        row = db.execute(self._model_query().where(Model.id == model_id)).first()
+        with self._lock:
+            if self.version == version:
+                self._refresh_model(model_id, row)
+        return ModelRef(*row) if row is not None else None
+
+    def provider_exists(self, db: Session, provider_id: int) -> bool:
+        return self.get_provider(db, provider_id) is not None
+
+    def model_exists(self, db: Session, model_id: int) -> bool:
+        return self.get_model(db, model_id) is not None
+
+    def missing_models(self, db: Session, model_ids: Iterable[int]) -> Set[int]:
+        """Those of the given model ids that do not exist, reading the unknown ones in one query"""
+        self._ensure_loaded(db)
+        with self._lock:
+            unknown = {model_id for model_id in model_ids if model_id not in self._models}
+            version = self.version
+        if not unknown:
+            return set()
+        rows = {row.id: row for row in db.execute(self._model_query().where(Model.id.in_(unknown)))}
+        with self._lock:
+            if self.version == version:
+                for model_id in unknown:
+                    self._refresh_model(model_id, rows.get(model_id))
+        return unknown - rows.keys()
+
+    def provider_id_by_name(self, db: Session, name: str) -> Optional[int]:
+        """Id of the provider with this name, if any"""
+        self._ensure_loaded(db)
+        with self._lock:
+            provider_id = self._provider_names.get(name)
+            version = self.version
+        if provider_id is None:
+            return None
+        # Taken here: it may have been renamed or deleted by another worker since
+        row = db.execute(select(Provider.id, Provider.name).where(Provider.name == name)).first()
+        with self._lock:
+            if self.version == version:
+                self._drop_provider(provider_id)
+                if row is not None:
+                    self._refresh_provider(row.id, row)
+        return row.id if row is not None else None
+
+    def model_id_by_name(self, db: Session, name: str, provider_id: int) -> Optional[int]:
+        """Id of the model with this name at this provider, if any"""
+        self._ensure_loaded(db)
+        with self._lock:
+            model_id = self._model_names.get((name, provider_id))
+            version = self.version
+        if model_id is None:
+            return None
+        row = db.execute(self._model_query().where(Model.name == name, Model.provider_id == provider_id)).first()
+        with self._lock:
+            if self.version == version:
+                self._drop_model(model_id)
+                if row is not None:
+                    self._refresh_model(row.id, row)
+        return row.id if row is not None else None
+
+    # Internal helpers (callers hold the lock, except for _ensure_loaded)
+
+    @staticmethod
+    def _model_query():
+        return select(Model.id, Model.name, Model.provider_id, Model.model_type, Model.context_window)
+
+    def _ensure_loaded(self, db: Session) -> None:
+        # Outside the lock: polling may call invalidate()
+        change_signal.poll(REFERENCE_TABLES)
+        if self._loaded:
+            return
+        version = self.version
+        providers = [ProviderRef(*row) for row in db.execute(select(Provider.id, Provider.name))]
+        models = [ModelRef(*row) for row in db.execute(self._model_query())]
+        with self._lock:
+            if self._loaded:
+                return
+            self._providers, self._provider_names = {}, {}
+            self._models, self._model_names = {}, {}
+            for provider in providers:
+                self._put_provider(provider)
+            for model in models:
+                self._put_model(model)
+            # A change committed while reading may be missing from the rows; read again next time
+            self._loaded = self.version == version
+
+    def _refresh_provider(self, provider_id: int, row) -> Optional[ProviderRef]:
+        """Replace the cached provider with the row read from the database (None: it does not exist)"""
+        self._drop_provider(provider_id)
+        if row is None:
+            return None
+        provider = ProviderRef(*row)
+        self._put_provider(provider)
+        return provider
+
+    def _refresh_model(self, model_id: int, row) -> Optional[ModelRef]:
+        self._drop_model(model_id)
+        if row is None:
+            return None
+        model = ModelRef(*row)
+        self._put_model(model)
+        return model
+
+    def _put_provider(self, provider: ProviderRef) -> None:
+        self._providers[provider.id] = provider
+        self._provider_names[provider.name] = provider.id
+
+    def _drop_provider(self, provider_id: int) -> None:
+        provider = self._providers.pop(provider_id, None)
+        if provider is not None and self._provider_names.get(provider.name) == provider_id:
+            del self._provider_names[provider.name]
+
+    def _put_model(self, model: ModelRef) -> None:
+        self._models[model.id] = model
+        self._model_names[(model.name, model.provider_id)] = model.id
+
+    def _drop_model(self, model_id: int) -> None:
+        model = self._models.pop(model_id, None)
+        if model is not None and self._model_names.get((model.name, model.provider_id)) == model_id:
+            del self._model_names[(model.name, model.provider_id)]
+
+reference_cache = ReferenceCache()
+events.register_listener(reference_cache.handle_changes)
+change_signal.add_listener(reference_cache.invalidate)
@@ -0,0 +1,212 @@
+import bisect
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, distinct, inspect, or_, select, text
+from sqlalchemy.orm import Session
+
+from backend.database import events
+from backend.database.search_index import SEARCH_TABLE
+from backend.models import Benchmark, Model, Provider
+
+# Trigram matching needs at least three characters per term
+MIN_TERM_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"\S+")
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+def _fts_query(q: str) -> Optional[str]:
+    """Build an FTS5 query that matches every term as a substring"""
+    terms = [term for term in _TOKEN_RE.findall(q) if len(term) >= MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+class PrefixIndex:
+    """In-memory sorted index of names for typeahead.
+
+    Every word start of a name is a key, so "son" completes "Claude 3.5 Sonnet".
+    Providers and models are kept up to date from committed changes. New
+    benchmark names are added as they appear; a deleted or renamed benchmark
+    row may have been the last one with its name, so the benchmark names are
+    re-read on the next lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, str, int]] = []  # (key, kind, id)
+        self._names: Dict[Tuple[str, int], str] = {}  # (kind, id) -> display name
+        self._benchmark_names: Dict[str, int] = {}
+        self._benchmark_ids = 0
+        self._benchmarks_stale = False
+        self._loaded = False
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: apply provider, model and benchmark name changes"""
+        with self._lock:
+            if not self._loaded:
+                return
+            for change in changes:
+                if change.cascade.get("benchmarks"):
+                    self._benchmarks_stale = True
+                if change.cascade.get("models"):
+                    # The index does not know which provider a model belongs to
+                    self._loaded = False
+                    return
+                if change.table in ("providers", "models"):
+                    kind = "provider" if change.table == "providers" else "model"
+                    self._remove(kind, change.id)
+                    if change.op != "delete" and change.data.get("name"):
+                        self._add(kind, change.id, change.data["name"])
+                elif change.table == "benchmarks":
+                    if change.op == "delete" or "benchmark_name" in change.previous:
+                        self._benchmarks_stale = True
+                    name = change.data.get("benchmark_name")
+                    if change.op != "delete" and name:
+                        self._add_benchmark_name(name)
+
+    def invalidate(self) -> None:
+        """Reload the index on the next lookup"""
+        with self._lock:
+            self._loaded = False
+
+    def complete(self, db: Session, prefix: str, limit: int, kinds: Optional[Set[str]] = None) -> List[Dict]:
+        """Return up to `limit` names with a word starting with `prefix`"""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            if not self._loaded:
+                self._load(db)
+            elif self._benchmarks_stale:
+                self._reload_benchmark_names(db)
+            results = []
+            seen = set()
+            position = bisect.bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(results) < limit:
+                key, kind, ref_id = self._keys[position]
+                position += 1
+                if not key.startswith(prefix):
+                    break
+                if (kind, ref_id) in seen or (kinds and kind not in kinds):
+                    continue
+                seen.add((kind, ref_id))
+                results.append({"kind": kind, "id": ref_id, "name": self._names[(kind, ref_id)]})
+            return results
+
+    def _load(self, db: Session) -> None:
+        self._keys = []
+        self._names = {}
+        self._benchmark_names = {}
+        self._benchmarks_stale = False
+        for ref_id, name in db.execute(select(Provider.id, Provider.name)):
+            self._add("provider", ref_id, name, sort=False)
+        for ref_id, name in db.execute(select(Model.id, Model.name)):
+            self._add("model", ref_id, name, sort=False)
+        for (name,) in db.execute(select(distinct(Benchmark.benchmark_name))):
+            self._add_benchmark_name(name, sort=False)
+        self._keys.sort()
+        self._loaded = True
+
+    def _reload_benchmark_names(self, db: Session) -> None:
+        """Drop benchmark names no row uses any more and add any that were missed"""
+        names = set(db.scalars(select(distinct(Benchmark.benchmark_name))))
+        for name in [name for name in self._benchmark_names if name not in names]:
+            self._remove("benchmark_name", self._benchmark_names.pop(name))
+        for name in names:
+            self._add_benchmark_name(name)
+        self._benchmarks_stale = False
+
+    def _add_benchmark_name(self, name: str, sort: bool = True) -> None:
+        if name in self._benchmark_names:
+            return
+        # Benchmark names have no row of their own; number them for the results
+        self._benchmark_ids += 1
+        self._benchmark_names[name] = self._benchmark_ids
+        self._add("benchmark_name", self._benchmark_ids, name, sort)
+
+    @staticmethod
+    def _index_keys(kind: str, ref_id: int, name: str) -> List[Tuple[str, str, int]]:
+        normalized = _normalize(name)
+        starts = [0] + [match.start() + 1 for match in re.finditer(r"[\s\-_/.]", normalized)]
+        return [(normalized[start:], kind, ref_id) for start in starts if normalized[start:]]
+
+    def _add(self, kind: str, ref_id: int, name: str, sort: bool = True) -> None:
+        self._names[(kind, ref_id)] = name
+        for key in self._index_keys(kind, ref_id, name):
+            if sort:
+                bisect.insort(self._keys, key)
+            else:
+                self._keys.append(key)
+
+    def _remove(self, kind: str, ref_id: int) -> None:
+        name = self._names.pop((kind, ref_id), None)
+        if name is None:
+            return
+        for key in self._index_keys(kind, ref_id, name):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+_fts_engines: Set[str] = set()
+
+def fts_available(db: Session) -> bool:
+    """Whether the FTS5 search index exists in the connected database"""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fts_engines and bind.dialect.name == "sqlite" and inspect(bind).has_table(SEARCH_TABLE):
+        _fts_engines.add(key)
+    return key in _fts_engines
+
+def full_text_search(db: Session, q: str, limit: int, kinds: Optional[Set[str]] = None) -> List[Dict]:
+    """Substring/token search over names, descriptions and benchmark notes"""
+    if fts_available(db):
+        match = _fts_query(q)
+        if match is None:
+            return []
+        sql = (
+            f"SELECT kind, ref_id, title, snippet({SEARCH_TABLE}, 3, '[', ']', '…', 8) "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+        )
+        params = {"match": match, "limit": limit}
+        if kinds:
+            sql += " AND kind IN (" + ", ".join(f":kind{i}" for i in range(len(kinds))) + ")"
+            params.update({f"kind{i}": kind for i, kind in enumerate(sorted(kinds))})
+        sql += " ORDER BY rank LIMIT :limit"
+        return [
+            {"kind": kind, "id": ref_id, "name": title, "snippet": snippet or None}
+            for kind, ref_id, title, snippet in db.execute(text(sql), params)
+        ]
+
+    # Fallback for databases without FTS5: unindexed LIKE per term
+    results = []
+    terms = _TOKEN_RE.findall(q)
+    sources = [
+        ("provider", Provider, Provider.name, Provider.description),
+        ("model", Model, Model.name, Model.description),
+        ("benchmark", Benchmark, Benchmark.benchmark_name, Benchmark.notes),
+    ]
+    for kind, entity, title, body in sources:
+        if kinds and kind not in kinds or len(results) >= limit:
+            continue
+        query = select(entity.id, title)
+        for term in terms:
+            query = query.where(or_(title.ilike(f"%{term}%"), body.ilike(f"%{term}%")))
+        for ref_id, name in db.execute(query.limit(limit - len(results))):
+            results.append({"kind": kind, "id": ref_id, "name": name, "snippet": None})
+    return results
+
+def matching_benchmark_ids(db: Session, benchmark_name: str):
+    """Subquery of benchmark ids whose name contains `benchmark_name`, or None if FTS cannot serve it"""
+    if len(benchmark_name) < MIN_TERM_LENGTH or not fts_available(db):
+        return None
+    phrase = '"' + benchmark_name.replace('"', '""') + '"'
+    return text(
+        f"SELECT ref_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :benchmark_match AND kind = 'benchmark'"
+    ).bindparams(benchmark_match="title : " + phrase).columns(ref_id=Integer)
+
+prefix_index = PrefixIndex()
+events.register_listener(prefix_index.handle_changes)
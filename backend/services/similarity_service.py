@@ -0,0 +1,344 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from backend.database import events
+from backend.database.base import SessionLocal
+from backend.models import Benchmark, Model, Pricing
+
+logger = logging.getLogger(__name__)
+
+# Price types and unit multipliers used for the "normalized price" feature (USD per million tokens)
+PRICE_TYPES = ("input_tokens", "output_tokens")
+UNIT_TO_PER_MILLION = {"per_1k_tokens": 1000.0, "per_million_tokens": 1.0}
+
+# Fixed log10 ranges so that a single new model never shifts every other vector
+CONTEXT_WINDOW_RANGE = (3.0, 7.0)  # 1K .. 10M tokens
+PRICE_RANGE = (-2.0, 3.0)  # $0.01 .. $1000 per million tokens
+
+# Relative weight of each feature group in the squared distance
+WEIGHTS = {"benchmarks": 1.0, "price": 1.0, "context_window": 0.5, "model_type": 0.5}
+
+# Squared distance assumed for a feature group when one of the models has no value
+MISSING_PENALTY = 0.25
+
+# Share of the catalog that may be updated incrementally before benchmark bounds are recomputed
+REBUILD_FRACTION = 0.1
+
+# Dirty models a lookup may re-index itself; more are left to a background rebuild
+INLINE_UPDATES = 20
+
+CHUNK_SIZE = 500
+
+@dataclass
+class ModelFeatures:
+    """Normalized feature vector of a single model"""
+    model_type: Optional[str] = None
+    context_window: Optional[float] = None
+    prices: Dict[str, float] = field(default_factory=dict)
+    raw_scores: Dict[str, float] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+
+def _scale(value: float, bounds: Tuple[float, float]) -> float:
+    low, high = bounds
+    if high <= low:
+        return 0.5
+    return min(1.0, max(0.0, (value - low) / (high - low)))
+
+def _distance(a: ModelFeatures, b: ModelFeatures) -> float:
+    total = 0.0
+
+    shared = a.scores.keys() & b.scores.keys()
+    if shared:
+        total += WEIGHTS["benchmarks"] * sum((a.scores[name] - b.scores[name]) ** 2 for name in shared) / len(shared)
+    else:
+        total += WEIGHTS["benchmarks"] * MISSING_PENALTY
+
+    price = 0.0
+    for price_type in PRICE_TYPES:
+        if price_type in a.prices and price_type in b.prices:
+            price += (a.prices[price_type] - b.prices[price_type]) ** 2
+        else:
+            price += MISSING_PENALTY
+    total += WEIGHTS["price"] * price / len(PRICE_TYPES)
+
+    if a.context_window is not None and b.context_window is not None:
+        total += WEIGHTS["context_window"] * (a.context_window - b.context_window) ** 2
+    else:
+        total += WEIGHTS["context_window"] * MISSING_PENALTY
+
+    if a.model_type != b.model_type:
+        total += WEIGHTS["model_type"]
+
+    return math.sqrt(total)
+
+def _score_bounds(features: Iterable[ModelFeatures]) -> Dict[str, Tuple[float, float]]:
+    bounds: Dict[str, Tuple[float, float]] = {}
+    for model in features:
+        for name, score in model.raw_scores.items():
+            low, high = bounds.get(name, (score, score))
+            bounds[name] = (min(low, score), max(high, score))
+    return bounds
+
+def _normalize(features: ModelFeatures, bounds: Dict[str, Tuple[float, float]]) -> None:
+    for name, score in features.raw_scores.items():
+        # Bounds of benchmarks first seen after the build come from the first score
+        features.scores[name] = _scale(score, bounds.setdefault(name, (score, score)))
+
+def _nearest(features: Dict[int, ModelFeatures], model_id: int, limit: int) -> List[Tuple[float, int]]:
+    target = features[model_id]
+    return heapq.nsmallest(
+        limit, ((_distance(target, other), other_id) for other_id, other in features.items() if other_id != model_id)
+    )
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+class SimilarityIndex:
+    """Precomputed k-nearest-neighbour lists over model features.
+
+    The index is built once and then maintained incrementally: a changed model
+    costs one pass over the catalog instead of a full pairwise rebuild. Full
+    builds are quadratic, so they run in a background thread; lookups keep
+    using the previous index meanwhile, or scan the catalog for the one model
+    asked about while there is none yet.
+    """
+
+    def __init__(self, max_neighbours: int = 50):
+        self.max_neighbours = max_neighbours
+        self._lock = threading.Lock()
+        self._features: Dict[int, ModelFeatures] = {}
+        self._neighbours: Dict[int, List[Tuple[float, int]]] = {}
+        self._referenced_by: Dict[int, Set[int]] = {}
+        self._score_bounds: Dict[str, Tuple[float, float]] = {}
+        # Dirty model ids with the sequence number of their latest mark
+        self._dirty: Dict[int, int] = {}
+        self._marks = 0
+        self._built = False
+        self._updates_since_build = 0
+        self._rebuilding = False
+        # Normalized features and score bounds of the build in progress, shared with scans
+        self._staged: Optional[Tuple[Dict[int, ModelFeatures], Dict[str, Tuple[float, float]]]] = None
+
+    def mark_dirty(self, model_ids: Iterable[int]) -> None:
+        """Schedule models for re-indexing on the next lookup"""
+        with self._lock:
+            self._marks += 1
+            self._dirty.update((model_id, self._marks) for model_id in model_ids if model_id is not None)
+
+    def invalidate(self) -> None:
+        """Drop the index so that the next lookup rebuilds it from scratch"""
+        with self._lock:
+            self._built = False
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: mark every model whose features may have changed"""
+        dirty = set()
+        for change in changes:
+            if change.cascade.get("models"):
+                # A provider took its models with it; their ids were not recorded
+                self.invalidate()
+                return
+            if change.table == "models":
+                dirty.add(change.id)
+            elif change.table in ("benchmarks", "pricing"):
+                dirty.add(change.data.get("model_id"))
+                dirty.add(change.previous.get("model_id"))
+        dirty.discard(None)
+        if dirty:
+            self.mark_dirty(dirty)
+
+    def neighbours(self, db: Session, model_id: int, k: int) -> Optional[List[Tuple[int, float]]]:
+        """Return up to k (model_id, distance) pairs, or None if the model is unknown"""
+        with self._lock:
+            if self._built:
+                self._refresh(db)
+            else:
+                self._start_rebuild()
+            # Models still waiting to be re-indexed are answered from their current rows
+            if self._built and model_id not in self._dirty:
+                if model_id not in self._features:
+                    return None
+                return [(other_id, distance) for distance, other_id in self._neighbours[model_id][:k]]
+            staged = self._staged
+        return self._scan(db, model_id, k, staged)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no rebuild is running; False if the timeout ran out first (for benchmarks and scripts)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._rebuilding:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def _scan(self, db: Session, model_id: int, k: int, staged) -> Optional[List[Tuple[int, float]]]:
+        """One model's neighbours by a single pass over the catalog"""
+        if staged is None:
+            features = self._load_features(db, None)
+            bounds = _score_bounds(features.values())
+            for model in features.values():
+                _normalize(model, bounds)
+        else:
+            features, bounds = dict(staged[0]), dict(staged[1])
+            # Its row may have changed since the features were staged
+            features.pop(model_id, None)
+            current = self._load_features(db, [model_id]).get(model_id)
+            if current is not None:
+                _normalize(current, bounds)
+                features[model_id] = current
+        if model_id not in features:
+            return None
+        return [(other_id, distance) for distance, other_id in _nearest(features, model_id, k)]
+
+    # Index maintenance (callers hold the lock)
+
+    def _refresh(self, db: Session) -> None:
+        if not self._dirty or self._rebuilding:
+            # Marks older than the rebuild's catalog load are cleared when it is swapped in
+            return
+        pending = self._updates_since_build + len(self._dirty)
+        if len(self._dirty) > INLINE_UPDATES or pending > REBUILD_FRACTION * max(len(self._features), 1):
+            self._start_rebuild()
+            return
+
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        loaded = self._load_features(db, dirty)
+        for model_id in dirty:
+            self._remove(model_id)
+        for model_id in dirty:
+            features = loaded.get(model_id)
+            if features is not None:
+                _normalize(features, self._score_bounds)
+                self._insert(model_id, features)
+        self._updates_since_build += len(dirty)
+
+    def _start_rebuild(self) -> None:
+        if self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="similarity-index", daemon=True).start()
+
+    # Runs in the background thread, taking the lock only to read and swap state
+
+    def _rebuild(self) -> None:
+        try:
+            with self._lock:
+                loaded_after = self._marks
+            with SessionLocal() as db:
+                features = self._load_features(db, None)
+            bounds = _score_bounds(features.values())
+            for model in features.values():
+                _normalize(model, bounds)
+            with self._lock:
+                self._staged = (features, bounds)
+
+            neighbours = {}
+            referenced_by: Dict[int, Set[int]] = {model_id: set() for model_id in features}
+            for model_id in features:
+                neighbours[model_id] = _nearest(features, model_id, self.max_neighbours)
+                for _, other_id in neighbours[model_id]:
+                    referenced_by[other_id].add(model_id)
+
+            with self._lock:
+                self._features, self._score_bounds = features, bounds
+                self._neighbours, self._referenced_by = neighbours, referenced_by
+                self._dirty = {model_id: mark for model_id, mark in self._dirty.items() if mark > loaded_after}
+                self._built = True
+                self._updates_since_build = 0
+        except Exception:
+            logger.exception("Rebuilding the similarity index failed")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._staged = None
+
+    def _set_neighbours(self, model_id: int, neighbours: List[Tuple[float, int]]) -> None:
+        for _, other_id in self._neighbours.get(model_id, []):
+            self._referenced_by.get(other_id, set()).discard(model_id)
+        self._neighbours[model_id] = neighbours
+        for _, other_id in neighbours:
+            self._referenced_by.setdefault(other_id, set()).add(model_id)
+
+    def _remove(self, model_id: int) -> None:
+        if model_id not in self._features:
+            return
+        del self._features[model_id]
+        self._set_neighbours(model_id, [])
+        del self._neighbours[model_id]
+        # Only models that listed the removed one need a new scan
+        for other_id in self._referenced_by.pop(model_id, set()):
+            if other_id in self._features:
+                self._set_neighbours(other_id, _nearest(self._features, other_id, self.max_neighbours))
+
+    def _insert(self, model_id: int, features: ModelFeatures) -> None:
+        self._features[model_id] = features
+        self._referenced_by.setdefault(model_id, set())
+        distances = []
+        for other_id, other in self._features.items():
+            if other_id == model_id:
+                continue
+            distance = _distance(features, other)
+            distances.append((distance, other_id))
+            current = self._neighbours[other_id]
+            if len(current) < self.max_neighbours or distance < current[-1][0]:
+                updated = sorted(current + [(distance, model_id)])[:self.max_neighbours]
+                self._set_neighbours(other_id, updated)
+        self._set_neighbours(model_id, heapq.nsmallest(self.max_neighbours, distances))
+
+    def _load_features(self, db: Session, model_ids: Optional[List[int]]) -> Dict[int, ModelFeatures]:
+        id_groups = [None] if model_ids is None else list(_chunks(model_ids))
+        features: Dict[int, ModelFeatures] = {}
+        today = date.today()
+
+        for ids in id_groups:
+            model_query = select(Model.id, Model.model_type, Model.context_window)
+            benchmark_query = select(Benchmark.model_id, Benchmark.benchmark_name, Benchmark.score).where(
+                Benchmark.score.is_not(None)
+            ).order_by(Benchmark.model_id, Benchmark.benchmark_name, Benchmark.test_date, Benchmark.id)
+            pricing_query = select(Pricing.model_id, Pricing.price_type, Pricing.price, Pricing.unit).where(
+                Pricing.price_type.in_(PRICE_TYPES),
+                Pricing.valid_from <= today,
+                or_(Pricing.valid_to.is_(None), Pricing.valid_to >= today)
+            ).order_by(Pricing.model_id, Pricing.valid_from, Pricing.id)
+            if ids is not None:
+                model_query = model_query.where(Model.id.in_(ids))
+                benchmark_query = benchmark_query.where(Benchmark.model_id.in_(ids))
+                pricing_query = pricing_query.where(Pricing.model_id.in_(ids))
+
+            for model_id, model_type, context_window in db.execute(model_query):
+                features[model_id] = ModelFeatures(
+                    model_type=model_type,
+                    context_window=_scale(math.log10(context_window), CONTEXT_WINDOW_RANGE) if context_window and context_window > 0 else None
+                )
+
+            # Rows are ordered by test date, so the latest score per benchmark wins
+            for model_id, benchmark_name, score in db.execute(benchmark_query):
+                if model_id in features:
+                    features[model_id].raw_scores[benchmark_name] = float(score)
+
+            for model_id, price_type, price, unit in db.execute(pricing_query):
+                multiplier = UNIT_TO_PER_MILLION.get(unit)
+                if model_id in features and multiplier is not None:
+                    per_million = float(price) * multiplier
+                    if per_million > 0:
+                        features[model_id].prices[price_type] = _scale(math.log10(per_million), PRICE_RANGE)
+                    else:
+                        features[model_id].prices[price_type] = 0.0
+
+        return features
+
+similarity_index = SimilarityIndex()
+events.register_listener(similarity_index.handle_changes)
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from backend.services import metrics
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Concurrent callers with the same key share one in-flight computation.
+
+    join() returns the flight running for a key, or starts one with start();
+    the key is forgotten as soon as the flight completes, so later callers
+    compute afresh. A flight is a task, or any object with add_done_callback
+    that exposes its progress to the callers. Use from the event loop only.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def join(self, key: Hashable, start: Callable[[], Any]) -> Any:
+        flight = self._flights.get(key)
+        if flight is not None:
+            metrics.single_flight_calls.inc(name=self.name, role="follower")
+            return flight
+        metrics.single_flight_calls.inc(name=self.name, role="leader")
+        flight = self._flights[key] = start()
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        return flight
+
+    def _forget(self, key: Hashable, flight: Any) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """Result of compute(), shared with concurrent callers of the same key.
+
+        The computation runs as its own task, so a caller that goes away does
+        not cancel it for the others.
+        """
+        return await asyncio.shield(self.join(key, lambda: asyncio.ensure_future(compute())))
@@ -0,0 +1,315 @@
+"""Pre-rendered, gzipped JSON snapshots of public comparison tables.
+
+Each public table is rendered with its models, current pricing and latest
+benchmarks to <SNAPSHOT_DIR>/comparison-<id>-<content hash>.json.gz, and
+manifest.json maps table ids to the current file. Committed writes mark the
+affected tables and a background thread republishes only those, so views are
+served from disk without database work. Workers share the directory: the one
+that commits a change republishes, the others pick up the new manifest.
+
+Changes made outside the API (scripts, other services) are not seen; run
+`python -m backend.services.snapshot_service` afterwards to republish all.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks (Windows); manifest writes are last-writer-wins
+    fcntl = None
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from backend.database import events
+from backend.database.base import SessionLocal
+from backend.models import ComparisonItem, ComparisonTable, Model
+from backend.schemas import ComparisonSnapshot, ComparisonTable as ComparisonTableSchema, Model as ModelSchema
+from backend.services.latest_service import current_pricing, latest_benchmarks
+
+logger = logging.getLogger("backend.snapshots")
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "./snapshots")  # empty disables publishing
+SNAPSHOT_DELAY_MS = float(os.getenv("SNAPSHOT_DELAY_MS", "200"))  # gathers a burst of writes into one publish
+GZIP_LEVEL = 9  # compressed once, served many times
+
+MANIFEST = "manifest.json"
+
+@dataclass(frozen=True)
+class Snapshot:
+    table_id: int
+    filename: str
+    digest: str  # sha256 of the uncompressed JSON
+    size: int  # compressed bytes
+    as_of: str  # date current pricing was resolved for
+
+def render(db: Session, table: ComparisonTable) -> bytes:
+    """Serialized snapshot of a table as of today"""
+    model_ids = db.scalars(
+        select(ComparisonItem.model_id)
+        .where(ComparisonItem.comparison_table_id == table.id)
+        .order_by(ComparisonItem.display_order, ComparisonItem.id)
+    ).all()
+    models = {
+        model.id: model
+        for model in db.scalars(select(Model).options(joinedload(Model.provider)).where(Model.id.in_(model_ids)))
+    }
+    snapshot = ComparisonSnapshot.model_validate({
+        **ComparisonTableSchema.model_validate(table, from_attributes=True).model_dump(),
+        "as_of": date.today(),
+        "models": [
+            {
+                **ModelSchema.model_validate(models[model_id], from_attributes=True).model_dump(),
+                "provider": models[model_id].provider,
+                "benchmarks": latest_benchmarks(db, model_id),
+                "pricing": current_pricing(db, model_id),
+            }
+            for model_id in model_ids if model_id in models
+        ],
+    }, from_attributes=True)
+    return json.dumps(snapshot.model_dump(mode="json"), separators=(",", ":")).encode()
+
+class SnapshotPublisher:
+    """Keeps the snapshot directory in step with committed changes"""
+
+    def __init__(self, directory: str, delay_ms: float = SNAPSHOT_DELAY_MS):
+        self.directory = directory
+        self.delay = delay_ms / 1000
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._dirty_tables: Set[int] = set()
+        self._dirty_models: Set[int] = set()
+        self._dirty_providers: Set[int] = set()
+        self._dirty_all = False
+        self._wake = threading.Event()
+        self._publishing = False
+        self._thread: Optional[threading.Thread] = None
+        self._manifest: Dict[int, Snapshot] = {}
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    # Serving
+
+    def current(self, table_id: int) -> Optional[Snapshot]:
+        """Published snapshot of a table, reloading the manifest if another worker rewrote it"""
+        if not self.enabled:
+            return None
+        self._load_manifest()
+        return self._manifest.get(table_id)
+
+    def _load_manifest(self, force: bool = False) -> None:
+        try:
+            stat = os.stat(self.path(MANIFEST))
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._manifest_stamp and not force:
+            return
+        with open(self.path(MANIFEST)) as manifest:
+            entries = json.load(manifest)
+        self._manifest = {int(table_id): Snapshot(**entry) for table_id, entry in entries.items()}
+        self._manifest_stamp = stamp
+
+    # Change tracking
+
+    def handle_changes(self, changes: List[events.Change]) -> None:
+        """Change listener: mark the tables whose snapshots the committed rows appear in"""
+        if not self.enabled:
+            return
+        tables, models, providers = set(), set(), set()
+        everything = False
+        for change in changes:
+            if change.cascade.get("comparison_items"):
+                # The deleted items (and so the tables they were in) were not recorded
+                everything = True
+            values = (change.data, change.previous)
+            if change.table == "comparison_tables":
+                tables.add(change.id)
+            elif change.table == "comparison_items":
+                tables.update(v["comparison_table_id"] for v in values if v.get("comparison_table_id") is not None)
+            elif change.table == "models":
+                models.add(change.id)
+            elif change.table in ("benchmarks", "pricing"):
+                models.update(v["model_id"] for v in values if v.get("model_id") is not None)
+            elif change.table == "providers" and change.op != "insert":
+                providers.add(change.id)
+        if tables or models or providers or everything:
+            self.mark_dirty(tables, models, providers, everything)
+
+    def mark_dirty(
+        self, table_ids: Iterable[int] = (), model_ids: Iterable[int] = (), provider_ids: Iterable[int] = (), everything: bool = False
+    ) -> None:
+        with self._lock:
+            self._dirty_all = self._dirty_all or everything
+            self._dirty_tables.update(table_ids)
+            self._dirty_models.update(model_ids)
+            self._dirty_providers.update(provider_ids)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-publisher", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.delay)
+            self._wake.clear()
+            with self._lock:
+                tables, models, providers, everything = self._dirty_tables, self._dirty_models, self._dirty_providers, self._dirty_all
+                self._dirty_tables, self._dirty_models, self._dirty_providers, self._dirty_all = set(), set(), set(), False
+                self._publishing = True
+            try:
+                with SessionLocal() as db:
+                    self.publish(db, tables, models, providers, everything)
+            except Exception:
+                logger.exception("Publishing comparison snapshots failed")
+            finally:
+                with self._lock:
+                    self._publishing = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every marked table is published; False if the timeout ran out first (for benchmarks and scripts)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                dirty = self._dirty_all or self._dirty_tables or self._dirty_models or self._dirty_providers
+                if not (self._publishing or self._wake.is_set() or dirty):
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    # Publishing
+
+    def publish(
+        self, db: Session, table_ids: Iterable[int] = (), model_ids: Iterable[int] = (), provider_ids: Iterable[int] = (), everything: bool = False
+    ) -> Dict[int, Optional[Snapshot]]:
+        """Re-render the given tables and those showing the given models or providers' models; returns the new entries (None: unpublished)"""
+        ids = set(table_ids)
+        if everything:
+            self._load_manifest()
+            ids |= set(self._manifest) | set(db.scalars(select(ComparisonTable.id).where(ComparisonTable.is_public.is_(True))))
+        if model_ids:
+            ids |= set(db.scalars(select(ComparisonItem.comparison_table_id).where(ComparisonItem.model_id.in_(list(model_ids))).distinct()))
+        if provider_ids:
+            provider_models = select(Model.id).where(Model.provider_id.in_(list(provider_ids)))
+            ids |= set(db.scalars(select(ComparisonItem.comparison_table_id).where(ComparisonItem.model_id.in_(provider_models)).distinct()))
+        if not ids:
+            return {}
+
+        with self._publish_lock:
+            rendered = {table_id: self._render(db, table_id) for table_id in sorted(ids)}
+            # Created on first publish, so processes that never publish leave no trace
+            os.makedirs(self.directory, exist_ok=True)
+            with self._manifest_file():
+                # Files are written, listed and removed under the lock, so no
+                # worker removes a file that another just put in the manifest
+                self._load_manifest(force=True)
+                before = self._manifest
+                manifest = dict(before)
+                published: Dict[int, Optional[Snapshot]] = {}
+                for table_id, result in rendered.items():
+                    published[table_id] = self._write(*result) if result is not None else None
+                    if published[table_id] is None:
+                        manifest.pop(table_id, None)
+                    else:
+                        manifest[table_id] = published[table_id]
+                self._save_manifest(manifest)
+                for table_id in published:
+                    # The replaced file may still be in the middle of being served
+                    keep = {entry.filename for entry in (before.get(table_id), manifest.get(table_id)) if entry is not None}
+                    self._remove_stale(table_id, keep)
+        return published
+
+    def publish_table(self, db: Session, table_id: int) -> Optional[Snapshot]:
+        """Publish one table now, e.g. when a view finds it missing or out of date"""
+        return self.publish(db, [table_id]).get(table_id)
+
+    def _render(self, db: Session, table_id: int) -> Optional[Tuple[int, str, bytes, Optional[bytes]]]:
+        """(table id, digest, body, compressed body unless its file already exists); None if the table is not public"""
+        table = db.get(ComparisonTable, table_id)
+        if table is None or not table.is_public:
+            return None
+        body = render(db, table)
+        digest = hashlib.sha256(body).hexdigest()
+        exists = os.path.exists(self.path(self._filename(table_id, digest)))
+        return table_id, digest, body, None if exists else self._compress(body)
+
+    def _write(self, table_id: int, digest: str, body: bytes, compressed: Optional[bytes]) -> Snapshot:
+        """Snapshot of a rendered table, writing its file unless it is already there (callers hold the manifest lock)"""
+        filename = self._filename(table_id, digest)
+        path = self.path(filename)
+        if not os.path.exists(path):
+            self._atomic_write(path, compressed if compressed is not None else self._compress(body))
+        return Snapshot(table_id, filename, digest, os.path.getsize(path), date.today().isoformat())
+
+    @staticmethod
+    def _filename(table_id: int, digest: str) -> str:
+        return f"comparison-{table_id}-{digest[:16]}.json.gz"
+
+    @staticmethod
+    def _compress(body: bytes) -> bytes:
+        # mtime=0 keeps the compressed bytes a function of the content
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def _remove_stale(self, table_id: int, keep: Set[str]) -> None:
+        prefix = f"comparison-{table_id}-"
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".json.gz") and name not in keep:
+                try:
+                    os.remove(self.path(name))
+                except FileNotFoundError:
+                    pass
+
+    def _save_manifest(self, manifest: Dict[int, Snapshot]) -> None:
+        body = json.dumps({str(table_id): asdict(snapshot) for table_id, snapshot in sorted(manifest.items())}, indent=1)
+        self._atomic_write(self.path(MANIFEST), body.encode())
+        self._manifest = manifest
+
+    @contextmanager
+    def _manifest_file(self):
+        """Exclusive across workers while the manifest is read, merged and replaced"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path(MANIFEST + ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        handle, temporary = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+comparison_snapshots = SnapshotPublisher(SNAPSHOT_DIR)
+events.register_listener(comparison_snapshots.handle_changes)
+
+if __name__ == "__main__":
+    with SessionLocal() as session:
+        results = comparison_snapshots.publish(session, everything=True)
+    published = sum(snapshot is not None for snapshot in results.values())
+    print(f"{published} comparison snapshots published, {len(results) - published} removed, in {SNAPSHOT_DIR}")
@@ -0,0 +1,185 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from backend.models import Benchmark, Pricing
+
+# A point in a step series: the value holds from `date` until the next point.
+# A value of None marks a gap where no price was valid.
+Point = Tuple[date, Optional[Decimal]]
+
+STREAM_BATCH_SIZE = 1000
+
+def change_points(intervals: Iterable[Tuple[date, Optional[date], Decimal]]) -> List[Point]:
+    """Turn (valid_from, valid_to, price) intervals sorted by valid_from into change points"""
+    points: List[Point] = []
+    current_end: Optional[date] = None
+    for valid_from, valid_to, price in intervals:
+        if points and current_end is not None and valid_from > current_end + timedelta(days=1):
+            points.append((current_end + timedelta(days=1), None))
+        if points and points[-1][0] == valid_from:
+            # Several rows starting the same day: the last one wins
+            points.pop()
+        if not points or points[-1][1] != price:
+            points.append((valid_from, price))
+        current_end = valid_to
+    if points and current_end is not None:
+        points.append((current_end + timedelta(days=1), None))
+    return points
+
+def downsample_steps(points: Sequence[Point], budget: int) -> List[Point]:
+    """Reduce a step series to at most `budget` points.
+
+    The time range is split into equal buckets and each bucket keeps the
+    value in effect at its end, so the series stays a valid step function
+    that only loses changes shorter than a bucket.
+    """
+    if budget < 2 or len(points) <= budget:
+        return list(points)
+
+    start = points[0][0].toordinal()
+    span = points[-1][0].toordinal() - start
+    buckets = budget - 1
+    result: List[Point] = [points[0]]
+    last_bucket = None
+    for point in points[1:]:
+        bucket = min(buckets - 1, (point[0].toordinal() - start) * buckets // max(span, 1))
+        if bucket == last_bucket:
+            result[-1] = point
+        else:
+            result.append(point)
+            last_bucket = bucket
+
+    # Drop steps that no longer change the value after merging
+    compacted = [result[0]]
+    for point in result[1:]:
+        if point[1] != compacted[-1][1]:
+            compacted.append(point)
+    return compacted
+
+def pricing_history(
+    db: Session,
+    model_ids: List[int],
+    price_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    points: Optional[int] = None
+) -> List[Dict]:
+    """Change-point price series per model, price type, currency and unit"""
+    key_columns = (Pricing.model_id, Pricing.price_type, Pricing.currency, Pricing.unit)
+    query = select(*key_columns, Pricing.valid_from, Pricing.valid_to, Pricing.price).where(
+        Pricing.model_id.in_(model_ids)
+    )
+    if price_type:
+        query = query.where(Pricing.price_type == price_type)
+    if start:
+        query = query.where(or_(Pricing.valid_to.is_(None), Pricing.valid_to >= start))
+    if end:
+        query = query.where(Pricing.valid_from <= end)
+    query = query.order_by(*key_columns, Pricing.valid_from, Pricing.id)
+
+    rows = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    series = []
+    for (model_id, series_price_type, currency, unit), group in groupby(rows, key=lambda row: tuple(row[:4])):
+        series_points = change_points((row.valid_from, row.valid_to, row.price) for row in group)
+        if points:
+            series_points = downsample_steps(series_points, points)
+        series.append({
+            "model_id": model_id,
+            "price_type": series_price_type,
+            "currency": currency,
+            "unit": unit,
+            "points": [{"valid_from": day, "price": price} for day, price in series_points],
+        })
+    return series
+
+def effective_price_changes(
+    db: Session,
+    from_date: date,
+    to_date: date,
+    model_id: Optional[int] = None,
+    price_type: Optional[str] = None
+) -> List[Dict]:
+    """Prices that differ between two dates, computed in one ordered pass over the timelines"""
+    key_columns = (Pricing.model_id, Pricing.price_type, Pricing.currency, Pricing.unit)
+    # Only rows overlapping [from_date, to_date] can be in effect on either date
+    query = select(*key_columns, Pricing.valid_from, Pricing.valid_to, Pricing.price).where(
+        Pricing.valid_from <= to_date,
+        or_(Pricing.valid_to.is_(None), Pricing.valid_to >= from_date)
+    )
+    if model_id:
+        query = query.where(Pricing.model_id == model_id)
+    if price_type:
+        query = query.where(Pricing.price_type == price_type)
+    query = query.order_by(*key_columns, Pricing.valid_from, Pricing.id)
+
+    rows = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    changes = []
+    for (change_model_id, change_price_type, currency, unit), group in groupby(rows, key=lambda row: tuple(row[:4])):
+        old_price = new_price = None
+        # Rows arrive by valid_from, so the last row covering a date is the one in effect
+        for row in group:
+            if row.valid_from <= from_date and (row.valid_to is None or row.valid_to >= from_date):
+                old_price = row.price
+            if row.valid_to is None or row.valid_to >= to_date:
+                new_price = row.price
+        if old_price == new_price:
+            continue
+        change_percent = None
+        if old_price is not None and new_price is not None and old_price != 0:
+            change_percent = float(round((new_price - old_price) / old_price * 100, 4))
+        changes.append({
+            "model_id": change_model_id,
+            "price_type": change_price_type,
+            "currency": currency,
+            "unit": unit,
+            "old_price": old_price,
+            "new_price": new_price,
+            "change_percent": change_percent,
+        })
+    return changes
+
+def benchmark_history(
+    db: Session,
+    model_ids: List[int],
+    benchmark_name: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    points: Optional[int] = None
+) -> List[Dict]:
+    """Score series by test date per model, benchmark and unit"""
+    key_columns = (Benchmark.model_id, Benchmark.benchmark_name, Benchmark.unit)
+    query = select(*key_columns, Benchmark.test_date, Benchmark.score).where(
+        Benchmark.model_id.in_(model_ids),
+        Benchmark.test_date.is_not(None),
+        Benchmark.score.is_not(None)
+    )
+    if benchmark_name:
+        query = query.where(Benchmark.benchmark_name == benchmark_name)
+    if start:
+        query = query.where(Benchmark.test_date >= start)
+    if end:
+        query = query.where(Benchmark.test_date <= end)
+    query = query.order_by(*key_columns, Benchmark.test_date, Benchmark.id)
+
+    rows = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    series = []
+    for (model_id, series_benchmark_name, unit), group in groupby(rows, key=lambda row: tuple(row[:3])):
+        series_points: List[Point] = []
+        for row in group:
+            if series_points and series_points[-1][0] == row.test_date:
+                series_points.pop()
+            series_points.append((row.test_date, row.score))
+        if points:
+            series_points = downsample_steps(series_points, points)
+        series.append({
+            "model_id": model_id,
+            "benchmark_name": series_benchmark_name,
+            "unit": unit,
+            "points": [{"test_date": day, "score": score} for day, score in series_points],
+        })
+    return series
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.services.change_feed import (
+    CHANGE_POLL_INTERVAL, cascade_parents, change_notifier, changes_since, latest_cursor, in_session, json_default
+)
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per connection before a slow client is told to resync
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+
+# Change log rows read per pump iteration
+PUMP_BATCH_SIZE = 500
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, default=json_default, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+class Subscription:
+    """One connected client: the tables it follows and its outgoing queue"""
+
+    def __init__(self, tables: FrozenSet[str]):
+        self.tables = tables
+        # Deletes of these take rows of the followed tables with them (see CASCADE_PARENTS)
+        self.parents = frozenset(cascade_parents(tables))
+        self.queue: "asyncio.Queue[tuple]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, change_id: int, table: str, op: str, message: str) -> None:
+        if self.overflowed or not (table in self.tables or (op == "delete" and table in self.parents)):
+            return
+        try:
+            self.queue.put_nowait((change_id, message))
+        except asyncio.QueueFull:
+            # The client fell behind; it resyncs from the change feed instead
+            self.overflowed = True
+
+class UpdateBroker:
+    """In-process fan-out of change log entries to streaming clients.
+
+    A single pump task per process tails the change log, woken at once by
+    local commits and every CHANGE_POLL_INTERVAL for other workers' writes,
+    and encodes each entry once for all subscribers. Subscribers are plain
+    asyncio queues, so idle connections cost no threads or database work;
+    the pump stops when the last subscriber leaves.
+    """
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._pump_task: Optional[asyncio.Task] = None
+        self.cursor = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, tables: Iterable[str]) -> Subscription:
+        subscription = Subscription(frozenset(tables))
+        self._subscriptions.add(subscription)
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.get_running_loop().create_task(self._pump())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, entry: Dict[str, Any]) -> None:
+        message = format_event(entry["table"], entry, entry["id"])
+        for subscription in list(self._subscriptions):
+            subscription.offer(entry["id"], entry["table"], entry["op"], message)
+
+    async def _pump(self) -> None:
+        self.cursor = await run_in_threadpool(in_session, latest_cursor)
+        while self._subscriptions:
+            seen_version = change_notifier.version
+            try:
+                feed = await run_in_threadpool(in_session, changes_since, self.cursor, PUMP_BATCH_SIZE)
+            except Exception:
+                logger.exception("Reading the change log failed")
+                await asyncio.sleep(CHANGE_POLL_INTERVAL)
+                continue
+            for entry in feed["changes"]:
+                self.publish(entry)
+            self.cursor = feed["cursor"]
+            if not feed["has_more"]:
+                await change_notifier.wait(seen_version, CHANGE_POLL_INTERVAL)
+
+update_broker = UpdateBroker()
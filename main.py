@@ -1,10 +1,15 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
-from backend.database.base import get_db
-from backend.database.init_db import create_tables, seed_data
-from backend.api.routes import providers, models, benchmarks, pricing, comparisons, gemini_scraper
+from starlette.concurrency import run_in_threadpool
+from backend.database.base import get_db, engine, replica_engine, check_database
+from backend.api.metrics import MetricsMiddleware
+from backend.api.caching import ResponseCacheMiddleware
+from backend.api.compression import CompressionMiddleware
+from backend.api.admission import AdmissionMiddleware
+from backend.api.routes import providers, models, benchmarks, pricing, comparisons, gemini_scraper, search, changes, stream, admin, snapshots
+from backend.services import metrics, page_fetcher
 import os
 from dotenv import load_dotenv
 
@@ -16,7 +21,16 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware
+# ETag validation and in-process response cache for catalog reads
+app.add_middleware(ResponseCacheMiddleware)
+
+# brotli/gzip for large responses (outside the cache, which stores identity bodies)
+app.add_middleware(CompressionMiddleware)
+
+# Per-tier concurrency limits and per-client rates; rejections still get CORS headers
+app.add_middleware(AdmissionMiddleware)
+
+# CORS middleware (added last so it also wraps cached and 304 responses)
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -29,8 +43,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Request counts, latency and SQL statements per route (outermost, so it sees every response)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(providers.router, prefix="/api/providers", tags=["providers"])
 app.include_router(models.router, prefix="/api/models", tags=["models"])
@@ -38,12 +56,15 @@ app.include_router(benchmarks.router, prefix="/api/benchmarks", tags=["benchmark
 app.include_router(pricing.router, prefix="/api/pricing", tags=["pricing"])
 app.include_router(comparisons.router, prefix="/api/comparisons", tags=["comparisons"])
 app.include_router(gemini_scraper.router, prefix="/api/scraper", tags=["scraper"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(changes.router, prefix="/api/changes", tags=["changes"])
+app.include_router(stream.router, prefix="/api/stream", tags=["stream"])
+app.include_router(snapshots.router, prefix="/api/snapshots", tags=["snapshots"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    create_tables()
-    seed_data()
+@app.on_event("shutdown")
+async def close_scraper_client():
+    await page_fetcher.close()
 
 @app.get("/")
 async def root():
@@ -51,7 +72,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    """Liveness plus database reachability and pool saturation; 503 when the primary is unreachable"""
+    database = await run_in_threadpool(check_database, engine)
+    body = {"database": database}
+    if replica_engine is not None:
+        body["replica"] = await run_in_threadpool(check_database, replica_engine)
+    if database["reachable"] is False:
+        body["status"] = "unhealthy"
+    elif database["reachable"] is None or body.get("replica", {}).get("reachable") is False:
+        body["status"] = "degraded"
+    else:
+        body["status"] = "healthy"
+    return JSONResponse(body, status_code=503 if body["status"] == "unhealthy" else 200)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,334 @@
+"""In-process benchmark of every API route against a synthetic catalog.
+
+Generates a catalog (backend.database.generate_data) at the chosen scale,
+then calls each route through the ASGI app and records latency percentiles,
+SQL statements per request and peak traced memory. Results are compared
+with perf/baseline.json: more queries than the baseline, or latency/memory
+beyond the tolerance, fail the run. The response cache is disabled unless
+--cache is given, so handlers and queries are what gets measured.
+
+    python perf/bench_routes.py                    # small scale, compare with the baseline
+    python perf/bench_routes.py --update-baseline  # record a new baseline
+    python perf/bench_routes.py --scale large --database /data/large.db
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Timings are noisy; regressions must also exceed these absolute margins
+MIN_REGRESSION_MS = 3.0
+MIN_REGRESSION_KB = 64.0
+
+# Sent with every call, so the admin routes can be measured
+ADMIN_TOKEN = "bench"
+
+Request = Tuple[str, str, Optional[dict]]
+
+@dataclass
+class Case:
+    """How to call one route; prepare runs untimed before each call and returns extra ids"""
+    method: str
+    path: str
+    request: Callable[[dict, int], Request]
+    prepare: Optional[Callable[[object, dict, int], dict]] = None
+
+def _create(client, url: str, body: dict) -> int:
+    response = client.post(url, json=body)
+    response.raise_for_status()
+    return response.json()["id"]
+
+def _clear_slow_queries(client) -> dict:
+    from backend.database.slow_queries import slow_query_log
+    slow_query_log.clear()
+    return {}
+
+def _wait_for_similarity_index(client) -> dict:
+    from backend.services.similarity_service import similarity_index
+    similarity_index.wait()
+    return {}
+
+def _cases() -> List[Case]:
+    model = lambda ids, i: ids["model_ids"][i % len(ids["model_ids"])]
+    return [
+        Case("GET", "/api/providers/", lambda ids, i: ("GET", "/api/providers/", None)),
+        Case("GET", "/api/providers/{provider_id}", lambda ids, i: ("GET", f"/api/providers/{ids['provider_id']}", None)),
+        Case("GET", "/api/providers/{provider_id}/models", lambda ids, i: ("GET", f"/api/providers/{ids['provider_id']}/models?limit=50", None)),
+        Case("POST", "/api/providers/", lambda ids, i: ("POST", "/api/providers/", {"name": f"Bench Provider {ids['run']}-{i}"})),
+        Case("PUT", "/api/providers/{provider_id}", lambda ids, i: ("PUT", f"/api/providers/{ids['provider_id']}", {"description": f"Updated {i}"})),
+        Case(
+            "DELETE", "/api/providers/{provider_id}",
+            lambda ids, i: ("DELETE", f"/api/providers/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, "/api/providers/", {"name": f"Doomed Provider {ids['run']}-{i}"})},
+        ),
+        Case("GET", "/api/models/", lambda ids, i: ("GET", "/api/models/?limit=100", None)),
+        Case("GET", "/api/models/{model_id}", lambda ids, i: ("GET", f"/api/models/{model(ids, i)}", None)),
+        Case("GET", "/api/models/{model_id}/benchmarks", lambda ids, i: ("GET", f"/api/models/{model(ids, i)}/benchmarks?limit=100", None)),
+        Case("GET", "/api/models/{model_id}/pricing", lambda ids, i: ("GET", f"/api/models/{model(ids, i)}/pricing?limit=100", None)),
+        Case(
+            "GET", "/api/models/{model_id}/similar",
+            lambda ids, i: ("GET", f"/api/models/{model(ids, i)}/similar", None),
+            # The index is built in the background after the first call; measure lookups against it
+            lambda client, ids, i: _wait_for_similarity_index(client),
+        ),
+        Case("POST", "/api/models/", lambda ids, i: ("POST", "/api/models/", {"name": f"Bench Model {ids['run']}-{i}", "provider_id": ids["provider_id"]})),
+        Case("PUT", "/api/models/{model_id}", lambda ids, i: ("PUT", f"/api/models/{model(ids, i)}", {"description": f"Updated {i}"})),
+        Case(
+            "DELETE", "/api/models/{model_id}",
+            lambda ids, i: ("DELETE", f"/api/models/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, "/api/models/", {"name": f"Doomed Model {ids['run']}-{i}", "provider_id": ids["provider_id"]})},
+        ),
+        Case("GET", "/api/benchmarks/", lambda ids, i: ("GET", f"/api/benchmarks/?model_id={model(ids, i)}", None)),
+        Case("GET", "/api/benchmarks/history", lambda ids, i: ("GET", f"/api/benchmarks/history?model_ids={model(ids, i)}&model_ids={model(ids, i + 1)}&benchmark_name=MMLU", None)),
+        Case("GET", "/api/benchmarks/{benchmark_id}", lambda ids, i: ("GET", f"/api/benchmarks/{ids['benchmark_id']}", None)),
+        Case("POST", "/api/benchmarks/", lambda ids, i: ("POST", "/api/benchmarks/", {"model_id": model(ids, i), "benchmark_name": "MMLU", "score": 70.5, "test_date": "2024-06-01"})),
+        Case("PUT", "/api/benchmarks/{benchmark_id}", lambda ids, i: ("PUT", f"/api/benchmarks/{ids['benchmark_id']}", {"notes": f"Rerun {i}"})),
+        Case(
+            "DELETE", "/api/benchmarks/{benchmark_id}",
+            lambda ids, i: ("DELETE", f"/api/benchmarks/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, "/api/benchmarks/", {"model_id": model(ids, i), "benchmark_name": "Doomed", "score": 1})},
+        ),
+        Case("GET", "/api/pricing/", lambda ids, i: ("GET", f"/api/pricing/?model_id={model(ids, i)}", None)),
+        Case("GET", "/api/pricing/current", lambda ids, i: ("GET", f"/api/pricing/current?model_id={model(ids, i)}", None)),
+        Case("GET", "/api/pricing/history", lambda ids, i: ("GET", f"/api/pricing/history?model_ids={model(ids, i)}&model_ids={model(ids, i + 1)}&points=100", None)),
+        Case("GET", "/api/pricing/diff", lambda ids, i: ("GET", f"/api/pricing/diff?from=2022-06-01&to=2023-06-01&model_id={model(ids, i)}", None)),
+        Case("GET", "/api/pricing/{pricing_id}", lambda ids, i: ("GET", f"/api/pricing/{ids['pricing_id']}", None)),
+        Case("POST", "/api/pricing/", lambda ids, i: ("POST", "/api/pricing/", {"model_id": model(ids, i), "price_type": "batch_tokens", "price": 1.5, "unit": "per_million_tokens", "valid_from": "2024-01-01"})),
+        Case("PUT", "/api/pricing/{pricing_id}", lambda ids, i: ("PUT", f"/api/pricing/{ids['pricing_id']}", {"source_url": f"https://example.com/{i}"})),
+        Case(
+            "DELETE", "/api/pricing/{pricing_id}",
+            lambda ids, i: ("DELETE", f"/api/pricing/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, "/api/pricing/", {"model_id": model(ids, i), "price_type": "doomed", "price": 1, "unit": "per_request", "valid_from": "2024-01-01"})},
+        ),
+        Case("GET", "/api/comparisons/", lambda ids, i: ("GET", "/api/comparisons/?is_public=true&limit=50", None)),
+        Case("GET", "/api/comparisons/{table_id}", lambda ids, i: ("GET", f"/api/comparisons/{ids['table_id']}", None)),
+        Case("POST", "/api/comparisons/", lambda ids, i: ("POST", "/api/comparisons/", {"name": f"Bench Comparison {i}", "model_ids": ids["model_ids"][:5]})),
+        Case("PUT", "/api/comparisons/{table_id}", lambda ids, i: ("PUT", f"/api/comparisons/{ids['table_id']}", {"description": f"Updated {i}"})),
+        Case(
+            "DELETE", "/api/comparisons/{table_id}",
+            lambda ids, i: ("DELETE", f"/api/comparisons/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, "/api/comparisons/", {"name": f"Doomed Comparison {i}"})},
+        ),
+        Case(
+            "POST", "/api/comparisons/{table_id}/items",
+            lambda ids, i: ("POST", f"/api/comparisons/{ids['new_id']}/items", {"comparison_table_id": ids["new_id"], "model_id": model(ids, i)}),
+            lambda client, ids, i: {"new_id": _create(client, "/api/comparisons/", {"name": f"Items Comparison {i}"})},
+        ),
+        Case(
+            "DELETE", "/api/comparisons/{table_id}/items/{item_id}",
+            lambda ids, i: ("DELETE", f"/api/comparisons/{ids['table_id']}/items/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, f"/api/comparisons/{ids['table_id']}/items", {"comparison_table_id": ids["table_id"], "model_id": ids["spare_model_id"]})},
+        ),
+        Case("GET", "/api/scraper/web-sources", lambda ids, i: ("GET", "/api/scraper/web-sources", None)),
+        Case("POST", "/api/scraper/web-sources", lambda ids, i: ("POST", f"/api/scraper/web-sources?url=https://bench.example.com/{ids['run']}/{i}&source_type=pricing", None)),
+        Case(
+            "DELETE", "/api/scraper/web-sources/{source_id}",
+            lambda ids, i: ("DELETE", f"/api/scraper/web-sources/{ids['new_id']}", None),
+            lambda client, ids, i: {"new_id": _create(client, f"/api/scraper/web-sources?url=https://doomed.example.com/{ids['run']}/{i}&source_type=pricing", None)},
+        ),
+        Case("GET", "/api/search/", lambda ids, i: ("GET", f"/api/search/?q={('atlas', 'nova 1', 'mmlu', 'provider 00')[i % 4]}", None)),
+        Case("GET", "/api/snapshots/comparisons/{table_id}", lambda ids, i: ("GET", f"/api/snapshots/comparisons/{ids['public_table_id']}", None)),
+        Case(
+            "GET", "/api/snapshots/files/{filename}",
+            lambda ids, i: ("GET", f"/api/snapshots/files/{ids['filename']}", None),
+            lambda client, ids, i: {"filename": client.get(f"/api/snapshots/comparisons/{ids['public_table_id']}").headers["content-location"].rsplit("/", 1)[1]},
+        ),
+        Case("GET", "/api/changes/", lambda ids, i: ("GET", "/api/changes/?since=0&limit=100", None)),
+        Case(
+            "GET", "/api/admin/slow-queries",
+            lambda ids, i: ("GET", "/api/admin/slow-queries?limit=50", None),
+            # Which statements were slow differs between runs; measure an empty log
+            lambda client, ids, i: _clear_slow_queries(client),
+        ),
+        Case("DELETE", "/api/admin/slow-queries", lambda ids, i: ("DELETE", "/api/admin/slow-queries", None)),
+    ]
+
+# Routes that cannot be driven in-process, with the reason
+SKIPPED = {
+    ("POST", "/api/scraper/scrape-url"): "calls an LLM; see perf/bench_scraper.py",
+    ("POST", "/api/scraper/scrape-url/stream"): "calls an LLM; see perf/bench_scraper.py",
+    ("GET", "/api/stream/updates"): "open-ended event stream",
+}
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def _sample_ids(db) -> dict:
+    from sqlalchemy import func, select
+    from backend.models import Benchmark, ComparisonTable, Model, Pricing, Provider
+
+    model_ids = db.scalars(select(Model.id).order_by(Model.id).limit(50)).all()
+    table_id = db.scalar(select(ComparisonTable.id).order_by(ComparisonTable.id))
+    return {
+        "run": int(time.time()),
+        "provider_id": db.scalar(select(Provider.id).order_by(Provider.id)),
+        "model_ids": model_ids,
+        # Never placed in the comparison table used for item deletes
+        "spare_model_id": db.scalar(select(func.max(Model.id))),
+        "benchmark_id": db.scalar(select(Benchmark.id).where(Benchmark.model_id == model_ids[0])),
+        "pricing_id": db.scalar(select(Pricing.id).where(Pricing.model_id == model_ids[0])),
+        "table_id": table_id,
+        "public_table_id": db.scalar(select(ComparisonTable.id).where(ComparisonTable.is_public.is_(True)).order_by(ComparisonTable.id)),
+    }
+
+def run_benchmarks(iterations: int) -> Tuple[Dict[str, dict], List[str]]:
+    """Call every route; returns results by route key and routes without a case"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main
+    from backend.database.base import SessionLocal, engine
+
+    cases = _cases()
+    covered = {(case.method, case.path) for case in cases} | set(SKIPPED)
+    uncovered = [
+        f"{method} {route.path}"
+        for route in main.app.routes if route.path.startswith("/api/")
+        for method in sorted(getattr(route, "methods", ()))
+        if (method, route.path) not in covered
+    ]
+
+    db = SessionLocal()
+    try:
+        ids = _sample_ids(db)
+    finally:
+        db.close()
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    results = {}
+    with TestClient(main.app, headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+        for case in cases:
+            latencies, queries, peak = [], [], 0
+            # The first call warms lazily built indexes and caches and is not recorded;
+            # the last runs under tracemalloc, which slows it down, for peak memory only
+            for i in range(iterations + 2):
+                call_ids = dict(ids, **(case.prepare(client, ids, i) if case.prepare else {}))
+                method, url, body = case.request(call_ids, i)
+                traced = i == iterations + 1
+                if traced:
+                    tracemalloc.start()
+                statements[0] = 0
+                started = time.perf_counter()
+                response = client.request(method, url, json=body)
+                elapsed = (time.perf_counter() - started) * 1000
+                if traced:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                elif i > 0:
+                    latencies.append(elapsed)
+                    queries.append(statements[0])
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:300]}")
+            results[f"{case.method} {case.path}"] = {
+                "p50_ms": round(_percentile(latencies, 0.50), 2),
+                "p95_ms": round(_percentile(latencies, 0.95), 2),
+                "p99_ms": round(_percentile(latencies, 0.99), 2),
+                "queries": int(statistics.median(queries)),
+                "peak_kb": round(peak / 1024, 1),
+            }
+    return results, uncovered
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Regressions of results against a baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["queries"] > base["queries"]:
+            regressions.append(f"{key}: {result['queries']} queries per request (baseline {base['queries']})")
+        # The median is gated at the tolerance; the noisier tail at twice it
+        for percentile, allowed in (("p50_ms", tolerance), ("p95_ms", 2 * tolerance)):
+            if result[percentile] > base[percentile] * (1 + allowed) + MIN_REGRESSION_MS:
+                regressions.append(f"{key}: {percentile[:3]} {result[percentile]} ms (baseline {base[percentile]} ms)")
+        if result["peak_kb"] > base["peak_kb"] * (1 + tolerance) + MIN_REGRESSION_KB:
+            regressions.append(f"{key}: peak {result['peak_kb']} KB (baseline {base['peak_kb']} KB)")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every API route in-process")
+    parser.add_argument("--scale", default="small", help="generate_data scale (small, medium, large)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", help="SQLite file to generate into, or to reuse if it already has data")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed latency/memory growth over the baseline")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(args.database or os.path.join(directory, "bench.db")).resolve()
+        # Configure the application before importing it
+        os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+        os.environ["DATABASE_REPLICA_URL"] = ""
+        os.environ["DB_ECHO"] = "false"
+        os.environ["WRITE_QUEUE"] = "false"
+        os.environ["ADMISSION_CONTROL"] = "false"  # one client issuing thousands of requests would be rate-limited
+        os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN
+        os.environ["SNAPSHOT_DIR"] = os.path.join(directory, "snapshots")
+        # Keep republishing after writes out of the timed calls; views still publish on demand
+        os.environ["SNAPSHOT_DELAY_MS"] = str(24 * 3600 * 1000)
+        if not args.cache:
+            os.environ["RESPONSE_CACHE_SIZE"] = "0"
+        sys.path.insert(0, str(ROOT))
+
+        from backend.database.generate_data import SCALES, generate
+        from backend.database.init_db import create_tables
+        from backend.database.base import SessionLocal
+        from backend.models import Provider
+
+        create_tables()
+        db = SessionLocal()
+        try:
+            empty = db.query(Provider).first() is None
+        finally:
+            db.close()
+        if empty:
+            generate(SCALES[args.scale], args.seed)
+
+        results, uncovered = run_benchmarks(args.iterations)
+
+    print(f"{'route':<52} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'peak KB':>9}")
+    for key, result in results.items():
+        print(f"{key:<52} {result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8} {result['queries']:>8} {result['peak_kb']:>9}")
+    for key, reason in SKIPPED.items():
+        print(f"{' '.join(key):<52} skipped: {reason}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    if args.update_baseline:
+        baselines[args.scale] = results
+        BASELINE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline for scale {args.scale!r} written to {BASELINE}")
+        return 0
+
+    failures = [f"{route}: no benchmark case" for route in uncovered]
+    if args.scale in baselines:
+        failures += compare(results, baselines[args.scale], args.tolerance)
+    else:
+        print(f"No baseline for scale {args.scale!r}; run with --update-baseline to record one")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
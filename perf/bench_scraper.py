@@ -0,0 +1,206 @@
+"""End-to-end throughput benchmark of the scraper pipeline, without the Gemini API.
+
+Serves synthetic provider pages from a local HTTP server and answers the
+model calls with the fake LLM backend (LLM_BACKEND=fake), then drives
+POST /api/scraper/scrape-url through the ASGI app at each concurrency level.
+Reports URLs per minute, end-to-end and per-stage latency (fetch, first record,
+generate, persist) and peak memory, so scraper parallelism can be tuned
+against a known model latency and error rate. The page server shares the
+process (and the GIL) with the API, so fetch times include serving the page.
+
+    python perf/bench_scraper.py
+    python perf/bench_scraper.py --concurrency 1,8,32,64 --llm-latency-ms 1500 --llm-error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import resource
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGES = ("fetch", "first_record", "generate", "persist")
+
+@lru_cache(maxsize=None)
+def _page(index: int, size_kb: int) -> bytes:
+    rows, size = [], 0
+    while size < size_kb * 1024:
+        n = len(rows)
+        rows.append(
+            f"<tr><td>Atlas {index}-{n}</td><td>${(n % 40) / 4 + 0.25:.2f}</td>"
+            f"<td>${(n % 40) + 1:.2f}</td><td>per 1M tokens</td></tr>\n"
+        )
+        size += len(rows[-1])
+    return (
+        f"<html><head><title>Provider {index} pricing</title><style>td {{ padding: 4px }}</style></head>"
+        f"<body><h1>Provider {index} pricing</h1><script>track()</script>"
+        f"<table><tr><th>Model</th><th>Input</th><th>Output</th><th>Unit</th></tr>\n{''.join(rows)}</table>"
+        f"<p>MMLU 86.4, GSM8K 92.0</p></body></html>"
+    ).encode()
+
+def start_page_server(size_kb: int, latency: float) -> ThreadingHTTPServer:
+    """Static page server on a free local port; every /pages/<n> path is a pricing page"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not self.path.startswith("/pages/"):
+                self.send_error(404)
+                return
+            time.sleep(latency)
+            body = _page(sum(self.path.encode()) % 100, size_kb)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] if ordered else 0.0
+
+async def run_level(app, base_url: str, level: int, urls: int, data_type: str) -> dict:
+    """Scrape `urls` distinct pages with `level` requests in flight"""
+    import httpx
+    from backend.services import metrics
+
+    metrics.scrape_stage_duration.clear()
+    semaphore = asyncio.Semaphore(level)
+    latencies, outcomes = [], {"success": 0, "failed": 0}
+
+    async def scrape(client, index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/scraper/scrape-url", json={"url": f"{base_url}/pages/c{level}-{index}", "data_type": data_type})
+            latencies.append(time.perf_counter() - started)
+            succeeded = response.status_code == 200 and response.json()["success"]
+            outcomes["success" if succeeded else "failed"] += 1
+
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(scrape(client, index) for index in range(urls)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": level,
+        "urls": urls,
+        **outcomes,
+        "urls_per_minute": round(urls / elapsed * 60, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        # Stage percentiles are estimated from the scrape_stage_duration_seconds buckets
+        "stages": {
+            stage: {
+                "p50_ms": round((metrics.scrape_stage_duration.quantile(0.50, stage=stage) or 0) * 1000, 1),
+                "p95_ms": round((metrics.scrape_stage_duration.quantile(0.95, stage=stage) or 0) * 1000, 1),
+            }
+            for stage in STAGES
+        },
+        # Traced peak of this level with --trace-memory, else the process' RSS high-water mark so far
+        "peak_mb": round(
+            tracemalloc.get_traced_memory()[1] / 2 ** 20 if tracemalloc.is_tracing()
+            else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+def _print(results: List[dict]) -> None:
+    header = f"{'conc':>5} {'ok':>5} {'fail':>5} {'urls/min':>9} {'p50 ms':>8} {'p95 ms':>8}"
+    header += "".join(f" {stage + ' p50/p95':>20}" for stage in STAGES) + f" {'peak MB':>8}"
+    print(header)
+    for r in results:
+        line = f"{r['concurrency']:>5} {r['success']:>5} {r['failed']:>5} {r['urls_per_minute']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8}"
+        line += "".join(f" {str(r['stages'][s]['p50_ms']) + '/' + str(r['stages'][s]['p95_ms']):>20}" for s in STAGES)
+        print(line + f" {r['peak_mb']:>8}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scrape throughput against local pages and a fake LLM")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="comma-separated requests in flight per level")
+    parser.add_argument("--urls", type=int, default=64, help="URLs scraped per level")
+    parser.add_argument("--data-type", choices=("pricing", "benchmark", "both"), default="both")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-status", type=int, default=503, help="HTTP status of injected errors (429 and 5xx are retried)")
+    parser.add_argument("--rpm", type=float, default=0, help="LLM requests-per-minute quota (0: unlimited)")
+    parser.add_argument("--tpm", type=float, default=0, help="LLM tokens-per-minute quota (0: unlimited)")
+    parser.add_argument("--llm-responses", help="JSON file of canned responses by kind (pricing, benchmark, both)")
+    parser.add_argument("--page-kb", type=int, default=32, help="size of each served page")
+    parser.add_argument("--page-latency-ms", type=float, default=20)
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peaks per level (slows every stage)")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Configure the application before importing it
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'scraper.db')}"
+        os.environ["DATABASE_REPLICA_URL"] = ""
+        os.environ["DB_ECHO"] = "false"
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+        os.environ["FAKE_LLM_JITTER"] = str(args.llm_jitter)
+        os.environ["FAKE_LLM_ERROR_RATE"] = str(args.llm_error_rate)
+        os.environ["FAKE_LLM_ERROR_STATUS"] = str(args.llm_error_status)
+        os.environ["FAKE_LLM_SEED"] = "0"
+        os.environ["LLM_REQUESTS_PER_MINUTE"] = str(args.rpm)
+        os.environ["LLM_TOKENS_PER_MINUTE"] = str(args.tpm)
+        os.environ["ADMISSION_CONTROL"] = "false"  # measure the pipeline, not the scraper tier's concurrency limit
+        os.environ["SCRAPER_FETCH_PAGES"] = "true"
+        os.environ["SCRAPER_FETCH_PRIVATE"] = "true"  # pages come from a server on 127.0.0.1
+        if args.llm_responses:
+            os.environ["FAKE_LLM_RESPONSES"] = str(Path(args.llm_responses).resolve())
+        sys.path.insert(0, str(ROOT))
+
+        import main as api
+        from backend.database.init_db import create_tables
+        from backend.services import page_fetcher
+
+        create_tables()
+        server = start_page_server(args.page_kb, args.page_latency_ms / 1000)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        async def run() -> List[dict]:
+            results = []
+            try:
+                for level in levels:
+                    results.append(await run_level(api.app, base_url, level, args.urls, args.data_type))
+            finally:
+                await page_fetcher.close()
+            return results
+
+        if args.trace_memory:
+            tracemalloc.start()
+        try:
+            results = asyncio.run(run())
+        finally:
+            tracemalloc.stop()
+            server.shutdown()
+
+    quota = f"{args.rpm:g} rpm, {args.tpm:g} tpm" if args.rpm or args.tpm else "no quota"
+    print(f"fake LLM {args.llm_latency_ms:g} ms ±{args.llm_jitter:.0%}, error rate {args.llm_error_rate:.0%} ({args.llm_error_status}), {quota}; "
+          f"pages {args.page_kb} KB after {args.page_latency_ms:g} ms; {args.urls} URLs per level\n")
+    _print(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    # Injected model errors are expected; a level where nothing succeeds is not
+    return 1 if any(r["success"] == 0 for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
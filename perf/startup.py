@@ -0,0 +1,113 @@
+"""Import-time and cold-start budget check for API workers.
+
+Each run is a fresh interpreter that times, one after the other:
+
+- framework: importing fastapi, sqlalchemy.orm and pydantic
+- app import: then importing main (the app and all routers)
+- cold start: from the first import to the first response (GET /), with ASGI startup
+
+The framework import is machine- and load-dependent, so the app is budgeted
+on top of it: fails when the app import, or the cold start beyond the
+framework import, exceeds its budget (best of --runs, each run's framework
+time subtracted from its own measurements); when startup imports a module
+that should load lazily; or when startup touches the database.
+
+    python perf/startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Milliseconds on top of the framework import, measured in the same interpreter
+APP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_APP_IMPORT_BUDGET_MS", "400"))
+COLD_START_BUDGET_MS = float(os.getenv("STARTUP_COLD_START_BUDGET_MS", "500"))
+
+# Only needed by the commands and endpoints that use them
+LAZY_MODULES = ("google.generativeai", "alembic", "bs4", "httpx", "uvicorn")
+
+COLD_START = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import fastapi, sqlalchemy.orm, pydantic
+framework = time.perf_counter()
+import main
+imported = time.perf_counter()
+lazy_loaded = [name for name in %r if name in sys.modules]
+
+async def first_request():
+    # A bare ASGI call, so no test client import is counted
+    await main.app.router.startup()
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    await main.app(scope, receive, send)
+    return messages[0]["status"]
+
+status = asyncio.run(first_request())
+ready = time.perf_counter()
+print(json.dumps({
+    "framework_ms": (framework - start) * 1000,
+    "app_import_ms": (imported - framework) * 1000,
+    "cold_start_ms": (ready - start) * 1000,
+    "status": status,
+    "lazy_loaded": lazy_loaded,
+}))
+""" % (LAZY_MODULES,)
+
+def run(code: str, database: Path) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", DATABASE_REPLICA_URL="", DB_ECHO="false")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / "startup.db"
+        samples = [run(COLD_START, database) for _ in range(args.runs)]
+        touched_database = database.exists()
+
+    framework_ms = min(sample["framework_ms"] for sample in samples)
+    app_import_ms = min(sample["app_import_ms"] for sample in samples)
+    cold_start_ms = min(sample["cold_start_ms"] for sample in samples)
+    # Beyond the framework import of the same run, so a slow or loaded machine cancels out
+    app_start_ms = min(sample["cold_start_ms"] - sample["framework_ms"] for sample in samples)
+    lazy_loaded = sorted({name for sample in samples for name in sample["lazy_loaded"]})
+
+    print(f"framework import  {framework_ms:7.0f} ms")
+    print(f"app import        {app_import_ms:7.0f} ms  (budget {APP_IMPORT_BUDGET_MS:.0f})")
+    print(f"cold start        {cold_start_ms:7.0f} ms  (framework + {app_start_ms:.0f} ms, budget {COLD_START_BUDGET_MS:.0f})")
+
+    failures = []
+    if app_import_ms > APP_IMPORT_BUDGET_MS:
+        failures.append(f"app import takes {app_import_ms:.0f} ms")
+    if app_start_ms > COLD_START_BUDGET_MS:
+        failures.append(f"cold start takes {app_start_ms:.0f} ms beyond the framework import")
+    if lazy_loaded:
+        failures.append(f"startup imports {', '.join(lazy_loaded)}")
+    if touched_database:
+        failures.append("startup created or opened the database")
+    if any(sample["status"] != 200 for sample in samples):
+        failures.append("GET / did not return 200")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
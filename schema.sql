@@ -86,11 +86,16 @@ CREATE TABLE web_sources (
 );
 
 -- Indices for performance
-CREATE INDEX idx_models_provider ON models(provider_id);
-CREATE INDEX idx_benchmarks_model ON benchmarks(model_id);
-CREATE INDEX idx_pricing_model ON pricing(model_id);
+CREATE INDEX idx_models_provider ON models(provider_id, id);
 CREATE INDEX idx_pricing_dates ON pricing(valid_from, valid_to);
-CREATE INDEX idx_comparison_items_table ON comparison_items(comparison_table_id);
+CREATE INDEX idx_benchmarks_model_name_date ON benchmarks(model_id, benchmark_name, test_date);
+CREATE INDEX idx_pricing_model_type_valid_from ON pricing(model_id, price_type, valid_from);
+CREATE INDEX idx_models_type ON models(model_type, id);
+CREATE INDEX idx_benchmarks_name_model ON benchmarks(benchmark_name, model_id);
+CREATE INDEX idx_pricing_type_valid_from ON pricing(price_type, valid_from);
+CREATE INDEX idx_comparison_tables_public ON comparison_tables(is_public, id);
+CREATE INDEX idx_comparison_items_table_model ON comparison_items(comparison_table_id, model_id);
+CREATE INDEX idx_comparison_items_model ON comparison_items(model_id);
 CREATE INDEX idx_web_sources_active ON web_sources(is_active);
 
 -- Sample data